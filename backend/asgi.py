@@ -13,7 +13,21 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Импорт после get_asgi_application(): приложения Django к этому моменту уже загружены
+from django.conf import settings  # noqa: E402
+from core.realtime import sse_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """
+    ASGI-маршрутизатор: поток событий (REALTIME_PATH) обслуживается корутиной без потока
+    на соединение, всё остальное — обычным приложением Django.
+    """
+    if scope['type'] == 'http' and scope['path'] == settings.REALTIME_PATH:
+        return await sse_application(scope, receive, send)
+    return await django_application(scope, receive, send)
 
 # dummy update
 
@@ -33,6 +33,12 @@ INSTALLED_APPS = [
 
 # Middleware
 MIDDLEWARE = [
+    # Первым: замер фаз запроса (заголовок Server-Timing, журнал core.timing)
+    'core.timing.ServerTimingMiddleware',
+    # Сразу за ним: метрики запросов для /metrics (core/metrics.py)
+    'core.metrics.MetricsMiddleware',
+    # Поиск N+1 (core/nplusone.py), включается NPLUSONE_MODE
+    'core.nplusone.NPlusOneMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -74,6 +80,15 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite — локальный запуск без PostgreSQL (поиск по постам работает через FTS5)
+if os.getenv('DB_ENGINE') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME') or BASE_DIR / 'db.sqlite3',
+        }
+    }
+
 # Валидация пароля
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -92,6 +107,19 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Кэш. По умолчанию — память процесса; для общего кэша между процессами можно указать
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache и каталог в CACHE_LOCATION
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'vdvuhslovah'),
+    }
+}
+
+# Кэш ответов API для анонимных запросов (core/cache.py); 0 — выключен
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 60))
+
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -100,8 +128,84 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
+    # Keyset-пагинация по (created_at, id): без OFFSET и COUNT(*)
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    # JSONRenderer с замером времени рендеринга для Server-Timing (core/timing.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.timing.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+# Фоновые обработчики в процессе (core/background.py): запись уведомлений, раскладка постов по лентам
+# False — поток не запускается, очередь разбирается только вызовом flush();
+# под manage.py test так всегда (core/tests/runner.py)
+BACKGROUND_WORKERS_ASYNC = os.getenv('BACKGROUND_WORKERS_ASYNC', 'True') == 'True'
+TEST_RUNNER = 'core.tests.runner.TestRunner'
+
+# События в реальном времени (core/realtime.py): поток SSE по адресу REALTIME_PATH,
+# обслуживается только ASGI-сервером (uvicorn/daphne backend.asgi:application).
+# REALTIME_BACKEND: core.realtime.LocalBackend — в пределах процесса,
+# core.realtime.RedisBackend — между процессами через Redis (REALTIME_REDIS_URL)
+REALTIME_PATH = '/api/events/'
+REALTIME_BACKEND = os.getenv('REALTIME_BACKEND', 'core.realtime.LocalBackend')
+REALTIME_REDIS_URL = os.getenv('REALTIME_REDIS_URL', 'redis://localhost:6379/0')
+REALTIME_HEARTBEAT_SECONDS = 25  # пинг простаивающего соединения, чтобы прокси его не закрывали
+REALTIME_QUEUE_SIZE = 100        # событий в очереди соединения; при переполнении соединение закрывается
+
+# Обработка аватаров и баннеров (core/images.py): ограничение размера исходника в пикселях
+# и качество уменьшенных копий
+IMAGE_MAX_PIXELS = 25_000_000
+IMAGE_JPEG_QUALITY = 85
+IMAGE_WEBP_QUALITY = 80
+
+# Нагрузочные замеры: базовый файл команды benchmark (набор данных — команда seed_dataset)
+BENCHMARK_BASELINE = BASE_DIR / 'benchmarks' / 'baseline.json'
+
+# Замер фаз запроса (core/timing.py): SQL, сериализация, рендеринг, представление.
+# SERVER_TIMING_HEADER — отдавать ли заголовок Server-Timing клиентам (по умолчанию только при DEBUG);
+# каждый запрос пишется в журнал core.timing строкой JSON с уровнем INFO,
+# запросы не быстрее SERVER_TIMING_SLOW_MS — с уровнем WARNING
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'True') == 'True'
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', str(DEBUG)) == 'True'
+SERVER_TIMING_SLOW_MS = int(os.getenv('SERVER_TIMING_SLOW_MS', 500))
+
+# Метрики Prometheus (core/metrics.py), адрес /metrics.
+# METRICS_DIR — общий каталог снимков, когда воркеров несколько (пусто — только метрики процесса,
+# отвечающего на запрос); METRICS_TOKEN — если задан, /metrics требует Authorization: Bearer <токен>,
+# без него /metrics отвечает только при DEBUG
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_FLUSH_SECONDS = 5
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+# Поиск N+1 в запросах (core/nplusone.py): 'warn', 'log' или 'raise'; пусто — выключен.
+# По умолчанию предупреждения при DEBUG; в CI — NPLUSONE_MODE=raise. Порог — сколько раз
+# один и тот же запрос (с точностью до значений) может выполниться за запрос HTTP
+NPLUSONE_MODE = os.getenv('NPLUSONE_MODE', 'warn' if DEBUG else '') or None
+NPLUSONE_THRESHOLD = int(os.getenv('NPLUSONE_THRESHOLD', 3))
+
+# Домашняя лента (fan-out on write)
+# Посты авторов, у которых подписчиков не меньше лимита, не раскладываются по лентам при записи,
+# а подмешиваются при чтении
+TIMELINE_FANOUT_FOLLOWER_LIMIT = int(os.getenv('TIMELINE_FANOUT_FOLLOWER_LIMIT', 10000))
+# Сколько последних постов автора досыпать в ленту при подписке
+TIMELINE_BACKFILL_SIZE = 50
+
+# Трендовые посты (core/trending.py): таблица пересчитывается в фоне после чтения posts/popular/,
+# не чаще раза в TRENDING_REFRESH_SECONDS (0 — только командой refresh_trending)
+TRENDING_WINDOW_HOURS = int(os.getenv('TRENDING_WINDOW_HOURS', 72))      # окно учёта постов
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', 12))  # период полураспада активности
+TRENDING_SIZE = 10  # сколько постов отдаёт posts/popular/
+TRENDING_REFRESH_SECONDS = int(os.getenv('TRENDING_REFRESH_SECONDS', 300))
+
+# Дерево комментариев: максимальная глубина и сколько ответов показывать на одном уровне
+COMMENT_TREE_MAX_DEPTH = 4
+COMMENT_REPLIES_PAGE_SIZE = 20
+
+# Поиск постов: релевантность считается для стольких самых новых совпадений запроса
+SEARCH_MAX_CANDIDATES = int(os.getenv('SEARCH_MAX_CANDIDATES', 1000))
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -124,6 +228,12 @@ EMAIL_USE_SSL = config('EMAIL_USE_SSL', cast=bool)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
 
+# Outbox исходящих писем (core/mailer.py): письма отправляются фоновым потоком пачками
+# через одно соединение; неудачные — с экспоненциальной задержкой (команда send_outbox)
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = 60
+
 # dummy update
 
 # updated 2025-07-12 11:27:40
@@ -5,12 +5,14 @@ from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.conf import settings
 from django.conf.urls.static import static
+from core.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('core.urls')),  # подключаем основные API маршруты
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),  # получение JWT
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),  # обновление JWT
+    path('metrics', metrics_view, name='metrics'),  # метрики Prometheus
 ]
 
 if settings.DEBUG:
@@ -1,7 +1,7 @@
 # backend/core/admin.py
 
 from django.contrib import admin
-from .models import Profile, Post, Repost, Comment, Favorite, PasswordResetToken
+from .models import Profile, Post, Repost, Comment, Favorite, PasswordResetToken, EmailOutbox
 
 
 @admin.register(Profile)
@@ -44,6 +44,15 @@ class PasswordResetTokenAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'token')
     list_filter = ('created_at', 'expires_at')
 
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    search_fields = ('subject', 'to')
+    list_filter = ('status', 'created_at')
+    # Тело письма может содержать действующие токены (сброс пароля) — в админке не показывается
+    exclude = ('body',)
+
 # dummy update
 
 # updated 2025-07-12 11:27:40
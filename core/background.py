@@ -0,0 +1,124 @@
+# backend/core/background.py
+# Фоновая обработка в процессе приложения:
+# - BackgroundWorker: очередь в памяти и поток-обработчик, который забирает элементы пачками
+#   и передаёт их в handle_batch (например, для bulk_create)
+# - при BACKGROUND_WORKERS_ASYNC = False поток не запускается, очередь разбирается только
+#   вызовом flush() — так тесты выполняют фоновую работу детерминированно
+# - retry_items=True — для обработчиков, которые пишут пачку одной транзакцией: если пачка упала,
+#   её элементы обрабатываются по одному, и один ошибочный элемент не теряет остальные
+# - принятые, обработанные и упавшие элементы и длина очереди видны в /metrics (core/metrics.py)
+
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .metrics import QUEUE_DEPTH, QUEUE_ITEMS, registry
+
+logger = logging.getLogger(__name__)
+
+# Все очереди процесса — для метрики длины очереди
+workers = []
+
+
+def workers_async():
+    return getattr(settings, 'BACKGROUND_WORKERS_ASYNC', True)
+
+
+class BackgroundWorker:
+    """
+    Очередь с фоновым потоком-обработчиком.
+    submit(item) — добавить элемент; flush() — обработать всё накопленное в текущем потоке
+    и дождаться пачки, которую обрабатывает фоновый поток.
+    """
+
+    def __init__(self, name, handle_batch, batch_size=500, idle_timeout=1.0, retry_items=False):
+        self.name = name
+        self.handle_batch = handle_batch
+        self.batch_size = batch_size
+        self.retry_items = retry_items
+        self.idle_timeout = idle_timeout
+        self.queue = queue.Queue()
+        self.processing = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.thread = None
+        workers.append(self)
+        atexit.register(self.flush)
+
+    def submit(self, item):
+        self.queue.put(item)
+        QUEUE_ITEMS.inc(self.name, 'submitted')
+        if workers_async():
+            self.ensure_started()
+
+    def ensure_started(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name=f'{self.name}-worker', daemon=True)
+                self.thread.start()
+
+    def take_batch(self, block):
+        items = []
+        try:
+            items.append(self.queue.get(block=block, timeout=self.idle_timeout if block else None))
+            while len(items) < self.batch_size:
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return items
+
+    def process(self, items):
+        with self.processing:
+            self.handle(items)
+
+    def handle(self, items):
+        try:
+            self.handle_batch(items)
+        except Exception:
+            if self.retry_items and len(items) > 1:
+                logger.warning("%s: пачка из %d элементов не записана, повтор по одному", self.name, len(items))
+                for item in items:
+                    self.handle([item])
+                return
+            QUEUE_ITEMS.inc(self.name, 'failed', amount=len(items))
+            logger.exception("%s: не удалось обработать пачку из %d элементов", self.name, len(items))
+        else:
+            QUEUE_ITEMS.inc(self.name, 'processed', amount=len(items))
+
+    def run(self):
+        while True:
+            items = self.take_batch(block=True)
+            if not items:
+                continue
+            close_old_connections()
+            self.process(items)
+            close_old_connections()
+
+    def flush(self):
+        """Обрабатывает всю очередь в текущем потоке; возвращает число обработанных элементов."""
+        processed = 0
+        while True:
+            items = self.take_batch(block=False)
+            if not items:
+                break
+            self.process(items)
+            processed += len(items)
+        # Дожидаемся пачки, которую фоновый поток мог взять до вызова flush
+        with self.processing:
+            pass
+        return processed
+
+    def pending(self):
+        return self.queue.qsize()
+
+
+def queue_depths():
+    return [(QUEUE_DEPTH.name, (worker.name,), worker.pending()) for worker in workers]
+
+
+registry.add_collector(queue_depths)
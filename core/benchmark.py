@@ -0,0 +1,177 @@
+# backend/core/benchmark.py
+# Замеры маршрутов API (команда benchmark):
+# - маршруты берутся из core/urls.py; замеряются те, что отвечают на GET, параметры пути
+#   (pk, username, name) подставляются из данных в базе (обычно набор seed_dataset)
+# - каждый маршрут запрашивается через тестовый клиент Django repeat раз после прогрева;
+#   для каждого считаются p50 / p95 / p99 времени ответа и число SQL-запросов
+# - результаты сравниваются с сохранённым базовым файлом (BENCHMARK_BASELINE): регрессия —
+#   p95 больше базового на долю threshold или запросов больше, чем в базовом замере
+
+import json
+import math
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from .models import Comment, Hashtag, Post, Profile
+
+# Параметры строки запроса для маршрутов, которым они нужны: {маршрут: {параметр: имя аргумента}}
+ROUTE_QUERY_ARGUMENTS = {'post-search': {'q': 'name'}}
+
+
+def baseline_path():
+    return Path(getattr(settings, 'BENCHMARK_BASELINE', settings.BASE_DIR / 'benchmarks' / 'baseline.json'))
+
+
+def percentile(values, q):
+    """Перцентиль q (0..1) по методу ближайшего ранга."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def route_arguments(user):
+    """
+    Значения параметров пути: пост с наибольшим числом комментариев, самый популярный автор,
+    самый частый хэштег; username по умолчанию — пользователь, от имени которого идут запросы.
+    """
+    post_id = Post.objects.order_by('-comment_count', '-id').values_list('id', flat=True).first()
+    username = (
+        Profile.objects.order_by('-followers_count', 'id').values_list('user__username', flat=True).first()
+        or user.username
+    )
+    tag = (
+        Hashtag.objects.annotate(n=Count('post_links')).order_by('-n', 'id').values_list('name', flat=True).first()
+        or 'django'
+    )
+    return {'pk': post_id or Comment.objects.values_list('post_id', flat=True).first() or 0,
+            'username': username, 'name': tag}
+
+
+def get_routes(arguments):
+    """[(имя маршрута, путь)] для маршрутов core/urls.py, которые отвечают на GET."""
+    from core import urls
+
+    routes = []
+    for pattern in urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if view_class is None or not hasattr(view_class, 'get'):
+            continue
+        kwargs = {name: arguments[name] for name in pattern.pattern.converters}
+        path = reverse(pattern.name, kwargs=kwargs)
+        query = ROUTE_QUERY_ARGUMENTS.get(pattern.name)
+        if query:
+            path += '?' + urlencode({param: arguments[name] for param, name in query.items()})
+        routes.append((pattern.name, path))
+    return routes
+
+
+class QueryCounter:
+    """Обёртка выполнения запросов: только считает их, без журнала отладочного курсора."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(client, path, repeat, headers):
+    """Прогрев и repeat запросов: {status, p50_ms, p95_ms, p99_ms, queries}."""
+    client.get(path, **headers)
+    timings, queries, status = [], [], None
+    for _ in range(repeat):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            response = client.get(path, **headers)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        status = response.status_code
+    return {
+        'path': path,
+        'status': status,
+        'p50_ms': round(percentile(timings, 0.50), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'p99_ms': round(percentile(timings, 0.99), 2),
+        'queries': max(queries),
+    }
+
+
+def auth_headers(user):
+    if user is None:
+        return {}
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+
+def run_benchmark(user, repeat=30, anonymous=False, only=None):
+    """
+    Замеряет маршруты от имени user (или анонимно). only — имена маршрутов для замера.
+    Возвращает {'meta': {...}, 'routes': {имя: результат}}.
+    """
+    client = Client(SERVER_NAME='localhost')
+    headers = auth_headers(None if anonymous else user)
+    results = {}
+    for name, path in get_routes(route_arguments(user)):
+        if only and name not in only:
+            continue
+        results[name] = measure(client, path, repeat, headers)
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(timespec='seconds'),
+            'vendor': connection.vendor,
+            'repeat': repeat,
+            'anonymous': anonymous,
+            'users': User.objects.count(),
+            'posts': Post.objects.count(),
+        },
+        'routes': results,
+    }
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Сравнение с базовым замером: [(имя, результат, базовый результат или None, регрессии)].
+    Регрессии — список строк: рост p95 больше threshold, рост числа запросов, другой статус ответа.
+    """
+    rows = []
+    for name, result in results['routes'].items():
+        base = baseline.get('routes', {}).get(name)
+        problems = []
+        if base is not None:
+            if result['p95_ms'] > base['p95_ms'] * (1 + threshold):
+                problems.append(f"p95 {base['p95_ms']} -> {result['p95_ms']} мс")
+            if result['queries'] > base['queries']:
+                problems.append(f"запросов {base['queries']} -> {result['queries']}")
+            if result['status'] != base['status']:
+                problems.append(f"статус {base['status']} -> {result['status']}")
+        rows.append((name, result, base, problems))
+    return rows
+
+
+def load_baseline(path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open(encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baseline(results, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2, sort_keys=True)
+        file.write('\n')
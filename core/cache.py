@@ -0,0 +1,107 @@
+# backend/core/cache.py
+# Кэш ответов API для анонимных GET-запросов поверх Django cache framework:
+# - каждая запись помечена тегами ('user:<id>', 'post:<id>', 'trending')
+# - у каждого тега в кэше хранится версия; запись действительна, пока версии всех её тегов не изменились
+# - invalidate_tags удаляет версии тегов, после чего все помеченные ими записи считаются устаревшими
+#   (вызывается из обработчиков в core/signals.py)
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .metrics import record_cache
+
+TAG_PREFIX = 'resp-tag:'
+ENTRY_PREFIX = 'resp:'
+
+
+def response_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def cache_timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60)
+
+
+def user_tag(user_id):
+    return f'user:{user_id}'
+
+
+def post_tag(post_id):
+    return f'post:{post_id}'
+
+
+TRENDING_TAG = 'trending'
+
+
+def tag_versions(tags, create=False):
+    """
+    Текущие версии тегов {тег: версия}. Теги без версии пропускаются,
+    либо (create=True) получают новую версию.
+    """
+    cache = response_cache()
+    keys = {TAG_PREFIX + tag: tag for tag in tags}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    if create:
+        for key, tag in keys.items():
+            if key not in found:
+                # add не перезапишет версию, которую успел создать параллельный запрос
+                cache.add(key, uuid.uuid4().hex, None)
+                versions[tag] = cache.get(key)
+    return versions
+
+
+def invalidate_tags(*tags):
+    """Делает устаревшими все записи, помеченные любым из tags."""
+    tags = [tag for tag in tags if tag]
+    if tags:
+        response_cache().delete_many([TAG_PREFIX + tag for tag in tags])
+
+
+class CachedResponseMixin:
+    """
+    Кэширует ответы GET для анонимных пользователей.
+    Представление реализует get_cache_tags(objects), где objects — объекты, попавшие в ответ;
+    ключ записи — полный URL запроса (с параметрами пагинации).
+    """
+    response_objects = ()
+
+    def response_cache_enabled(self, request):
+        return cache_timeout() > 0 and not request.user.is_authenticated
+
+    def get_cache_tags(self, objects):
+        return []
+
+    def get_response_cache_key(self, request):
+        url = request.build_absolute_uri()
+        return ENTRY_PREFIX + hashlib.md5(url.encode('utf-8')).hexdigest()
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self.response_objects = page if page is not None else queryset
+        return page
+
+    def get(self, request, *args, **kwargs):
+        if not self.response_cache_enabled(request):
+            return super().get(request, *args, **kwargs)
+
+        cache = response_cache()
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None and tag_versions(entry['tags']) == entry['tags']:
+            record_cache('response', True)
+            response = Response(entry['data'])
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record_cache('response', False)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            tags = {tag for tag in self.get_cache_tags(self.response_objects) if tag}
+            cache.set(key, {'tags': tag_versions(tags, create=True), 'data': response.data}, cache_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
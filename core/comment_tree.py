@@ -0,0 +1,85 @@
+# backend/core/comment_tree.py
+# Дерево комментариев поста, собираемое в памяти:
+# - все комментарии поста вместе с авторами и их профилями читаются одним запросом
+# - дерево строится по parent_id без дополнительных запросов
+# - глубина ограничена (max_depth), ширина — размером страницы ответов (page_size);
+#   для обрезанных веток отдаётся ссылка «загрузить ещё» (replies_next)
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment
+from .pagination import decode_cursor, encode_cursor
+
+
+def max_depth_default():
+    return getattr(settings, 'COMMENT_TREE_MAX_DEPTH', 4)
+
+
+def replies_page_size():
+    return getattr(settings, 'COMMENT_REPLIES_PAGE_SIZE', 20)
+
+
+def load_post_comments(post_id):
+    """Все комментарии поста с пользователями и профилями — один запрос."""
+    return list(
+        Comment.objects.filter(post_id=post_id)
+        .select_related('user__profile')
+        .order_by('created_at', 'id')
+    )
+
+
+def parse_cursor(cursor):
+    """Позиция (created_at, id) из курсора или None, если курсор пустой или повреждён."""
+    values = decode_cursor(cursor) if cursor else None
+    if not values or len(values) != 2:
+        return None
+    created_at = parse_datetime(str(values[0]))
+    if created_at is None or not isinstance(values[1], int):
+        return None
+    return created_at, values[1]
+
+
+class CommentTree:
+    """
+    Дерево комментариев поста. Узлам (объектам Comment) проставляются атрибуты:
+    - tree_replies: видимые ответы (не больше page_size, не глубже max_depth)
+    - tree_replies_count: общее число прямых ответов
+    - tree_has_more: есть ли ответы, не попавшие в tree_replies
+    - tree_cursor: курсор продолжения ответов (None — продолжать с начала, если ветка обрезана по глубине)
+    """
+
+    def __init__(self, comments, max_depth, page_size):
+        self.max_depth = max_depth
+        self.page_size = page_size
+        self.children = {}
+        for comment in comments:
+            self.children.setdefault(comment.parent_id, []).append(comment)
+
+    def _slice(self, replies, position=None):
+        if position is not None:
+            replies = [c for c in replies if (c.created_at, c.id) > position]
+        visible = replies[:self.page_size]
+        cursor = None
+        if len(replies) > self.page_size:
+            cursor = encode_cursor([visible[-1].created_at, visible[-1].id])
+        return visible, cursor
+
+    def page(self, parent_id=None, cursor=None):
+        """Страница ответов на parent_id (None — корневые комментарии) и курсор следующей страницы."""
+        visible, next_cursor = self._slice(self.children.get(parent_id, []), parse_cursor(cursor))
+        for comment in visible:
+            self._fill(comment, depth=1)
+        return visible, next_cursor
+
+    def _fill(self, comment, depth):
+        replies = self.children.get(comment.id, [])
+        comment.tree_replies_count = len(replies)
+        if depth >= self.max_depth:
+            comment.tree_replies, comment.tree_cursor = [], None
+            comment.tree_has_more = bool(replies)
+            return
+        comment.tree_replies, comment.tree_cursor = self._slice(replies)
+        comment.tree_has_more = comment.tree_cursor is not None
+        for reply in comment.tree_replies:
+            self._fill(reply, depth + 1)
@@ -0,0 +1,50 @@
+# backend/core/conditional.py
+# Условные GET-запросы (ETag / Last-Modified) для часто опрашиваемых списков:
+# - валидатор считается дешёвыми запросами (id, время изменения, счётчики, версии тегов кэша),
+#   без загрузки объектов и без сериализаторов
+# - если клиент прислал совпадающий If-None-Match / If-Modified-Since, сразу отдаётся 304 Not Modified
+
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .metrics import record_cache
+
+
+def make_etag(*parts):
+    """Слабый ETag из произвольных значений (repr), включая URL запроса и текущего пользователя."""
+    digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    return 'W/' + quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    Представление реализует get_etag(request) и/или get_last_modified(request) (datetime или None).
+    Оба метода вызываются до основной работы представления.
+    """
+
+    def get_etag(self, request):
+        return None
+
+    def get_last_modified(self, request):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        last_modified = self.get_last_modified(request)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        # Попадание — клиент получил 304 и использует свою копию ответа
+        record_cache('conditional', not_modified is not None)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            if etag:
+                response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
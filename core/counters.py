@@ -0,0 +1,60 @@
+# backend/core/counters.py
+# Денормализованные счётчики поста (like_count, comment_count, repost_count):
+# - change_post_counter: атомарное изменение счётчика через F()-выражение, без чтения строки;
+#   заодно отмечает время активности поста (activity_at) для пересчёта трендов
+# - recount_post_counters: полный пересчёт счётчиков по исходным таблицам (для команды recount_post_counters);
+#   меняет только посты с разошедшимися счётчиками
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Now
+
+from .models import Post, Comment, Repost
+
+POST_COUNTER_FIELDS = ('like_count', 'comment_count', 'repost_count')
+
+
+def change_post_counter(post_ids, field, delta):
+    """
+    Изменяет счётчик field у постов post_ids на delta одним UPDATE.
+    Значение не опускается ниже нуля.
+    """
+    if field not in POST_COUNTER_FIELDS:
+        raise ValueError(f"Неизвестный счётчик поста: {field}")
+    if isinstance(post_ids, int):
+        post_ids = [post_ids]
+    if not post_ids or not delta:
+        return 0
+    return Post.objects.filter(pk__in=post_ids).update(
+        **{field: Greatest(F(field) + delta, Value(0))}, activity_at=Now(),
+    )
+
+
+def _count_subquery(queryset, field):
+    counted = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def recount_post_counters(queryset=None):
+    """
+    Пересчитывает все счётчики для постов queryset (по умолчанию — для всех)
+    коррелированными подзапросами в одном UPDATE. Обновляются только посты, у которых счётчики
+    разошлись с исходными таблицами: activity_at остальных не трогается, и пересчёт не поднимает
+    их в пересчёт трендов. Возвращает число исправленных постов.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    counts = {
+        'like_count': _count_subquery(Post.likes.through.objects.all(), 'post'),
+        'comment_count': _count_subquery(Comment.objects.all(), 'post'),
+        'repost_count': _count_subquery(Repost.objects.all(), 'original_post'),
+    }
+    stale = queryset.alias(**{f'actual_{field}': expression for field, expression in counts.items()}).exclude(
+        **{field: F(f'actual_{field}') for field in counts}
+    )
+    return stale.update(**counts, activity_at=Now())
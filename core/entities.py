@@ -0,0 +1,198 @@
+# backend/core/entities.py
+# Упоминания (@username) и хэштеги (#тег) в текстах постов и комментариев:
+# - текст разбирается один раз при сохранении (сигнал pre_save), результат со смещениями
+#   хранится в поле entities — ни сервер при чтении, ни клиент текст заново не разбирают
+# - упоминания сопоставляются с пользователями одним запросом, несуществующие имена отбрасываются
+# - индекс PostHashtag / PostMention для постов и CommentHashtag / CommentMention для комментариев:
+#   «посты с #тегом» и «посты, где меня упомянули» читаются диапазоном по индексу (EntityPagination)
+# - упомянутые пользователи получают уведомления 'mention' одной пачкой (core/notifications.py)
+# Смещения — позиции символов (кодовых точек Unicode) в тексте вместе с '@' / '#':
+# start включительно, end — нет.
+
+import re
+
+from django.contrib.auth.models import User
+
+from .models import Comment, CommentHashtag, CommentMention, Hashtag, Post, PostHashtag, PostMention
+from .notifications import notify
+from .pagination import KeysetPagination, keyset_filter
+
+MENTION_RE = re.compile(r'(?<![\w.+-])@([\w.+-]+)')
+HASHTAG_RE = re.compile(r'(?<![\w#])#(\w+)')
+USERNAME_MAX_LENGTH = 150
+HASHTAG_MAX_LENGTH = 100
+ENTITY_ORDERING = ('-created_at', '-post_id')
+
+# Индекс сущностей модели: (строки упоминаний, строки хэштегов, поле ссылки на объект)
+ENTITY_INDEXES = {
+    Post: (PostMention, PostHashtag, 'post'),
+    Comment: (CommentMention, CommentHashtag, 'comment'),
+}
+
+
+def normalize_tag(name):
+    return (name or '').lstrip('#').lower()
+
+
+def extract_entities(text):
+    """
+    Разбор текста без обращений к БД: ([(start, end, username)], [(start, end, tag)]).
+    Точка, плюс и дефис в конце имени считаются пунктуацией («привет, @bob.»);
+    хэштег должен содержать хотя бы одну букву (#1 — не хэштег).
+    """
+    text = text or ''
+    mentions = []
+    for match in MENTION_RE.finditer(text):
+        username = match.group(1).rstrip('.+-')
+        if username and len(username) <= USERNAME_MAX_LENGTH:
+            mentions.append((match.start(), match.start() + 1 + len(username), username))
+    hashtags = []
+    for match in HASHTAG_RE.finditer(text):
+        tag = match.group(1)
+        if len(tag) <= HASHTAG_MAX_LENGTH and any(char.isalpha() for char in tag):
+            hashtags.append((match.start(), match.end(), tag))
+    return mentions, hashtags
+
+
+def resolve_usernames(usernames):
+    """{username: id} существующих пользователей — одним запросом; без имён запроса нет."""
+    if not usernames:
+        return {}
+    return dict(User.objects.filter(username__in=set(usernames)).values_list('username', 'id'))
+
+
+def parse_entities(text):
+    """
+    Сущности текста для поля entities:
+    {'mentions': [{start, end, username, user_id}], 'hashtags': [{start, end, tag}]}.
+    Пользователи ищутся одним запросом и только если в тексте есть упоминания.
+    """
+    mentions, hashtags = extract_entities(text)
+    return build_entities(mentions, hashtags, resolve_usernames(username for _, _, username in mentions))
+
+
+def parse_entities_many(texts):
+    """parse_entities для пачки текстов: пользователи всех текстов ищутся одним запросом."""
+    extracted = [extract_entities(text) for text in texts]
+    users = resolve_usernames(username for mentions, _ in extracted for _, _, username in mentions)
+    return [build_entities(mentions, hashtags, users) for mentions, hashtags in extracted]
+
+
+def build_entities(mentions, hashtags, users):
+    return {
+        'mentions': [
+            {'start': start, 'end': end, 'username': username, 'user_id': users[username]}
+            for start, end, username in mentions if username in users
+        ],
+        'hashtags': [
+            {'start': start, 'end': end, 'tag': normalize_tag(tag)}
+            for start, end, tag in hashtags
+        ],
+    }
+
+
+def mentioned_user_ids(entities):
+    return list(dict.fromkeys(mention['user_id'] for mention in (entities or {}).get('mentions', ())))
+
+
+def hashtag_names(entities):
+    return list(dict.fromkeys(hashtag['tag'] for hashtag in (entities or {}).get('hashtags', ())))
+
+
+def hashtag_ids(names):
+    """{name: id} для хэштегов names; недостающие создаются одной вставкой."""
+    Hashtag.objects.bulk_create([Hashtag(name=name) for name in names], ignore_conflicts=True)
+    return dict(Hashtag.objects.filter(name__in=names).values_list('name', 'id'))
+
+
+def index_entities(instance, created):
+    """
+    Приводит строки индекса поста или комментария (ENTITY_INDEXES) к instance.entities.
+    Возвращает id пользователей, упомянутых впервые (им отправляются уведомления).
+    Для нового объекта без упоминаний и хэштегов запросов нет.
+    """
+    mention_model, hashtag_model, field = ENTITY_INDEXES[type(instance)]
+    owner = {field: instance}
+    user_ids = mentioned_user_ids(instance.entities)
+    names = hashtag_names(instance.entities)
+    existing_users, existing_tags = set(), {}
+    if not created:
+        existing_users = set(mention_model.objects.filter(**owner).values_list('user_id', flat=True))
+        existing_tags = dict(hashtag_model.objects.filter(**owner).values_list('hashtag__name', 'hashtag_id'))
+        removed_users = existing_users.difference(user_ids)
+        if removed_users:
+            mention_model.objects.filter(user_id__in=removed_users, **owner).delete()
+        removed_tags = [pk for name, pk in existing_tags.items() if name not in names]
+        if removed_tags:
+            hashtag_model.objects.filter(hashtag_id__in=removed_tags, **owner).delete()
+
+    new_users = [pk for pk in user_ids if pk not in existing_users]
+    if new_users:
+        mention_model.objects.bulk_create([
+            mention_model(user_id=pk, created_at=instance.created_at, **owner) for pk in new_users
+        ], ignore_conflicts=True)
+    new_tags = [name for name in names if name not in existing_tags]
+    if new_tags:
+        hashtag_model.objects.bulk_create([
+            hashtag_model(hashtag_id=pk, created_at=instance.created_at, **owner)
+            for pk in hashtag_ids(new_tags).values()
+        ], ignore_conflicts=True)
+    return new_users
+
+
+def reindex_entities(model, objects):
+    """
+    Заново разбирает тексты пачки постов или комментариев model и пересобирает их строки индекса
+    (команда reindex_entities). Упомянутые пользователи всей пачки ищутся одним запросом.
+    """
+    mention_model, hashtag_model, field = ENTITY_INDEXES[model]
+    objects = list(objects)
+    for instance, entities in zip(objects, parse_entities_many(instance.content for instance in objects)):
+        instance.entities = entities
+    model.objects.bulk_update(objects, ['entities'])
+    mention_model.objects.filter(**{f'{field}__in': objects}).delete()
+    hashtag_model.objects.filter(**{f'{field}__in': objects}).delete()
+    mention_model.objects.bulk_create([
+        mention_model(user_id=pk, created_at=instance.created_at, **{field: instance})
+        for instance in objects for pk in mentioned_user_ids(instance.entities)
+    ])
+    tags = hashtag_ids({name for instance in objects for name in hashtag_names(instance.entities)})
+    hashtag_model.objects.bulk_create([
+        hashtag_model(hashtag_id=tags[name], created_at=instance.created_at, **{field: instance})
+        for instance in objects for name in hashtag_names(instance.entities)
+    ])
+    return len(objects)
+
+
+def notify_mentions(sender_id, user_ids, post_id, comment_id=None):
+    """Уведомления 'mention' упомянутым пользователям — одной пачкой в очередь записи."""
+    notify([
+        {
+            'recipient_id': user_id,
+            'sender_id': sender_id,
+            'notification_type': 'mention',
+            'post_id': post_id,
+            'comment_id': comment_id,
+        }
+        for user_id in user_ids
+    ])
+
+
+class EntityPagination(KeysetPagination):
+    """
+    Keyset-пагинация постов по строкам индекса (PostHashtag / PostMention): представление
+    отдаёт строки методом get_entity_links(), страница — диапазон по индексу, затем посты по id.
+    Курсор — (created_at, id) поста, как у остальных списков постов.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.links = view.get_entity_links()
+        return super().paginate_queryset(queryset, request, view)
+
+    def fetch_page(self, queryset, position, limit):
+        links = self.links
+        if position is not None:
+            links = links.filter(keyset_filter(ENTITY_ORDERING, position))
+        post_ids = list(links.order_by(*ENTITY_ORDERING).values_list('post_id', flat=True)[:limit])
+        posts = queryset.in_bulk(post_ids) if post_ids else {}
+        return [posts[pk] for pk in post_ids if pk in posts]
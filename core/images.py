@@ -0,0 +1,211 @@
+# backend/core/images.py
+# Обработка аватаров и баннеров профиля:
+# - check_image_upload: проверка загрузки в запросе — только заголовок файла, без декодирования;
+#   изображения больше IMAGE_MAX_PIXELS отклоняются (защита от «декомпрессионных бомб»)
+# - process_profile_image: в фоновом потоке декодирует оригинал, поворачивает по EXIF и отбрасывает
+#   метаданные, создаёт уменьшенные копии в JPEG и WebP; имена файлов — хэш содержимого оригинала,
+#   поэтому одинаковые загрузки не дублируются, а файлы можно кэшировать бессрочно
+# - после обработки поле профиля указывает на очищенную копию, а оригинал удаляется
+# - image_url: URL копии нужного размера (и формата) для сериализаторов
+
+import hashlib
+import io
+import logging
+import warnings
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from .background import BackgroundWorker
+from .cache import invalidate_tags, user_tag
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+
+# Размеры копий: {поле: {размер: (ширина, высота)}}; копия обрезается до пропорций размера
+PROFILE_IMAGE_VARIANTS = {
+    'avatar': {'sm': (48, 48), 'md': (96, 96), 'lg': (400, 400)},
+    'banner': {'sm': (600, 200), 'lg': (1500, 500)},
+}
+# Копия, на которую после обработки указывает само поле (avatar / banner)
+PRIMARY_VARIANT = {'avatar': 'lg', 'banner': 'lg'}
+
+
+class ImageRejected(ValueError):
+    """Файл не является допустимым изображением."""
+
+
+def max_pixels():
+    return getattr(settings, 'IMAGE_MAX_PIXELS', 25_000_000)
+
+
+def jpeg_quality():
+    return getattr(settings, 'IMAGE_JPEG_QUALITY', 85)
+
+
+def webp_quality():
+    return getattr(settings, 'IMAGE_WEBP_QUALITY', 80)
+
+
+def _check_size(image):
+    width, height = image.size
+    if width * height > max_pixels():
+        raise ImageRejected(f"Слишком большое изображение: {width}x{height}")
+
+
+def check_image_upload(uploaded):
+    """Проверяет размеры загруженного изображения по заголовку файла (без декодирования пикселей)."""
+    position = uploaded.tell()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', Image.DecompressionBombWarning)
+            with Image.open(uploaded) as image:
+                _check_size(image)
+    except (Image.DecompressionBombWarning, Image.DecompressionBombError) as exc:
+        raise ImageRejected(str(exc)) from exc
+    finally:
+        uploaded.seek(position)
+
+
+def _decode(data):
+    """Декодирует изображение с проверкой размеров до загрузки пикселей; применяет поворот из EXIF."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', Image.DecompressionBombWarning)
+            image = Image.open(io.BytesIO(data))
+            _check_size(image)
+            image.load()
+    except (OSError, SyntaxError, Image.DecompressionBombWarning, Image.DecompressionBombError) as exc:
+        raise ImageRejected(str(exc)) from exc
+    # exif_transpose поворачивает пиксели и убирает ориентацию; остальные метаданные
+    # не переносятся, потому что при сохранении exif не передаётся
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    return image
+
+
+def _fit(image, size):
+    """Обрезка до пропорций size и уменьшение; меньшие исходники не увеличиваются."""
+    width, height = size
+    scale = min(1.0, image.width / width, image.height / height)
+    target = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return ImageOps.fit(image, target, method=Image.Resampling.LANCZOS)
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'jpeg':
+        if image.mode == 'RGBA':
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        image.save(buffer, 'JPEG', quality=jpeg_quality(), optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'WEBP', quality=webp_quality(), method=4)
+    return buffer.getvalue()
+
+
+def _store(name, content):
+    # Имя содержит хэш исходника: если файл уже есть, это та же картинка
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(content))
+    return name
+
+
+def build_variants(field, data):
+    """Создаёт копии изображения data для поля field; возвращает {размер: {...}}."""
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    image = _decode(data)
+    variants = {}
+    for size_name, size in PROFILE_IMAGE_VARIANTS[field].items():
+        resized = _fit(image, size)
+        base = f'{field}s/v/{digest[:2]}/{digest}_{size_name}'
+        variants[size_name] = {
+            'jpeg': _store(f'{base}.jpg', _encode(resized, 'jpeg')),
+            'webp': _store(f'{base}.webp', _encode(resized, 'webp')),
+            'width': resized.width,
+            'height': resized.height,
+        }
+    return variants
+
+
+def process_profile_image(profile_id, field, name):
+    """
+    Обрабатывает загруженный файл name поля field профиля. Если за время обработки
+    в поле загрузили другой файл, результат не записывается.
+    """
+    with default_storage.open(name, 'rb') as source:
+        data = source.read()
+    try:
+        variants = build_variants(field, data)
+    except ImageRejected as exc:
+        logger.warning("Профиль %s: %s отклонён: %s", profile_id, name, exc)
+        Profile.objects.filter(pk=profile_id, **{field: name}).update(**{field: None, f'{field}_variants': {}})
+        default_storage.delete(name)
+        return
+
+    primary = variants[PRIMARY_VARIANT[field]]['jpeg']
+    updated = Profile.objects.filter(pk=profile_id, **{field: name}).update(
+        **{field: primary, f'{field}_variants': variants}
+    )
+    if updated and name != primary:
+        default_storage.delete(name)
+    user_id = Profile.objects.filter(pk=profile_id).values_list('user_id', flat=True).first()
+    invalidate_tags(user_tag(user_id))
+
+
+def _process_batch(items):
+    for profile_id, field, name in items:
+        try:
+            process_profile_image(profile_id, field, name)
+        except Exception:
+            logger.exception("Не удалось обработать %s профиля %s", field, profile_id)
+
+
+image_processor = BackgroundWorker('images', _process_batch, batch_size=10)
+
+
+def schedule_profile_images(profile, fields):
+    """Ставит загруженные в поля fields файлы профиля в очередь обработки после фиксации транзакции."""
+    for field in fields:
+        name = getattr(profile, field).name
+        if name:
+            transaction.on_commit(lambda field=field, name=name: image_processor.submit((profile.pk, field, name)))
+
+
+def flush_images():
+    """Синхронно обрабатывает очередь изображений; возвращает число обработанных файлов."""
+    return image_processor.flush()
+
+
+def accepts_webp(request):
+    # Формат выбирается параметром запроса, а не заголовком Accept: кэш ответов и ETag
+    # различают ответы только по URL (core/cache.py, core/conditional.py)
+    if request is None:
+        return False
+    params = getattr(request, 'query_params', request.GET)
+    return params.get('image_format') == 'webp'
+
+
+def image_url(profile, field, size, request=None, absolute=True):
+    """
+    URL изображения профиля размера size ('sm', 'md', 'lg'); WebP — для запросов с ?image_format=webp.
+    Пока копии не готовы — URL оригинала.
+    absolute=False — относительный URL даже при наличии request.
+    """
+    if profile is None:
+        return None
+    image = getattr(profile, field)
+    if not image:
+        return None
+    variants = getattr(profile, f'{field}_variants') or {}
+    variant = variants.get(size) or variants.get(PRIMARY_VARIANT[field])
+    if variant:
+        url = default_storage.url(variant['webp' if accepts_webp(request) else 'jpeg'])
+    else:
+        url = image.url
+    return request.build_absolute_uri(url) if request is not None and absolute else url
@@ -0,0 +1,52 @@
+# backend/core/likes.py
+# Лайки постов:
+# - add_like / remove_like (PostLikeAPIView): строка вставляется / удаляется напрямую в промежуточной
+#   таблице Post.likes, и счётчик, уведомление и сброс кэша применяются, только если строка
+#   действительно вставлена / удалена — повторный или параллельный запрос не учитывается дважды
+#   (post.likes.add сначала читает существующие связи, и два параллельных запроса оба считают лайк новым)
+# - likes_changed / notify_likes — те же действия для сигналов m2m_changed (post.likes.add/remove/clear
+#   из админки и скриптов)
+
+from django.db import IntegrityError, transaction
+
+from .cache import invalidate_tags, post_tag
+from .counters import change_post_counter
+from .models import Post
+from .notifications import notify
+
+
+def likes_changed(post_ids, delta):
+    """Изменяет like_count постов post_ids на delta и сбрасывает кэш их ответов."""
+    if post_ids and delta:
+        change_post_counter(post_ids, 'like_count', delta)
+        invalidate_tags(*(post_tag(post_id) for post_id in post_ids))
+
+
+def notify_likes(likes):
+    """Уведомления авторам постов; likes — тройки (post_id, author_id, user_id)."""
+    notify([
+        {'recipient_id': author_id, 'sender_id': user_id, 'notification_type': 'like', 'post_id': post_id}
+        for post_id, author_id, user_id in likes
+    ])
+
+
+def add_like(post, user):
+    """Ставит лайк post (нужны id и author_id); возвращает True, если лайка ещё не было."""
+    with transaction.atomic():
+        try:
+            # Вложенная точка сохранения: конфликт по уникальной паре (post, user) откатывает только вставку
+            with transaction.atomic():
+                Post.likes.through.objects.create(post_id=post.pk, user_id=user.pk)
+        except IntegrityError:
+            return False
+        likes_changed([post.pk], 1)
+        notify_likes([(post.pk, post.author_id, user.pk)])
+    return True
+
+
+def remove_like(post, user):
+    """Снимает лайк; возвращает True, если лайк был."""
+    with transaction.atomic():
+        deleted, _ = Post.likes.through.objects.filter(post_id=post.pk, user_id=user.pk).delete()
+        likes_changed([post.pk], -deleted)
+    return bool(deleted)
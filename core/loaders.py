@@ -0,0 +1,204 @@
+# backend/core/loaders.py
+# Пакетная загрузка данных, общая для одного запроса (одного прохода сериализации):
+# - DataLoader: собирает ключи (prime) и при первом промахе загружает их все одним IN-запросом
+# - RequestLoaders: загрузчики пользователей (по id) и профилей (по user_id) для запроса
+# - ViewerState: лайки и репосты текущего пользователя для всех постов страницы,
+#   по одному запросу на страницу вместо exists() на каждый пост
+# - комментарии (с ответами) и id репостов для всех постов страницы — по одному запросу,
+#   а не по запросу на каждый пост и на каждый комментарий
+#
+# Объекты хранятся в контексте корневого сериализатора: вложенные сериализаторы
+# получают тот же словарь контекста и переиспользуют уже загруженные данные.
+
+from django.contrib.auth.models import User
+
+from .models import Comment, Post, Profile, Repost
+
+
+class DataLoader:
+    """
+    Пакетный загрузчик по ключу.
+    - prime(keys): запомнить ключи, которые понадобятся (без запроса)
+    - load(key): вернуть объект; при промахе загружаются все накопленные ключи сразу
+    batch_fn(keys) -> {key: объект}; отсутствующие ключи кэшируются как None,
+    лишние (загруженные заодно) тоже кэшируются.
+    """
+
+    def __init__(self, batch_fn):
+        self.batch_fn = batch_fn
+        self.cache = {}
+        self.pending = set()
+
+    def prime(self, keys):
+        self.pending.update(key for key in keys if key is not None and key not in self.cache)
+
+    def load(self, key):
+        if key is None:
+            return None
+        if key not in self.cache:
+            self.pending.add(key)
+            self.dispatch()
+        return self.cache[key]
+
+    def load_many(self, keys):
+        keys = list(keys)
+        self.prime(keys)
+        return [self.load(key) for key in keys]
+
+    def dispatch(self):
+        keys, self.pending = self.pending, set()
+        if not keys:
+            return
+        loaded = self.batch_fn(list(keys))
+        self.cache.update(loaded)
+        for key in keys:
+            self.cache.setdefault(key, None)
+
+
+def load_repost_ids(post_ids):
+    """{post_id: [{'id': repost_id}]} для постов post_ids — один запрос."""
+    reposts = {pk: [] for pk in post_ids}
+    rows = Repost.objects.filter(original_post_id__in=post_ids).order_by('id').values_list('original_post_id', 'id')
+    for post_id, repost_id in rows:
+        reposts[post_id].append({'id': repost_id})
+    return reposts
+
+
+def load_replies(comment_ids):
+    """
+    {comment_id: [ответы]} для комментариев comment_ids и всех их вложенных ответов —
+    по запросу на уровень вложенности, а не на каждый комментарий.
+    """
+    replies = {pk: [] for pk in comment_ids}
+    level = list(comment_ids)
+    while level:
+        children = Comment.objects.filter(parent_id__in=level).select_related('user__profile').order_by('created_at', 'id')
+        level = []
+        for comment in children:
+            replies[comment.parent_id].append(comment)
+            replies[comment.pk] = []
+            level.append(comment.pk)
+    return replies
+
+
+class RequestLoaders:
+    """Загрузчики пользователей, профилей, комментариев и репостов, общие для всех сериализаторов запроса."""
+    context_key = 'loaders'
+
+    def __init__(self):
+        self.users = DataLoader(User.objects.in_bulk)
+        self.profiles = DataLoader(
+            lambda user_ids: {profile.user_id: profile for profile in Profile.objects.filter(user_id__in=user_ids)}
+        )
+        self.comments = DataLoader(self.load_comments)
+        self.replies = DataLoader(load_replies)
+        self.repost_ids = DataLoader(load_repost_ids)
+
+    @classmethod
+    def for_context(cls, context):
+        loaders = context.get(cls.context_key)
+        if loaders is None:
+            loaders = context[cls.context_key] = cls()
+        return loaders
+
+    def prime_users(self, user_ids):
+        """Пользователи и их профили, которые понадобятся при сериализации."""
+        user_ids = [pk for pk in user_ids if pk is not None]
+        self.users.prime(user_ids)
+        self.profiles.prime(user_ids)
+
+    def prime_posts(self, post_ids):
+        """Посты, чьи комментарии и репосты понадобятся при сериализации."""
+        post_ids = [pk for pk in post_ids if pk is not None]
+        self.comments.prime(post_ids)
+        self.repost_ids.prime(post_ids)
+
+    def load_comments(self, post_ids):
+        """
+        Все комментарии постов post_ids с авторами и профилями — один запрос.
+        Ответы на каждый из них известны сразу и кладутся в загрузчик replies.
+        """
+        comments = {pk: [] for pk in post_ids}
+        replies = {}
+        rows = Comment.objects.filter(post_id__in=post_ids).select_related('user__profile').order_by('created_at', 'id')
+        for comment in rows:
+            comments[comment.post_id].append(comment)
+            replies.setdefault(comment.pk, [])
+            if comment.parent_id is not None:
+                replies.setdefault(comment.parent_id, []).append(comment)
+        self.replies.cache.update(replies)
+        return comments
+
+    def replies_for(self, comment):
+        """Прямые ответы на comment."""
+        return self.replies.load(comment.pk) or []
+
+    def user_for(self, instance, field_name):
+        """Связанный пользователь instance.<field_name>: из кэша связи или через загрузчик."""
+        field = instance._meta.get_field(field_name)
+        if field.is_cached(instance):
+            return getattr(instance, field_name)
+        user = self.users.load(getattr(instance, field.attname))
+        field.set_cached_value(instance, user)
+        return user
+
+    def profile_for(self, user):
+        """Профиль пользователя: из select_related, если он уже загружен, иначе через загрузчик."""
+        if User.profile.is_cached(user):
+            try:
+                return user.profile
+            except Profile.DoesNotExist:
+                return None
+        profile = self.profiles.load(user.pk)
+        if profile is not None:
+            User.profile.related.field.set_cached_value(profile, user)
+            User.profile.related.set_cached_value(user, profile)
+        return profile
+
+
+class ViewerState:
+    """
+    Состояние «лайкнул / репостнул ли текущий пользователь» для постов.
+    prime(post_ids) загружает состояние для пачки постов двумя запросами;
+    is_liked / is_reposted для незагруженного поста догружают только его.
+    """
+    context_key = 'viewer_state'
+
+    def __init__(self, user):
+        self.user_id = user.pk if user is not None and user.is_authenticated else None
+        self.resolved = set()
+        self.liked = set()
+        self.reposted = set()
+
+    @classmethod
+    def for_context(cls, context):
+        state = context.get(cls.context_key)
+        if state is None:
+            request = context.get('request')
+            state = cls(getattr(request, 'user', None))
+            context[cls.context_key] = state
+        return state
+
+    def prime(self, post_ids):
+        missing = {pk for pk in post_ids if pk is not None} - self.resolved
+        if not missing:
+            return
+        self.resolved |= missing
+        if self.user_id is None:
+            return
+        self.liked.update(
+            Post.likes.through.objects.filter(user_id=self.user_id, post_id__in=missing)
+            .values_list('post_id', flat=True)
+        )
+        self.reposted.update(
+            Repost.objects.filter(user_id=self.user_id, original_post_id__in=missing)
+            .values_list('original_post_id', flat=True)
+        )
+
+    def is_liked(self, post_id):
+        self.prime([post_id])
+        return post_id in self.liked
+
+    def is_reposted(self, post_id):
+        self.prime([post_id])
+        return post_id in self.reposted
@@ -0,0 +1,132 @@
+# backend/core/mailer.py
+# Отправка писем через outbox (модель EmailOutbox):
+# - queue_email(...): записывает письмо в outbox; отправка ставится в фоновую очередь после фиксации
+#   транзакции, поэтому запрос (регистрация, сброс пароля) не ждёт SMTP
+# - dispatch_outbox(...): отправляет пачку писем через одно соединение почтового бэкенда;
+#   при ошибке письмо откладывается с экспоненциальной задержкой, после EMAIL_OUTBOX_MAX_ATTEMPTS
+#   попыток помечается как failed
+# - тело письма (со ссылками сброса пароля и другими токенами) стирается, как только письмо отправлено
+#   или окончательно не отправлено: в outbox остаются только тема, адресаты и статус
+# - письма, отложенные для повтора или оставшиеся после перезапуска, отправляет команда send_outbox
+# Бэкенд — EMAIL_BACKEND, в тестах подходит django.core.mail.backends.locmem.EmailBackend.
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .background import BackgroundWorker
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def max_attempts():
+    return getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def retry_base_seconds():
+    return getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE_SECONDS', 60)
+
+
+def batch_size():
+    return getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 100)
+
+
+# Письма, взятые в отправку, откладываются на это время, чтобы их не взял параллельный диспетчер
+CLAIM_SECONDS = 300
+RETRY_MAX_SECONDS = 6 * 60 * 60
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой: base, 2*base, 4*base ... но не больше RETRY_MAX_SECONDS."""
+    return timedelta(seconds=min(retry_base_seconds() * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def queue_email(subject, body, recipient_list, from_email=None):
+    """Записывает письмо в outbox и ставит его в очередь отправки после фиксации транзакции."""
+    message = EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipient_list),
+    )
+    transaction.on_commit(lambda: email_dispatcher.submit(message.pk))
+    return message
+
+
+def claim_due(ids=None, limit=None):
+    """
+    Выбирает письма к отправке (pending, срок попытки наступил) и откладывает их на CLAIM_SECONDS,
+    чтобы параллельные диспетчеры (фоновый поток, команда send_outbox) не отправили их повторно.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+            status='pending', next_attempt_at__lte=now,
+        ).order_by('next_attempt_at', 'id')
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        messages = list(queryset[:limit or batch_size()])
+        EmailOutbox.objects.filter(pk__in=[m.pk for m in messages]).update(
+            next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS)
+        )
+    return messages
+
+
+def dispatch_outbox(ids=None, limit=None):
+    """
+    Отправляет пачку писем через одно соединение. ids — ограничить отправку этими письмами.
+    Возвращает (отправлено, отложено или не отправлено).
+    """
+    messages = claim_due(ids, limit)
+    if not messages:
+        return 0, 0
+
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        # Почтовый сервер недоступен — вся пачка откладывается
+        failed = [(message, exc) for message in messages]
+    else:
+        try:
+            for message in messages:
+                try:
+                    EmailMessage(
+                        message.subject, message.body, message.from_email, message.to, connection=connection,
+                    ).send()
+                    sent.append(message)
+                except Exception as exc:
+                    failed.append((message, exc))
+        finally:
+            connection.close()
+
+    now = timezone.now()
+    for message in sent:
+        message.status, message.sent_at, message.last_error, message.body = 'sent', now, '', ''
+    for message, exc in failed:
+        message.attempts += 1
+        message.last_error = f"{type(exc).__name__}: {exc}"
+        if message.attempts >= max_attempts():
+            message.status, message.body = 'failed', ''
+            logger.error("Письмо %s не отправлено после %d попыток: %s", message.pk, message.attempts, exc)
+        else:
+            message.next_attempt_at = now + retry_delay(message.attempts)
+    EmailOutbox.objects.bulk_update(
+        sent + [message for message, exc in failed],
+        ['status', 'sent_at', 'attempts', 'next_attempt_at', 'last_error', 'body'],
+    )
+    return len(sent), len(failed)
+
+
+email_dispatcher = BackgroundWorker('email', lambda ids: dispatch_outbox(ids, limit=len(ids)), batch_size=batch_size())
+
+
+def flush_outbox():
+    """Синхронно отправляет письма из фоновой очереди; возвращает их число."""
+    return email_dispatcher.flush()
@@ -0,0 +1,69 @@
+# backend/core/management/commands/benchmark.py
+# Замеры маршрутов core/urls.py через тестовый клиент (core/benchmark.py): p50 / p95 / p99 и число
+# SQL-запросов на маршрут, сравнение с базовым файлом BENCHMARK_BASELINE.
+# Обычный порядок: seed_dataset, benchmark --save-baseline; после изменений — benchmark.
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import baseline_path, compare, load_baseline, run_benchmark, save_baseline
+from core.seed import seed_users
+
+
+class Command(BaseCommand):
+    help = "Замеряет время ответа и число SQL-запросов маршрутов API и сравнивает с базовым замером"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=30, help="Запросов на маршрут (после прогрева)")
+        parser.add_argument('--user', help="Username, от имени которого идут запросы (по умолчанию — "
+                                           "пользователь набора с наибольшим числом подписок)")
+        parser.add_argument('--anonymous', action='store_true', help="Запросы без авторизации")
+        parser.add_argument('--route', action='append', dest='routes', help="Замерить только этот маршрут")
+        parser.add_argument('--baseline', help="Путь к базовому файлу (по умолчанию BENCHMARK_BASELINE)")
+        parser.add_argument('--save-baseline', action='store_true', help="Сохранить результаты как базовые")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Допустимый рост p95 относительно базового замера (доля)")
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help="Завершиться с ошибкой, если есть регрессии")
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"Пользователь {username} не найден")
+            return user
+        user = seed_users().order_by('-profile__following_count', 'id').first() or User.objects.order_by('id').first()
+        if user is None:
+            raise CommandError("В базе нет пользователей: сначала запустите seed_dataset")
+        return user
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user'])
+        path = options['baseline'] or baseline_path()
+        results = run_benchmark(user, options['repeat'], options['anonymous'], options['routes'])
+
+        baseline = None if options['save_baseline'] else load_baseline(path)
+        rows = compare(results, baseline or {}, options['threshold'])
+        self.stdout.write(f"{'маршрут':<28} {'статус':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'SQL':>5}")
+        regressions = 0
+        for name, result, base, problems in rows:
+            line = (
+                f"{name:<28} {result['status']:>6} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                f"{result['p99_ms']:>8.2f} {result['queries']:>5}"
+            )
+            if base is not None and not problems:
+                line += f"   (база p95 {base['p95_ms']:.2f}, SQL {base['queries']})"
+            if problems:
+                regressions += 1
+                line = self.style.ERROR(line + "   РЕГРЕССИЯ: " + "; ".join(problems))
+            self.stdout.write(line)
+
+        if options['save_baseline']:
+            save_baseline(results, path)
+            self.stdout.write(self.style.SUCCESS(f"Базовый замер сохранён в {path}"))
+        elif baseline is None:
+            self.stdout.write(f"Базового замера нет ({path}): сохраните его параметром --save-baseline")
+        elif regressions and options['fail_on_regression']:
+            raise CommandError(f"Регрессий: {regressions}")
+        elif regressions:
+            self.stdout.write(self.style.WARNING(f"Регрессий: {regressions}"))
@@ -0,0 +1,28 @@
+# backend/core/management/commands/process_profile_images.py
+# Создание уменьшенных копий для аватаров и баннеров, загруженных до появления обработки
+# изображений (или копии которых не были созданы из-за сбоя).
+
+from django.core.management.base import BaseCommand
+
+from core.images import process_profile_image
+from core.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Создаёт уменьшенные копии аватаров и баннеров, у которых их ещё нет"
+
+    def handle(self, *args, **options):
+        processed = 0
+        for field in ('avatar', 'banner'):
+            profiles = (
+                Profile.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+                .filter(**{f'{field}_variants': {}})
+                .values_list('pk', field)
+            )
+            for profile_id, name in profiles.iterator():
+                try:
+                    process_profile_image(profile_id, field, name)
+                    processed += 1
+                except OSError as exc:
+                    self.stderr.write(f"Профиль {profile_id}: {name}: {exc}")
+        self.stdout.write(f"Обработано изображений: {processed}")
@@ -0,0 +1,27 @@
+# backend/core/management/commands/rebuild_timelines.py
+# Пересборка материализованных домашних лент (после изменения TIMELINE_FANOUT_FOLLOWER_LIMIT,
+# импорта данных или первого развёртывания).
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from core.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Пересобирает домашние ленты пользователей"
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help="Только для указанных пользователей")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        rebuilt = 0
+        for user_id in users.values_list('id', flat=True).iterator():
+            rebuild_timeline(user_id)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Ленты пересобраны для {rebuilt} пользователей"))
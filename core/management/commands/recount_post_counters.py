@@ -0,0 +1,33 @@
+# backend/core/management/commands/recount_post_counters.py
+# Полный пересчёт денормализованных счётчиков постов (like_count, comment_count, repost_count).
+# Нужен после массового импорта, ручных правок в БД или каскадных удалений пользователей,
+# которые обходят сигналы m2m_changed.
+
+from django.core.management.base import BaseCommand
+
+from core.counters import recount_post_counters
+from core.models import Post
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает счётчики лайков, комментариев и репостов у постов"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help="Сколько постов обновлять за один UPDATE (по диапазону id)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = Post.objects.order_by('-id').values_list('id', flat=True).first()
+        if last_id is None:
+            self.stdout.write("Постов нет, пересчитывать нечего")
+            return
+
+        updated = 0
+        for start in range(0, last_id + 1, batch_size):
+            qs = Post.objects.filter(id__gte=start, id__lt=start + batch_size)
+            updated += recount_post_counters(qs)
+
+        self.stdout.write(self.style.SUCCESS(f"Счётчики исправлены у {updated} постов"))
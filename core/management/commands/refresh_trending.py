@@ -0,0 +1,35 @@
+# backend/core/management/commands/refresh_trending.py
+# Пересчёт таблицы трендовых постов. Чтение posts/popular/ само ставит пересчёт в фоновую очередь;
+# команда нужна для полного пересчёта (--full, например после смены TRENDING_HALF_LIFE_HOURS)
+# или как постоянный процесс с параметром --interval (встроенный планировщик).
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.trending import refresh_trending
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает рейтинг трендовых постов"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help="Повторять пересчёт каждые N секунд (0 — выполнить один раз)",
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help="Пересчитать все посты окна, а не только изменившиеся после прошлого пересчёта",
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        full = options['full']
+        while True:
+            refreshed = refresh_trending(full=full)
+            self.stdout.write(f"Пересчитано постов: {refreshed}")
+            if interval <= 0:
+                break
+            full = False
+            time.sleep(interval)
@@ -0,0 +1,40 @@
+# backend/core/management/commands/reindex_entities.py
+# Повторный разбор упоминаний и хэштегов (поле entities) и пересборка индекса
+# PostHashtag / PostMention и CommentHashtag / CommentMention.
+# Нужен для постов и комментариев, созданных до появления разбора при записи, и после массового импорта.
+# Уведомления об упоминаниях при этом не отправляются.
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.entities import reindex_entities
+from core.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = "Заново разбирает упоминания и хэштеги постов и комментариев"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Сколько постов или комментариев обрабатывать за одну транзакцию",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        posts = self.reindex(Post, batch_size)
+        comments = self.reindex(Comment, batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Разобрано постов: {posts}, комментариев: {comments}"))
+
+    def reindex(self, model, batch_size):
+        processed = 0
+        last_id = 0
+        while True:
+            batch = list(model.objects.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                processed += reindex_entities(model, batch)
+            last_id = batch[-1].pk
+        return processed
@@ -0,0 +1,46 @@
+# backend/core/management/commands/seed_dataset.py
+# Генерация воспроизводимого синтетического набора данных для нагрузочных замеров (core/seed.py):
+# пользователи со степенным графом подписок, посты, ответы, цитаты, лайки, репосты, комментарии
+# и уведомления. Одинаковые параметры и --seed дают одинаковый набор.
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seed import DatasetGenerator, clear_dataset, seed_users
+
+
+class Command(BaseCommand):
+    help = "Создаёт синтетический набор данных (пользователи seed_*) для нагрузочных замеров"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help="Число пользователей")
+        parser.add_argument('--posts-per-user', type=float, default=20, help="Среднее число постов на пользователя")
+        parser.add_argument('--follows-per-user', type=float, default=20, help="Среднее число подписок")
+        parser.add_argument('--likes-per-post', type=float, default=5, help="Среднее число лайков на пост")
+        parser.add_argument('--comments-per-post', type=float, default=1.5, help="Среднее число комментариев")
+        parser.add_argument('--days', type=int, default=30, help="За сколько последних дней распределены события")
+        parser.add_argument('--seed', type=int, default=42, help="Начальное значение генератора случайных чисел")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Строк в одной вставке bulk_create")
+        parser.add_argument('--clear', action='store_true', help="Сначала удалить ранее созданный набор")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            self.stdout.write(f"Удалено пользователей набора: {clear_dataset()}")
+        elif seed_users().exists():
+            raise CommandError("Набор уже создан: повторите с --clear, чтобы пересоздать его")
+
+        started = time.monotonic()
+        stats = DatasetGenerator(
+            users=options['users'],
+            posts_per_user=options['posts_per_user'],
+            follows_per_user=options['follows_per_user'],
+            likes_per_post=options['likes_per_post'],
+            comments_per_post=options['comments_per_post'],
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        ).run()
+        for name, count in sorted(stats.items()):
+            self.stdout.write(f"  {name}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Набор создан за {time.monotonic() - started:.1f} с"))
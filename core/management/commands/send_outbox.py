@@ -0,0 +1,34 @@
+# backend/core/management/commands/send_outbox.py
+# Отправка писем из outbox: повторные попытки и письма, не отправленные фоновым потоком
+# (например, из-за перезапуска процесса). Запускается по cron или постоянно с параметром --interval.
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mailer import dispatch_outbox
+
+
+class Command(BaseCommand):
+    help = "Отправляет письма из outbox, срок отправки которых наступил"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help="Повторять отправку каждые N секунд (0 — выполнить один раз)",
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = dispatch_outbox()
+                total_sent += sent
+                total_failed += failed
+                if not sent and not failed:
+                    break
+            self.stdout.write(f"Отправлено писем: {total_sent}, отложено или не отправлено: {total_failed}")
+            if interval <= 0:
+                break
+            time.sleep(interval)
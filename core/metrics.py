@@ -0,0 +1,349 @@
+# backend/core/metrics.py
+# Метрики приложения в текстовом формате Prometheus (GET /metrics):
+# - Registry: счётчики, gauge и гистограммы с метками. Значения пишутся в словарь своего потока
+#   (threading.local), поэтому на горячем пути нет блокировок; при сборе словари потоков
+#   копируются и суммируются. Блокировка берётся только при появлении нового потока. Словари
+#   завершившихся потоков при сборе сливаются в один, чтобы их число не росло вместе с числом потоков.
+# - несколько процессов (gunicorn/uvicorn workers): при METRICS_DIR каждый процесс не чаще раза
+#   в METRICS_FLUSH_SECONDS записывает снимок своих значений в METRICS_DIR/metrics-<pid>.json,
+#   а /metrics суммирует снимки всех процессов. Каталог очищается при развёртывании: снимки
+#   завершившихся процессов остаются, чтобы счётчики не уменьшались.
+# - MetricsMiddleware: запросы, ошибки, время ответа и число SQL-запросов по имени маршрута
+#   (name из core/urls.py), запросы в обработке
+# - кэш ответов (core/cache.py), условные GET (core/conditional.py) и фоновые очереди
+#   (core/background.py) считают попадания / промахи и элементы очередей сами
+
+import bisect
+import hmac
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .timing import current_timings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def metrics_dir():
+    path = getattr(settings, 'METRICS_DIR', None)
+    return Path(path) if path else None
+
+
+def flush_interval():
+    return getattr(settings, 'METRICS_FLUSH_SECONDS', 5)
+
+
+def metrics_token():
+    return getattr(settings, 'METRICS_TOKEN', None)
+
+
+class Metric:
+    """Описание метрики; значения хранятся в Registry. Метки передаются позиционно, в порядке labelnames."""
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def add(self, amount, labels):
+        values = self.registry.values()
+        key = (self.name, labels)
+        values[key] = values.get(key, 0) + amount
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        self.add(amount, labels)
+
+
+class Gauge(Metric):
+    """Gauge, который увеличивают и уменьшают (в любом потоке — суммы по потокам сходятся)."""
+    type = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        self.add(amount, labels)
+
+    def dec(self, *labels, amount=1):
+        self.add(-amount, labels)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        values = self.registry.values()
+        key = (self.name, labels)
+        state = values.get(key)
+        if state is None:
+            # [счётчики корзин (не накопительные) + корзина +Inf, сумма, количество]
+            state = values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.local = threading.local()
+        # [(поток, его словарь значений)]; retired — сумма значений завершившихся потоков
+        self.shards = []
+        self.retired = {}
+        self.shards_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.last_flush = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """collect() -> [(имя gauge, метки, значение)]: значения, которые читаются в момент сбора."""
+        self.collectors.append(collect)
+
+    def values(self):
+        """Словарь значений текущего потока (пишет в него только этот поток)."""
+        values = getattr(self.local, 'values', None)
+        if values is None:
+            values = self.local.values = {}
+            with self.shards_lock:
+                self.shards.append((threading.current_thread(), values))
+        return values
+
+    def retire_finished_threads(self):
+        """Сливает словари завершившихся потоков в retired (вызывается под shards_lock)."""
+        alive = []
+        for thread, values in self.shards:
+            if thread.is_alive():
+                alive.append((thread, values))
+            else:
+                # Поток завершился и больше не пишет в свой словарь
+                for key, value in values.items():
+                    merge_value(self.retired, key, value)
+        self.shards = alive
+
+    def snapshot(self):
+        """{(имя, метки): значение} этого процесса: сумма по потокам плюс значения коллекторов."""
+        merged = {}
+        with self.shards_lock:
+            self.retire_finished_threads()
+            shards = [values for thread, values in self.shards]
+            for key, value in self.retired.items():
+                merge_value(merged, key, list(value) if isinstance(value, list) else value)
+        for shard in shards:
+            # copy() словаря и list() значения атомарны под GIL, хотя поток-владелец продолжает писать
+            for key, value in shard.copy().items():
+                merge_value(merged, key, list(value) if isinstance(value, list) else value)
+        for collect in self.collectors:
+            for name, labels, value in collect():
+                merged[(name, tuple(labels))] = value
+        return merged
+
+    def maybe_flush(self):
+        """Записывает снимок процесса в METRICS_DIR, если с прошлой записи прошло METRICS_FLUSH_SECONDS."""
+        directory = metrics_dir()
+        if directory is None or time.monotonic() - self.last_flush < flush_interval():
+            return
+        if self.flush_lock.acquire(blocking=False):
+            try:
+                self.flush(directory)
+            finally:
+                self.flush_lock.release()
+
+    def flush(self, directory, snapshot=None):
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        self.last_flush = time.monotonic()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'metrics-{os.getpid()}.json'
+        temporary = directory / f'metrics-{os.getpid()}-{threading.get_ident()}.tmp'
+        data = {
+            'written_at': time.time(),
+            'values': [[name, list(labels), value] for (name, labels), value in snapshot.items()],
+        }
+        temporary.write_text(json.dumps(data), encoding='utf-8')
+        os.replace(temporary, path)
+
+    def collect(self):
+        """Значения всех процессов (или только этого, если METRICS_DIR не задан)."""
+        snapshot = self.snapshot()
+        directory = metrics_dir()
+        if directory is None:
+            return snapshot
+        with self.flush_lock:
+            self.flush(directory, snapshot)
+        stale_after = max(60, 3 * flush_interval())
+        merged = {}
+        for path in directory.glob('metrics-*.json'):
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            # gauge процесса, который давно не писал снимок (завершился), не учитываются
+            fresh = time.time() - data['written_at'] < stale_after
+            for name, labels, value in data['values']:
+                metric = self.metrics.get(name)
+                if metric is not None and metric.type == 'gauge' and not fresh:
+                    continue
+                merge_value(merged, (name, tuple(labels)), value)
+        return merged
+
+    def render(self):
+        """Текстовый формат Prometheus 0.0.4."""
+        collected = self.collect()
+        by_metric = {}
+        for (name, labels), value in collected.items():
+            by_metric.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for labels, value in sorted(by_metric.get(name, ()), key=lambda item: [str(v) for v in item[0]]):
+                pairs = list(zip(metric.labelnames, labels))
+                if metric.type == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(list(metric.buckets) + ['+Inf'], value[:-2]):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{format_labels(pairs + [("le", format_number(bound))])} {cumulative}')
+                    lines.append(f'{name}_sum{format_labels(pairs)} {format_number(value[-2])}')
+                    lines.append(f'{name}_count{format_labels(pairs)} {value[-1]}')
+                else:
+                    lines.append(f'{name}{format_labels(pairs)} {format_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def merge_value(merged, key, value):
+    current = merged.get(key)
+    if current is None:
+        merged[key] = value
+    elif isinstance(value, list):
+        merged[key] = [a + b for a, b in zip(current, value)]
+    else:
+        merged[key] = current + value
+
+
+def format_number(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def format_labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+registry = Registry()
+
+REQUESTS = registry.counter('http_requests_total', 'Запросы по маршруту, методу и статусу', ('route', 'method', 'status'))
+ERRORS = registry.counter('http_request_errors_total', 'Ответы 5xx по маршруту', ('route', 'method'))
+LATENCY = registry.histogram('http_request_duration_seconds', 'Время ответа', ('route', 'method'))
+DB_QUERIES = registry.histogram(
+    'http_request_db_queries', 'SQL-запросов на запрос', ('route',), buckets=QUERY_COUNT_BUCKETS
+)
+IN_FLIGHT = registry.gauge('http_requests_in_flight', 'Запросы в обработке')
+CACHE = registry.counter('app_cache_requests_total', 'Обращения к кэшам: hit / miss', ('cache', 'result'))
+QUEUE_ITEMS = registry.counter(
+    'app_queue_items_total', 'Элементы фоновых очередей: submitted / processed / failed', ('queue', 'event')
+)
+QUEUE_DEPTH = registry.gauge('app_queue_depth', 'Элементов в фоновой очереди', ('queue',))
+
+
+def record_cache(cache, hit):
+    CACHE.inc(cache, 'hit' if hit else 'miss')
+
+
+def route_name(request):
+    """Имя маршрута (с пространством имён); для неразрешённых адресов — 'unmatched', а не путь."""
+    match = getattr(request, 'resolver_match', None)
+    return (match.view_name or 'unnamed') if match else 'unmatched'
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    Метрики запроса. Ставится сразу после ServerTimingMiddleware: число SQL-запросов берётся
+    из его замера, а если замер выключен — считается своей обёрткой execute_wrapper.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        IN_FLIGHT.inc()
+        timings = current_timings()
+        counter = None
+        try:
+            if timings is None:
+                counter = QueryCounter()
+                with connections['default'].execute_wrapper(counter):
+                    response = self.get_response(request)
+            else:
+                response = self.get_response(request)
+        finally:
+            IN_FLIGHT.dec()
+        route = route_name(request)
+        REQUESTS.inc(route, request.method, str(response.status_code))
+        if response.status_code >= 500:
+            ERRORS.inc(route, request.method)
+        LATENCY.observe(time.perf_counter() - started, route, request.method)
+        DB_QUERIES.observe(timings.db_count if counter is None else counter.count, route)
+        registry.maybe_flush()
+        return response
+
+
+def metrics_view(request):
+    """
+    GET /metrics. При заданном METRICS_TOKEN нужен заголовок Authorization: Bearer <токен>;
+    без токена метрики отдаются только при DEBUG.
+    """
+    token = metrics_token()
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        # сравнение за постоянное время: по времени ответа токен не подобрать посимвольно
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_follow_counters(apps, schema_editor):
+    Profile = apps.get_model('core', 'Profile')
+    Follow = apps.get_model('core', 'Follow')
+
+    def counted(field):
+        sub = Follow.objects.filter(**{field: OuterRef('user_id')}).order_by().values(field).annotate(n=Count('pk')).values('n')
+        return Coalesce(Subquery(sub, output_field=IntegerField()), Value(0))
+
+    Profile.objects.update(followers_count=counted('following'), following_count=counted('follower'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_post_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='core.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at', '-post'], name='core_timeline_user_created'), models.Index(fields=['user', 'author'], name='core_timeline_user_author')],
+                'unique_together': {('user', 'post')},
+            },
+        ),
+        migrations.RunPython(fill_follow_counters, migrations.RunPython.noop),
+    ]
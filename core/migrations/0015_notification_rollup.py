@@ -0,0 +1,97 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+RECENT_SENDERS_LIMIT = 3
+
+
+def roll_up_notifications(apps, schema_editor):
+    """Сворачивает существующие лайки и репосты в группы (recipient, тип, пост)."""
+    Notification = apps.get_model('core', 'Notification')
+    NotificationSender = apps.get_model('core', 'NotificationSender')
+
+    Notification.objects.update(last_activity_at=F('created_at'))
+
+    groups = {}
+    rows = (
+        Notification.objects.filter(notification_type__in=('like', 'repost'), post__isnull=False)
+        .order_by('created_at', 'id')
+        .values_list('id', 'recipient_id', 'notification_type', 'post_id', 'sender_id', 'created_at', 'is_read')
+    )
+    for row in rows.iterator():
+        groups.setdefault((row[1], f'{row[2]}:{row[3]}'), []).append(row)
+
+    for (recipient_id, key), items in groups.items():
+        senders = {}
+        for item in items:
+            # повторное событие переносит отправителя в конец (самые свежие — последними)
+            senders.pop(item[4], None)
+            senders[item[4]] = item[5]
+        keep = items[-1]
+        Notification.objects.filter(pk__in=[item[0] for item in items[:-1]]).delete()
+        Notification.objects.filter(pk=keep[0]).update(
+            group_key=key,
+            count=len(senders),
+            recent_senders=list(reversed(list(senders)))[:RECENT_SENDERS_LIMIT],
+            is_read=all(item[6] for item in items),
+        )
+        NotificationSender.objects.bulk_create([
+            NotificationSender(notification_id=keep[0], sender_id=sender_id, created_at=created_at)
+            for sender_id, created_at in senders.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_trending_post'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='group_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='recent_senders',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='NotificationSender',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='senders', to='core.notification')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('notification', 'sender')},
+            },
+        ),
+        migrations.RunPython(roll_up_notifications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('recipient', 'group_key'), name='core_notification_group'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-last_activity_at', '-id'], name='core_notification_activity'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:05
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_unread_counters(apps, schema_editor):
+    Profile = apps.get_model('core', 'Profile')
+    Notification = apps.get_model('core', 'Notification')
+
+    unread = (
+        Notification.objects.filter(recipient_id=OuterRef('user_id'), is_read=False)
+        .order_by().values('recipient_id').annotate(n=Count('pk')).values('n')
+    )
+    Profile.objects.update(
+        unread_notifications_count=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_notification_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='unread_notifications_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_unread_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:40
+
+from django.db import migrations
+
+# Полнотекстовый индекс постов поддерживается самой базой, а не приложением:
+# - PostgreSQL: генерируемый столбец tsvector (конфигурация 'russian') и GIN-индекс по нему
+# - SQLite: внешняя (external content) таблица FTS5 и триггеры, повторяющие изменения core_post
+# Запросы к индексу — в core/search.py.
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE core_post ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('russian', coalesce(content, ''))) STORED
+    """,
+    "CREATE INDEX core_post_search_gin ON core_post USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_post_search_gin",
+    "ALTER TABLE core_post DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_post_fts USING fts5(
+        content, content='core_post', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER core_post_fts_insert AFTER INSERT ON core_post BEGIN
+        INSERT INTO core_post_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER core_post_fts_delete AFTER DELETE ON core_post BEGIN
+        INSERT INTO core_post_fts(core_post_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER core_post_fts_update AFTER UPDATE OF content ON core_post BEGIN
+        INSERT INTO core_post_fts(core_post_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO core_post_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    "INSERT INTO core_post_fts(core_post_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_post_fts_update",
+    "DROP TRIGGER IF EXISTS core_post_fts_delete",
+    "DROP TRIGGER IF EXISTS core_post_fts_insert",
+    "DROP TABLE IF EXISTS core_post_fts",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_profile_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:31
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def dedupe_reposts(apps, schema_editor):
+    """
+    Перед уникальным ограничением (user, original_post) оставляет самый ранний репост каждой пары:
+    уведомления переводятся на него, repost_count затронутых постов пересчитывается.
+    """
+    Repost = apps.get_model('core', 'Repost')
+    Notification = apps.get_model('core', 'Notification')
+    Post = apps.get_model('core', 'Post')
+
+    pairs = list(
+        Repost.objects.order_by().values('user_id', 'original_post_id')
+        .annotate(keep=Min('id'), n=Count('id')).filter(n__gt=1)
+    )
+    for pair in pairs:
+        duplicates = Repost.objects.filter(
+            user_id=pair['user_id'], original_post_id=pair['original_post_id'],
+        ).exclude(pk=pair['keep'])
+        Notification.objects.filter(repost__in=duplicates).update(repost_id=pair['keep'])
+        duplicates.delete()
+
+    if pairs:
+        reposts = (
+            Repost.objects.filter(original_post_id=OuterRef('pk'))
+            .order_by().values('original_post_id').annotate(n=Count('pk')).values('n')
+        )
+        Post.objects.filter(pk__in={pair['original_post_id'] for pair in pairs}).update(
+            repost_count=Coalesce(Subquery(reposts, output_field=IntegerField()), Value(0))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_post_entities'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='core_comment_post_created'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='core_comment_user_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient', '-last_activity_at', '-id'], name='core_notification_unread'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created_at', '-id'], name='core_post_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='core_post_author_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='repost',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='core_repost_user_recent'),
+        ),
+        migrations.RunPython(dedupe_reposts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='repost',
+            constraint=models.UniqueConstraint(fields=('user', 'original_post'), name='core_repost_user_post'),
+        ),
+    ]
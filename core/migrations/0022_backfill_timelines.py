@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:05
+
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_timelines(apps, schema_editor):
+    """
+    Заполняет домашние ленты пользователей, у которых их ещё нет, так же, как rebuild_timeline:
+    свои посты и последние TIMELINE_BACKFILL_SIZE постов авторов, раскладываемых при записи.
+    Без этого после развёртывания 0013 лента существующих подписок пуста.
+    """
+    Follow = apps.get_model('core', 'Follow')
+    Post = apps.get_model('core', 'Post')
+    Profile = apps.get_model('core', 'Profile')
+    TimelineEntry = apps.get_model('core', 'TimelineEntry')
+
+    limit = getattr(settings, 'TIMELINE_FANOUT_FOLLOWER_LIMIT', 10000)
+    size = getattr(settings, 'TIMELINE_BACKFILL_SIZE', 50)
+    filled = set(TimelineEntry.objects.values_list('user_id', flat=True).distinct())
+
+    # Обход по авторам: последние посты каждого автора читаются один раз
+    authors = Profile.objects.filter(user__post__isnull=False).distinct().order_by('user_id')
+    for author_id, followers_count in authors.values_list('user_id', 'followers_count').iterator():
+        posts = list(
+            Post.objects.filter(author_id=author_id)
+            .order_by('-created_at', '-id')
+            .values_list('id', 'created_at')[:size]
+        )
+        readers = [author_id]
+        if followers_count < limit:
+            readers += Follow.objects.filter(following_id=author_id).values_list('follower_id', flat=True)
+        entries = [
+            TimelineEntry(user_id=reader_id, post_id=post_id, author_id=author_id, created_at=created_at)
+            for reader_id in readers if reader_id not in filled
+            for post_id, created_at in posts
+        ]
+        TimelineEntry.objects.bulk_create(entries, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
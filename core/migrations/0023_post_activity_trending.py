@@ -0,0 +1,55 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:20
+
+import math
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Те же веса и шкала, что в core/trending.py на момент миграции
+WEIGHTS = (1.0, 2.0, 3.0)
+SCORE_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def seed_trending(apps, schema_editor):
+    """
+    Заполняет TrendingPost постами окна TRENDING_WINDOW_HOURS в новой шкале рейтинга, чтобы
+    posts/popular/ сразу после развёртывания отдавал топ, не дожидаясь первого пересчёта.
+    """
+    Post = apps.get_model('core', 'Post')
+    TrendingPost = apps.get_model('core', 'TrendingPost')
+
+    now = datetime.now(timezone.utc)
+    half_life = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 12)
+    posts = (
+        Post.objects.filter(created_at__gte=now - timedelta(hours=getattr(settings, 'TRENDING_WINDOW_HOURS', 72)))
+        .values_list('id', 'created_at', 'like_count', 'comment_count', 'repost_count')
+    )
+    rows = []
+    for post_id, created_at, *counts in posts.iterator(chunk_size=1000):
+        engagement = sum(weight * count for weight, count in zip(WEIGHTS, counts))
+        if engagement > 0:
+            score = math.log2(engagement) + (created_at - SCORE_EPOCH).total_seconds() / 3600 / half_life
+            rows.append(TrendingPost(post_id=post_id, score=score, refreshed_at=now))
+    TrendingPost.objects.all().delete()
+    TrendingPost.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_backfill_timelines'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='activity_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['activity_at'], name='core_post_activity'),
+        ),
+        migrations.RunPython(seed_trending, migrations.RunPython.noop),
+    ]
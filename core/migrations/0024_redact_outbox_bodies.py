@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:05
+
+from django.db import migrations
+
+
+def redact_bodies(apps, schema_editor):
+    """Стирает тела уже отправленных и окончательно не отправленных писем (в них бывают токены сброса пароля)."""
+    EmailOutbox = apps.get_model('core', 'EmailOutbox')
+    EmailOutbox.objects.filter(status__in=('sent', 'failed')).exclude(body='').update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_post_activity_trending'),
+    ]
+
+    operations = [
+        migrations.RunPython(redact_bodies, migrations.RunPython.noop),
+    ]
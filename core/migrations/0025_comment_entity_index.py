@@ -0,0 +1,81 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def index_comment_entities(apps, schema_editor):
+    """Заполняет индекс по уже разобранному полю Comment.entities (текст заново не разбирается)."""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Comment = apps.get_model('core', 'Comment')
+    Hashtag = apps.get_model('core', 'Hashtag')
+    CommentHashtag = apps.get_model('core', 'CommentHashtag')
+    CommentMention = apps.get_model('core', 'CommentMention')
+    last_id = 0
+    while True:
+        batch = list(Comment.objects.filter(id__gt=last_id).order_by('id').only('id', 'created_at', 'entities')[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].pk
+        mentions = {
+            (comment.pk, mention['user_id']): comment.created_at
+            for comment in batch for mention in (comment.entities or {}).get('mentions', ())
+        }
+        # упомянутые пользователи могли быть удалены после разбора
+        users = set(User.objects.filter(id__in={user_id for _, user_id in mentions}).values_list('id', flat=True))
+        CommentMention.objects.bulk_create([
+            CommentMention(comment_id=comment_id, user_id=user_id, created_at=created_at)
+            for (comment_id, user_id), created_at in mentions.items() if user_id in users
+        ], ignore_conflicts=True)
+        hashtags = {
+            (comment.pk, hashtag['tag']): comment.created_at
+            for comment in batch for hashtag in (comment.entities or {}).get('hashtags', ())
+        }
+        names = {name for _, name in hashtags}
+        Hashtag.objects.bulk_create([Hashtag(name=name) for name in names], ignore_conflicts=True)
+        tags = dict(Hashtag.objects.filter(name__in=names).values_list('name', 'id'))
+        CommentHashtag.objects.bulk_create([
+            CommentHashtag(comment_id=comment_id, hashtag_id=tags[name], created_at=created_at)
+            for (comment_id, name), created_at in hashtags.items()
+        ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_redact_outbox_bodies'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentHashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtag_links', to='core.comment')),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comment_links', to='core.hashtag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hashtag', '-created_at', '-comment'], name='core_commenthashtag_recent')],
+                'unique_together': {('hashtag', 'comment')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CommentMention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mention_links', to='core.comment')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comment_mentions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at', '-comment'], name='core_commentmention_recent')],
+                'unique_together': {('user', 'comment')},
+            },
+        ),
+        migrations.RunPython(index_comment_entities, migrations.RunPython.noop),
+    ]
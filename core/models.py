@@ -9,6 +9,10 @@
 # - PasswordResetToken: токен для восстановления пароля с ограничением по времени
 # - Notification: уведомления о лайках, комментариях, репостах и упоминаниях с привязкой к отправителю, получателю и объекту
 # - Follow: подписки пользователей (кто на кого подписан)
+# - TimelineEntry: материализованная домашняя лента (fan-out on write)
+# - TrendingPost: предрасчитанный рейтинг популярных постов с затуханием по времени
+# - Hashtag, PostHashtag, PostMention: индекс хэштегов и упоминаний постов (заполняется в core/entities.py)
+# - CommentHashtag, CommentMention: такой же индекс для комментариев
 
 from django.db import models
 from django.contrib.auth.models import User
@@ -24,6 +28,10 @@ class Profile(models.Model):
     - Биография, местоположение, сайт
     - Дата рождения и её видимость (публично, только подписчикам, только себе)
     - Флаг приватности аккаунта (приватный/публичный)
+    - Денормализованные счётчики подписчиков и подписок (поддерживаются сигналами Follow)
+    - Счётчик непрочитанных уведомлений (поддерживается в core/notifications.py)
+    - Уменьшенные копии аватара и баннера (avatar_variants, banner_variants), создаются в core/images.py:
+      {размер: {'jpeg': путь, 'webp': путь, 'width': ..., 'height': ...}}
     """
     BIRTH_DATE_VISIBILITY_CHOICES = [
         ('public', 'Показывать всем'),
@@ -38,6 +46,8 @@ class Profile(models.Model):
     city = models.CharField(max_length=100, blank=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
     banner = models.ImageField(upload_to='banners/', blank=True, null=True)
+    avatar_variants = models.JSONField(default=dict, blank=True)
+    banner_variants = models.JSONField(default=dict, blank=True)
 
     bio = models.TextField(blank=True)
     location = models.CharField(max_length=255, blank=True)
@@ -49,6 +59,9 @@ class Profile(models.Model):
         default='public',
     )
     is_private = models.BooleanField(default=False, help_text="Если True — аккаунт приватный, виден только подписчикам")
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    unread_notifications_count = models.PositiveIntegerField(default=0)
 
     objects = models.Manager()
 
@@ -69,11 +82,16 @@ class Post(models.Model):
     - is_quote: флаг, что это цитата другого поста
     - quoted_post: ссылка на цитируемый пост
     - is_pinned: закреплен ли пост (например, в профиле)
+    - entities: упоминания и хэштеги, разобранные при сохранении (core/entities.py),
+      со смещениями в тексте — клиенту не нужно разбирать текст заново
 
-    Методы:
+    Денормализованные счётчики (поддерживаются сигналами в core/signals.py,
+    пересчитываются командой recount_post_counters):
     - like_count: количество лайков
     - comment_count: количество комментариев
     - repost_count: количество репостов
+    - activity_at: время последнего изменения счётчиков; по нему пересчёт трендов (core/trending.py)
+      выбирает только посты, активность которых изменилась
     """
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField(max_length=280)
@@ -85,18 +103,25 @@ class Post(models.Model):
     is_quote = models.BooleanField(default=False)
     quoted_post = models.ForeignKey('self', null=True, blank=True, related_name='quotes', on_delete=models.SET_NULL)
     is_pinned = models.BooleanField(default=False)
+    entities = models.JSONField(default=dict, blank=True)
 
-    def __str__(self):
-        return f"{self.author.username}: {self.content[:50]}"
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    repost_count = models.PositiveIntegerField(default=0)
+    activity_at = models.DateTimeField(null=True, blank=True)
 
-    def like_count(self):
-        return self.likes.count()
-
-    def comment_count(self):
-        return self.replies.count()
+    class Meta:
+        indexes = [
+            # общая лента и окно трендов: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['-created_at', '-id'], name='core_post_recent'),
+            # посты пользователя
+            models.Index(fields=['author', '-created_at', '-id'], name='core_post_author_recent'),
+            # посты с активностью после прошлого пересчёта трендов
+            models.Index(fields=['activity_at'], name='core_post_activity'),
+        ]
 
-    def repost_count(self):
-        return self.reposts.count()
+    def __str__(self):
+        return f"{self.author.username}: {self.content[:50]}"
 
     objects = models.Manager()
 
@@ -109,6 +134,7 @@ class Comment(models.Model):
     - content: текст комментария (до 280 символов)
     - created_at: дата и время создания
     - parent: если комментарий является ответом, ссылка на родительский комментарий (вложенность)
+    - entities: упоминания и хэштеги со смещениями, разобранные при сохранении (как у Post)
 
     Позволяет реализовать вложенные комментарии
     """
@@ -124,6 +150,15 @@ class Comment(models.Model):
         related_name='replies',
         on_delete=models.CASCADE
     )
+    entities = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            # дерево комментариев поста читается целиком в порядке (created_at, id)
+            models.Index(fields=['post', 'created_at', 'id'], name='core_comment_post_created'),
+            # комментарии пользователя
+            models.Index(fields=['user', '-created_at', '-id'], name='core_comment_user_recent'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} прокомментировал пост {self.post.id}"
@@ -138,12 +173,21 @@ class Repost(models.Model):
     - original_post: исходный пост
     - created_at: дата и время репоста
 
-    Обеспечивает возможность делиться постами
+    Обеспечивает возможность делиться постами. Пост репостится пользователем не больше одного раза.
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     original_post = models.ForeignKey(Post, related_name='reposts', on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # на неё же опираются get_or_create в PostRepostAPIView и проверка «репостнул ли» в ViewerState
+            models.UniqueConstraint(fields=['user', 'original_post'], name='core_repost_user_post'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='core_repost_user_recent'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} репостнул пост {self.original_post.id}"
 
@@ -214,11 +258,16 @@ class Notification(models.Model):
     """
     Уведомления пользователя:
     - recipient: получатель уведомления
-    - sender: отправитель уведомления
+    - sender: отправитель уведомления (для сгруппированных — последний из отправителей)
     - notification_type: тип (лайк, комментарий, репост, упоминание)
     - post, comment, repost: объекты, связанные с уведомлением (опционально)
     - created_at: дата создания
     - is_read: прочитано/непрочитано
+    - group_key: ключ группы ('like:<post_id>', 'repost:<post_id>'); лайки и репосты одного поста
+      сворачиваются в одну строку, у остальных типов группы нет (NULL)
+    - count: число разных отправителей в группе
+    - recent_senders: id последних отправителей, от новых к старым (не больше RECENT_SENDERS_LIMIT)
+    - last_activity_at: время последнего события группы, по нему сортируется список
     """
     NOTIFICATION_TYPES = (
         ('like', 'Лайк'),
@@ -226,6 +275,8 @@ class Notification(models.Model):
         ('repost', 'Репост'),
         ('mention', 'Упоминание'),
     )
+    GROUPED_TYPES = ('like', 'repost')
+    RECENT_SENDERS_LIMIT = 3
 
     recipient = models.ForeignKey(User, related_name='notifications', on_delete=models.CASCADE)
     sender = models.ForeignKey(User, related_name='sent_notifications', on_delete=models.CASCADE)
@@ -235,8 +286,225 @@ class Notification(models.Model):
     repost = models.ForeignKey(Repost, on_delete=models.CASCADE, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
+    group_key = models.CharField(max_length=64, null=True, blank=True)
+    count = models.PositiveIntegerField(default=1)
+    recent_senders = models.JSONField(default=list, blank=True)
+    last_activity_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['recipient', 'group_key'], name='core_notification_group'),
+        ]
+        indexes = [
+            models.Index(fields=['recipient', '-last_activity_at', '-id'], name='core_notification_activity'),
+            # частичный индекс непрочитанных: mark_notifications_read и пересчёт счётчика
+            models.Index(
+                fields=['recipient', '-last_activity_at', '-id'],
+                condition=models.Q(is_read=False),
+                name='core_notification_unread',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.sender.username} {self.notification_type} -> {self.recipient.username}"
 
+    @classmethod
+    def group_key_for(cls, notification_type, post_id):
+        """Ключ группы для события или None, если события этого типа не группируются."""
+        if notification_type in cls.GROUPED_TYPES and post_id is not None:
+            return f'{notification_type}:{post_id}'
+        return None
+
+    objects = models.Manager()
+
+
+class NotificationSender(models.Model):
+    """
+    Отправители сгруппированного уведомления — по одной строке на пару (уведомление, отправитель).
+    Повторное событие того же отправителя (лайк, снятый и поставленный снова) не увеличивает count.
+    """
+    notification = models.ForeignKey(Notification, related_name='senders', on_delete=models.CASCADE)
+    sender = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('notification', 'sender')
+
+    objects = models.Manager()
+
+
+class TimelineEntry(models.Model):
+    """
+    Строка материализованной домашней ленты пользователя (fan-out on write):
+    при создании поста он раскладывается в ленты подписчиков автора.
+    - user: владелец ленты
+    - post: пост в ленте
+    - author: автор поста (для быстрого удаления при отписке)
+    - created_at: копия Post.created_at, ключ сортировки ленты
+
+    Чтение ленты — один диапазонный проход по индексу (user, -created_at, -post).
+    """
+    user = models.ForeignKey(User, related_name='timeline_entries', on_delete=models.CASCADE)
+    post = models.ForeignKey(Post, related_name='timeline_entries', on_delete=models.CASCADE)
+    author = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post'], name='core_timeline_user_created'),
+            models.Index(fields=['user', 'author'], name='core_timeline_user_author'),
+        ]
+
+    def __str__(self):
+        return f"Лента {self.user_id}: пост {self.post_id}"
+
+    objects = models.Manager()
+
+
+class TrendingPost(models.Model):
+    """
+    Предрасчитанный трендовый рейтинг поста (core/trending.py):
+    - post: пост (он же первичный ключ)
+    - score: логарифм взвешенной активности (лайки, комментарии, репосты), затухающей с возрастом
+      поста, с точностью до общего для всех постов слагаемого — меняется только вместе со счётчиками
+    - refreshed_at: время последнего пересчёта
+
+    В таблице только посты из окна TRENDING_WINDOW_HOURS с ненулевой активностью,
+    топ-N читается по индексу на score.
+    """
+    post = models.OneToOneField(Post, primary_key=True, related_name='trending', on_delete=models.CASCADE)
+    score = models.FloatField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=['-score'], name='core_trending_score')]
+
+    def __str__(self):
+        return f"Пост {self.post_id}: {self.score:.3f}"
+
+    objects = models.Manager()
+
+
+class Hashtag(models.Model):
+    """Хэштег; name хранится в нижнем регистре и без '#'."""
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return f"#{self.name}"
+
+    objects = models.Manager()
+
+
+class PostHashtag(models.Model):
+    """
+    Хэштег в тексте поста. created_at — копия Post.created_at:
+    «посты с #тегом» читаются диапазоном по индексу (hashtag, -created_at, -post).
+    """
+    post = models.ForeignKey(Post, related_name='hashtag_links', on_delete=models.CASCADE)
+    hashtag = models.ForeignKey(Hashtag, related_name='post_links', on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('hashtag', 'post')
+        indexes = [
+            models.Index(fields=['hashtag', '-created_at', '-post'], name='core_posthashtag_recent'),
+        ]
+
+    def __str__(self):
+        return f"Пост {self.post_id}: #{self.hashtag_id}"
+
+    objects = models.Manager()
+
+
+class PostMention(models.Model):
+    """
+    Упоминание пользователя в тексте поста. created_at — копия Post.created_at:
+    «посты, где меня упомянули» читаются диапазоном по индексу (user, -created_at, -post).
+    """
+    post = models.ForeignKey(Post, related_name='mention_links', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name='post_mentions', on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post'], name='core_postmention_recent'),
+        ]
+
+    def __str__(self):
+        return f"Пост {self.post_id}: @{self.user_id}"
+
+    objects = models.Manager()
+
+
+class CommentHashtag(models.Model):
+    """Хэштег в тексте комментария. created_at — копия Comment.created_at (как у PostHashtag)."""
+    comment = models.ForeignKey(Comment, related_name='hashtag_links', on_delete=models.CASCADE)
+    hashtag = models.ForeignKey(Hashtag, related_name='comment_links', on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('hashtag', 'comment')
+        indexes = [
+            models.Index(fields=['hashtag', '-created_at', '-comment'], name='core_commenthashtag_recent'),
+        ]
+
+    def __str__(self):
+        return f"Комментарий {self.comment_id}: #{self.hashtag_id}"
+
+    objects = models.Manager()
+
+
+class CommentMention(models.Model):
+    """Упоминание пользователя в тексте комментария. created_at — копия Comment.created_at (как у PostMention)."""
+    comment = models.ForeignKey(Comment, related_name='mention_links', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name='comment_mentions', on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'comment')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-comment'], name='core_commentmention_recent'),
+        ]
+
+    def __str__(self):
+        return f"Комментарий {self.comment_id}: @{self.user_id}"
+
+    objects = models.Manager()
+
+
+class EmailOutbox(models.Model):
+    """
+    Исходящее письмо (outbox): запрос только записывает строку, отправкой занимается
+    диспетчер core/mailer.py — пачками через одно SMTP-соединение, с повторами.
+    - subject, body, from_email, to: содержимое письма (to — список адресов); body стирается
+      после отправки или последней неудачной попытки — в нём бывают токены сброса пароля
+    - status: ожидает отправки / отправлено / не отправлено (исчерпаны попытки)
+    - attempts: число неудачных попыток; next_attempt_at: когда пробовать снова
+    - last_error: текст последней ошибки
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Ожидает отправки'),
+        ('sent', 'Отправлено'),
+        ('failed', 'Не отправлено'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'], name='core_outbox_due')]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
     objects = models.Manager()
@@ -0,0 +1,191 @@
+# backend/core/notifications.py
+# Асинхронная запись уведомлений:
+# - обработчики сигналов вызывают notify(...) — событие ставится в очередь после фиксации транзакции
+# - фоновый поток (core.background.BackgroundWorker) пишет накопленные события пачками через bulk_create;
+#   пачка пишется одной транзакцией, а если она упала — события повторяются по одному (retry_items)
+# - лайки и репосты сворачиваются в одну строку на (получатель, тип, пост): count, последние
+#   отправители и время последней активности; повтор события от того же отправителя игнорируется
+#   (уникальная пара в NotificationSender)
+# - Profile.unread_notifications_count — число непрочитанных строк уведомлений получателя;
+#   меняется вместе с записью уведомлений и в mark_notifications_read, поэтому бейдж читается без COUNT
+# - записанные уведомления отправляются подключённым клиентам событием 'notification' (core/realtime.py)
+# - flush_notifications() записывает очередь немедленно (тесты, завершение процесса)
+
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .background import BackgroundWorker
+from .models import Notification, NotificationSender, Profile
+from .pagination import keyset_filter
+from .realtime import publish
+
+
+def change_unread_counts(deltas):
+    """
+    Изменяет счётчики непрочитанных: deltas — {user_id: delta}.
+    Пользователи с одинаковой дельтой обновляются одним UPDATE; значение не опускается ниже нуля.
+    """
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+    for delta, user_ids in by_delta.items():
+        Profile.objects.filter(user_id__in=user_ids).update(
+            unread_notifications_count=Greatest(F('unread_notifications_count') + delta, Value(0))
+        )
+
+
+def write_notifications(events):
+    grouped = {}
+    single = []
+    for event in events:
+        key = Notification.group_key_for(event['notification_type'], event.get('post_id'))
+        if key is None:
+            single.append(Notification(recent_senders=[event['sender_id']], **event))
+        else:
+            grouped.setdefault((event['recipient_id'], key), []).append(event)
+    with transaction.atomic():
+        unread = Counter(notification.recipient_id for notification in single)
+        if single:
+            Notification.objects.bulk_create(single, batch_size=500)
+        written = list(single)
+        if grouped:
+            became_unread, changed = write_grouped_notifications(grouped)
+            unread.update(became_unread)
+            written.extend(changed)
+        change_unread_counts(unread)
+    # Клиентам отправляются только записанные уведомления — после успешного завершения транзакции
+    for notification in written:
+        publish([notification.recipient_id], 'notification', realtime_payload(notification))
+
+
+def realtime_payload(notification):
+    """Краткое описание уведомления для события 'notification' (полные данные — в списке уведомлений)."""
+    return {
+        'id': notification.pk,
+        'notification_type': notification.notification_type,
+        'sender_id': notification.sender_id,
+        'post_id': notification.post_id,
+        'count': notification.count,
+    }
+
+
+def write_grouped_notifications(groups):
+    """
+    groups: {(recipient_id, group_key): [события в порядке поступления]}.
+    Недостающие строки групп создаются, затем к каждой добавляются новые отправители.
+    Строки групп блокируются (select_for_update), чтобы параллельные процессы не теряли обновления.
+    Возвращает получателей, у которых группа стала непрочитанной (для счётчика непрочитанных),
+    и изменённые строки групп.
+    """
+    with transaction.atomic():
+        Notification.objects.bulk_create([
+            Notification(
+                recipient_id=recipient_id,
+                group_key=key,
+                sender_id=events[0]['sender_id'],
+                notification_type=events[0]['notification_type'],
+                post_id=events[0]['post_id'],
+                count=0,
+                last_activity_at=events[0]['last_activity_at'],
+            )
+            for (recipient_id, key), events in groups.items()
+        ], ignore_conflicts=True)
+
+        recipients = {recipient_id for recipient_id, key in groups}
+        keys = {key for recipient_id, key in groups}
+        rows = {
+            (row.recipient_id, row.group_key): row
+            for row in Notification.objects.select_for_update().filter(recipient_id__in=recipients, group_key__in=keys)
+            if (row.recipient_id, row.group_key) in groups
+        }
+        known = set(
+            NotificationSender.objects.filter(notification__in=rows.values())
+            .values_list('notification_id', 'sender_id')
+        )
+
+        new_senders = []
+        changed = []
+        became_unread = []
+        for group, events in groups.items():
+            row = rows[group]
+            fresh = []
+            for event in events:
+                if (row.pk, event['sender_id']) not in known:
+                    known.add((row.pk, event['sender_id']))
+                    fresh.append(event)
+            if not fresh:
+                continue
+            new_senders.extend(
+                NotificationSender(notification=row, sender_id=event['sender_id'], created_at=event['last_activity_at'])
+                for event in fresh
+            )
+            recent = [event['sender_id'] for event in reversed(fresh)]
+            recent += [pk for pk in row.recent_senders if pk not in recent]
+            row.recent_senders = recent[:Notification.RECENT_SENDERS_LIMIT]
+            row.sender_id = fresh[-1]['sender_id']
+            row.count += len(fresh)
+            row.last_activity_at = max(row.last_activity_at, fresh[-1]['last_activity_at'])
+            # новая группа (count был 0) или прочитанная снова становится непрочитанной
+            if row.is_read or row.count == len(fresh):
+                became_unread.append(row.recipient_id)
+            row.is_read = False
+            changed.append(row)
+
+        NotificationSender.objects.bulk_create(new_senders, batch_size=500)
+        Notification.objects.bulk_update(
+            changed, ['recent_senders', 'sender', 'count', 'last_activity_at', 'is_read'], batch_size=500
+        )
+    return became_unread, changed
+
+
+def mark_notifications_read(user, up_to=None):
+    """
+    Отмечает уведомления пользователя прочитанными одним UPDATE и уменьшает счётчик.
+    up_to — уведомление, до которого (включительно) прочитан список: отмечаются оно и все,
+    что ниже него в порядке (-last_activity_at, -id); более свежие остаются непрочитанными.
+    Без up_to отмечаются все. Возвращает число отмеченных уведомлений.
+    """
+    queryset = Notification.objects.filter(recipient=user, is_read=False)
+    if up_to is not None:
+        queryset = queryset.filter(
+            keyset_filter(('-last_activity_at', '-id'), (up_to.last_activity_at, up_to.pk)) | Q(pk=up_to.pk)
+        )
+    with transaction.atomic():
+        marked = queryset.update(is_read=True)
+        change_unread_counts({user.pk: -marked})
+    return marked
+
+
+notification_writer = BackgroundWorker('notifications', write_notifications, retry_items=True)
+
+
+def notify(events):
+    """
+    Ставит уведомления в очередь записи. events — словари с полями Notification
+    (recipient_id, sender_id, notification_type, post_id, comment_id, repost_id).
+    Уведомления самому себе отбрасываются; время события фиксируется сразу, а не при записи. Запись начинается только после фиксации
+    текущей транзакции, чтобы связанные строки уже были видны фоновому потоку.
+    """
+    now = timezone.now()
+    events = [
+        dict(event, last_activity_at=event.get('last_activity_at', now))
+        for event in events if event['recipient_id'] != event['sender_id']
+    ]
+    if not events:
+        return
+
+    def submit():
+        for event in events:
+            notification_writer.submit(event)
+
+    transaction.on_commit(submit)
+
+
+def flush_notifications():
+    """Синхронно записывает все уведомления из очереди; возвращает их число."""
+    return notification_writer.flush()
@@ -0,0 +1,163 @@
+# backend/core/nplusone.py
+# Поиск N+1 во время запроса (режим разработки и тестов):
+# - NPlusOneDetector: обёртка execute_wrapper, считает запросы по отпечатку (core/sqlstats.py);
+#   N+1 — отпечаток, выполненный больше NPLUSONE_THRESHOLD раз за запрос
+# - у каждого запроса определяется источник по стеку вызовов: метод сериализатора
+#   (PostSerializer.get_reposts, UserSerializer.get_avatar) или поле, при чтении которого выполнился
+#   запрос (PostSerializer.comments); вне сериализаторов — функция кода проекта (core.views:get_object)
+# - NPlusOneMiddleware в конце запроса сообщает о найденном по NPLUSONE_MODE:
+#   'warn' — NPlusOneWarning, 'log' — журнал core.nplusone, 'raise' — NPlusOneError
+#   (тестовый клиент пробрасывает её в тест); пусто — выключено
+# - detect_nplusone(): то же для произвольного блока кода (тесты, команды)
+# Разбор стека дорогой, поэтому в production режим не включается.
+
+import logging
+import re
+import sys
+import warnings
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+from .sqlstats import fingerprint
+
+logger = logging.getLogger(__name__)
+
+MODES = ('warn', 'log', 'raise')
+
+# Управление транзакциями повторяется законно
+IGNORED_RE = re.compile(r'^(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|BEGIN|COMMIT)\b', re.IGNORECASE)
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+# Модули учёта запросов: их кадры есть в стеке каждого запроса и источником не бывают
+INSTRUMENTATION_FILES = {
+    str(Path(__file__).resolve()),
+    str(PROJECT_DIR / 'core' / 'sqlstats.py'),
+    str(PROJECT_DIR / 'core' / 'timing.py'),
+    str(PROJECT_DIR / 'core' / 'metrics.py'),
+}
+
+
+def nplusone_mode():
+    mode = getattr(settings, 'NPLUSONE_MODE', None)
+    return mode if mode in MODES else None
+
+
+def nplusone_threshold():
+    return getattr(settings, 'NPLUSONE_THRESHOLD', 3)
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def _is_project_file(filename):
+    return (
+        filename.startswith(str(PROJECT_DIR))
+        and 'site-packages' not in filename
+        and filename not in INSTRUMENTATION_FILES
+    )
+
+
+def query_source(frame):
+    """
+    Источник запроса по стеку, начиная с frame (ближайший к запросу кадр):
+    первый метод get_* сериализатора проекта или поле сериализатора DRF, которое сериализуется;
+    если сериализаторов в стеке нет — первая функция проекта.
+    """
+    fallback = None
+    while frame is not None:
+        code = frame.f_code
+        instance = frame.f_locals.get('self')
+        if isinstance(instance, BaseSerializer):
+            own = _is_project_file(code.co_filename)
+            if own and code.co_name.startswith('get_') and code.co_name != 'get_attribute':
+                return f'{type(instance).__name__}.{code.co_name}'
+            field = frame.f_locals.get('field') if code.co_name == 'to_representation' and not own else None
+            if field is not None and getattr(field, 'field_name', None):
+                return f'{type(instance).__name__}.{field.field_name}'
+        if fallback is None and _is_project_file(code.co_filename):
+            module = frame.f_globals.get('__name__', '?')
+            fallback = f'{module}:{code.co_name}'
+        frame = frame.f_back
+    return fallback or '?'
+
+
+class NPlusOneDetector:
+    """Обёртка execute_wrapper: запросы по отпечатку и их источники."""
+
+    def __init__(self, threshold=None):
+        self.threshold = nplusone_threshold() if threshold is None else threshold
+        self.counts = Counter()
+        self.sources = defaultdict(Counter)
+        self.examples = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        key = fingerprint(sql)
+        if not IGNORED_RE.match(key):
+            self.counts[key] += 1
+            self.sources[key][query_source(sys._getframe(1))] += 1
+            self.examples.setdefault(key, sql)
+        return execute(sql, params, many, context)
+
+    def problems(self):
+        """[(отпечаток, число запросов, [(источник, число)])] для отпечатков сверх порога."""
+        return [
+            (key, count, self.sources[key].most_common())
+            for key, count in self.counts.most_common()
+            if count > self.threshold
+        ]
+
+    def report(self, label=''):
+        lines = []
+        for key, count, sources in self.problems():
+            where = ', '.join(f'{source} ({n})' for source, n in sources)
+            lines.append(f'N+1{label}: {count} x {key}\n    источник: {where}')
+        return '\n'.join(lines)
+
+    def emit(self, mode, label=''):
+        """Сообщает о найденных N+1 в режиме mode; возвращает отчёт (пустой — N+1 нет)."""
+        report = self.report(label)
+        if not report:
+            return report
+        if mode == 'raise':
+            raise NPlusOneError(report)
+        if mode == 'warn':
+            warnings.warn(report, NPlusOneWarning, stacklevel=2)
+        elif mode == 'log':
+            logger.warning(report)
+        return report
+
+
+@contextmanager
+def detect_nplusone(mode='raise', threshold=None, label=''):
+    """with detect_nplusone('raise'): ... — по выходе из блока сообщает о N+1 в режиме mode."""
+    detector = NPlusOneDetector(threshold)
+    with connections['default'].execute_wrapper(detector):
+        yield detector
+    detector.emit(mode, label)
+
+
+class NPlusOneMiddleware:
+    """Ищет N+1 в каждом запросе, если задан NPLUSONE_MODE."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = nplusone_mode()
+        if mode is None:
+            return self.get_response(request)
+        detector = NPlusOneDetector()
+        with connections['default'].execute_wrapper(detector):
+            response = self.get_response(request)
+        detector.emit(mode, f' {request.method} {request.path}')
+        return response
@@ -0,0 +1,138 @@
+# backend/core/pagination.py
+# Keyset (cursor) пагинация для списков API:
+# - страница выбирается условием по паре (created_at, id), а не OFFSET, поэтому стоимость
+#   любой страницы одинакова и не зависит от её номера
+# - COUNT(*) не выполняется: наличие следующей страницы определяется выборкой page_size + 1 строк
+# - курсор непрозрачный (base64 от JSON), клиент просто передаёт ссылку next
+
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values):
+    """Кодирует значения ключа сортировки в непрозрачную строку курсора."""
+    raw = json.dumps(
+        [value.isoformat() if hasattr(value, 'isoformat') else value for value in values],
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Обратная операция к encode_cursor. При повреждённом курсоре возвращает None."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (TypeError, ValueError, UnicodeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def keyset_filter(ordering, values):
+    """
+    Условие «строго после values» для сортировки ordering из двух полей,
+    например ('-created_at', '-id'): (created_at < v1) OR (created_at = v1 AND id < v2).
+    """
+    (first, second), (v1, v2) = ordering, values
+    lookup = 'lt' if first.startswith('-') else 'gt'
+    first, second = first.lstrip('-'), second.lstrip('-')
+    return Q(**{f'{first}__{lookup}': v1}) | Q(**{first: v1, f'{second}__{lookup}': v2})
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (created_at, id).
+    Представление может переопределить сортировку атрибутом keyset_ordering,
+    например ('-last_activity_at', '-id') — второе поле должно быть уникальным.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def get_ordering(self, view):
+        return tuple(getattr(view, 'keyset_ordering', self.ordering))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_position(self, queryset, ordering, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        values = decode_cursor(cursor)
+        if values is None or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                queryset.model._meta.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering_fields = self.get_ordering(view)
+        page_size = self.get_page_size(request)
+
+        position = self.decode_position(queryset, self.ordering_fields, request)
+        results = self.fetch_page(queryset, position, page_size + 1)
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        return self.page
+
+    def peek_page(self, queryset, request, view, fields):
+        """
+        Значения fields для строк страницы, которую вернёт запрос, без загрузки объектов
+        и сериализации (используется для вычисления ETag).
+        """
+        self.request = request
+        self.ordering_fields = self.get_ordering(view)
+        position = self.decode_position(queryset, self.ordering_fields, request)
+        page_size = self.get_page_size(request)
+        return self.fetch_page(queryset.values_list(*fields), position, page_size + 1)
+
+    def fetch_page(self, queryset, position, limit):
+        """Выбирает до limit объектов строго после position (None — с начала)."""
+        queryset = queryset.order_by(*self.ordering_fields)
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(self.ordering_fields, position))
+        return list(queryset[:limit])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [getattr(last, name.lstrip('-')) for name in self.ordering_fields]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(values))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,269 @@
+# backend/core/realtime.py
+# Доставка событий клиентам в реальном времени (Server-Sent Events):
+# - publish(user_ids, event, data): отправить событие пользователям; вызывается из синхронного кода
+#   (обработчики сигналов, фоновый writer уведомлений) после фиксации транзакции
+# - Hub: подключения этого процесса — по asyncio.Queue на соединение; доставка в цикл событий
+#   через call_soon_threadsafe, без потоков на соединение
+# - бэкенд pub/sub подключаемый (REALTIME_BACKEND):
+#   LocalBackend — события доходят только до подключений в этом же процессе;
+#   RedisBackend — события идут через канал Redis и доходят до подключений во всех процессах
+# - sse_application: ASGI-приложение потока событий (маршрутизируется в backend/asgi.py);
+#   авторизация — JWT в параметре ?token= (EventSource не умеет передавать заголовки) или в Authorization
+
+import asyncio
+import json
+import logging
+import threading
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def heartbeat_interval():
+    return getattr(settings, 'REALTIME_HEARTBEAT_SECONDS', 25)
+
+
+def queue_size():
+    return getattr(settings, 'REALTIME_QUEUE_SIZE', 100)
+
+
+class Subscription:
+    """Одно подключение: очередь событий в цикле событий, где обслуживается соединение."""
+
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size())
+        self.overflowed = False
+
+    def deliver(self, message):
+        # Выполняется в цикле событий подключения
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать — соединение закрывается, клиент переподключится
+            self.overflowed = True
+
+
+class Hub:
+    """Реестр подключений процесса: user_id -> подписки."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self.lock:
+            self.subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.user_id]
+
+    def connected(self):
+        with self.lock:
+            return sum(len(subscriptions) for subscriptions in self.subscriptions.values())
+
+    def dispatch(self, user_ids, message):
+        """Передаёт сообщение подключениям пользователей user_ids; можно вызывать из любого потока."""
+        with self.lock:
+            targets = [
+                subscription
+                for user_id in user_ids
+                for subscription in self.subscriptions.get(user_id, ())
+            ]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # цикл событий уже закрыт
+                self.unsubscribe(subscription)
+
+
+hub = Hub()
+
+
+class LocalBackend:
+    """Pub/sub в памяти процесса: подходит для одного процесса (runserver, один воркер uvicorn)."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, user_ids, message):
+        self.hub.dispatch(user_ids, message)
+
+    def start(self):
+        pass
+
+
+class RedisBackend:
+    """
+    Pub/sub через канал Redis (REALTIME_REDIS_URL, REALTIME_REDIS_CHANNEL): каждое событие
+    публикуется один раз вместе со списком получателей, а каждый процесс доставляет его
+    своим подключениям. Нужен пакет redis.
+    """
+
+    def __init__(self, hub):
+        try:
+            import redis
+        except ImportError as exc:
+            raise ImproperlyConfigured("Для RedisBackend нужен пакет redis") from exc
+        self.hub = hub
+        self.url = getattr(settings, 'REALTIME_REDIS_URL', 'redis://localhost:6379/0')
+        self.channel = getattr(settings, 'REALTIME_REDIS_CHANNEL', 'vdvuhslovah:realtime')
+        self.client = redis.Redis.from_url(self.url)
+        self.listener = None
+        self.start_lock = threading.Lock()
+
+    def publish(self, user_ids, message):
+        self.client.publish(self.channel, json.dumps({'recipients': list(user_ids), 'message': message}))
+
+    def start(self):
+        # Слушатель канала — один поток на процесс, запускается при первом подключении
+        with self.start_lock:
+            if self.listener is None or not self.listener.is_alive():
+                self.listener = threading.Thread(target=self.listen, name='realtime-redis', daemon=True)
+                self.listener.start()
+
+    def listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        for item in pubsub.listen():
+            try:
+                payload = json.loads(item['data'])
+                self.hub.dispatch(payload['recipients'], payload['message'])
+            except (TypeError, ValueError, KeyError):
+                logger.warning("realtime: повреждённое сообщение в канале %s", self.channel)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend_class = import_string(getattr(settings, 'REALTIME_BACKEND', 'core.realtime.LocalBackend'))
+                _backend = backend_class(hub)
+    return _backend
+
+
+def publish(user_ids, event, data):
+    """Отправляет событие event с данными data пользователям user_ids после фиксации транзакции."""
+    user_ids = sorted({pk for pk in user_ids if pk is not None})
+    if not user_ids:
+        return
+    message = {'event': event, 'data': data}
+
+    def send():
+        try:
+            get_backend().publish(user_ids, message)
+        except Exception:
+            # Доставка в реальном времени — подсказка клиенту, её сбой не должен ломать запись
+            logger.exception("realtime: не удалось опубликовать событие %s", event)
+
+    transaction.on_commit(send)
+
+
+def format_event(message):
+    return f"event: {message['event']}\ndata: {json.dumps(message['data'], separators=(',', ':'))}\n\n".encode('utf-8')
+
+
+def _authenticate(raw_token):
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+    # Соединение открывается вне обработчика запросов Django — закрываем устаревшие подключения к БД сами
+    close_old_connections()
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    finally:
+        close_old_connections()
+
+
+def _raw_token(scope):
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    if query.get('token'):
+        return query['token'][0]
+    for name, value in scope.get('headers', ()):
+        if name == b'authorization':
+            parts = value.decode('latin-1').split()
+            if len(parts) == 2 and parts[0] in settings.SIMPLE_JWT.get('AUTH_HEADER_TYPES', ('Bearer',)):
+                return parts[1]
+    return None
+
+
+async def _respond(send, status, body):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json; charset=utf-8')]})
+    await send({'type': 'http.response.body', 'body': json.dumps(body, ensure_ascii=False).encode('utf-8')})
+
+
+async def _wait_disconnect(receive):
+    while True:
+        if (await receive())['type'] == 'http.disconnect':
+            return
+
+
+async def sse_application(scope, receive, send):
+    """
+    Поток событий текущего пользователя: 'notification' (новое или обновлённое уведомление)
+    и 'post' (новый пост в домашней ленте). Простаивающее соединение — корутина и очередь;
+    раз в REALTIME_HEARTBEAT_SECONDS отправляется комментарий-пинг, чтобы прокси не закрывали его.
+    """
+    raw_token = _raw_token(scope)
+    user = await sync_to_async(_authenticate)(raw_token) if raw_token else None
+    if user is None:
+        await _respond(send, 401, {'detail': 'Учетные данные не были предоставлены.'})
+        return
+
+    get_backend().start()
+    subscription = hub.subscribe(user.pk)
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b': connected\n\n', 'more_body': True})
+        while True:
+            message = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait({message, disconnected}, timeout=heartbeat_interval(),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                message.cancel()
+                break
+            if message not in done:
+                message.cancel()
+                await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+                continue
+            if subscription.overflowed:
+                break
+            await send({'type': 'http.response.body', 'body': format_event(message.result()), 'more_body': True})
+        if not disconnected.done():
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        hub.unsubscribe(subscription)
+        disconnected.cancel()
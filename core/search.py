@@ -0,0 +1,178 @@
+# backend/core/search.py
+# Полнотекстовый поиск по постам поверх индекса базы данных (миграция 0019_post_search_index):
+# - PostgreSQL: столбец core_post.search_vector (tsvector) с GIN-индексом,
+#   запрос — websearch_to_tsquery, релевантность — ts_rank_cd
+# - SQLite: таблица FTS5 core_post_fts, поддерживаемая триггерами, релевантность — bm25
+# - остальные базы: поиск подстрок каждого слова (icontains) без ранжирования, новые посты сверху
+# - search_post_hits: страница (id, rank) по убыванию релевантности с keyset-позицией (rank, id);
+#   релевантность считается только для SEARCH_MAX_CANDIDATES самых новых совпадений, чтобы частое
+#   слово не заставляло ранжировать весь индекс на каждой странице
+# - SearchPagination: keyset-пагинация результатов поиска для posts/search/
+
+import re
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.exceptions import NotFound
+
+from .models import Post
+from .pagination import KeysetPagination, decode_cursor
+
+# Должна совпадать с конфигурацией генерируемого столбца в миграции 0019
+POSTGRES_TS_CONFIG = 'russian'
+
+MAX_QUERY_LENGTH = 200
+
+
+def max_candidates():
+    return getattr(settings, 'SEARCH_MAX_CANDIDATES', 1000)
+
+SQLITE_TRIGGERS = {
+    'core_post_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS core_post_fts_insert AFTER INSERT ON core_post BEGIN
+            INSERT INTO core_post_fts(rowid, content) VALUES (new.id, new.content);
+        END
+    """,
+    'core_post_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS core_post_fts_delete AFTER DELETE ON core_post BEGIN
+            INSERT INTO core_post_fts(core_post_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+    """,
+    'core_post_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS core_post_fts_update AFTER UPDATE OF content ON core_post BEGIN
+            INSERT INTO core_post_fts(core_post_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO core_post_fts(rowid, content) VALUES (new.id, new.content);
+        END
+    """,
+}
+
+
+def ensure_sqlite_triggers(using_connection=None):
+    """
+    SQLite пересоздаёт таблицу при части изменений схемы (ALTER через копирование),
+    и триггеры core_post при этом пропадают. Восстанавливает их и перестраивает индекс.
+    """
+    conn = using_connection or connection
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'core_post_fts'")
+        if cursor.fetchone() is None:
+            return False
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'core_post'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(SQLITE_TRIGGERS[name])
+        if missing:
+            cursor.execute("INSERT INTO core_post_fts(core_post_fts) VALUES ('rebuild')")
+    return bool(missing)
+
+
+def normalize_query(text):
+    return ' '.join((text or '').split())[:MAX_QUERY_LENGTH]
+
+
+def _sqlite_match(text):
+    # Каждое слово — отдельная фраза в кавычках: пользовательский ввод не разбирается как синтаксис FTS5
+    terms = re.findall(r'\w+', text)
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def _fallback_hits(text, position, limit):
+    """Поиск без полнотекстового индекса: все слова запроса — подстроки поста; rank у всех 0."""
+    queryset = Post.objects.all()
+    for term in text.split():
+        queryset = queryset.filter(content__icontains=term)
+    if position is not None:
+        # позиция (rank, id): после rank > 0 идут все посты, после rank = 0 — с меньшим id
+        rank, pk = position
+        if rank < 0:
+            return []
+        if rank == 0:
+            queryset = queryset.filter(pk__lt=pk)
+    return [(pk, 0.0) for pk in queryset.order_by('-pk').values_list('pk', flat=True)[:limit]]
+
+
+def _page_sql(hits_sql, position, limit):
+    sql = f"SELECT id, rank FROM ({hits_sql}) hits"
+    params = []
+    if position is not None:
+        sql += " WHERE rank < %s OR (rank = %s AND id < %s)"
+        params = [position[0], position[0], position[1]]
+    sql += " ORDER BY rank DESC, id DESC LIMIT %s"
+    return sql, params + [limit]
+
+
+def search_post_hits(text, position=None, limit=20):
+    """
+    До limit пар (post_id, rank) по убыванию релевантности строго после position = (rank, id).
+    Чем больше rank, тем выше пост в выдаче. Ранжируются только max_candidates() самых новых
+    совпадений: они берутся по убыванию id, не вычисляя релевантность остальных.
+    """
+    text = normalize_query(text)
+    if not text:
+        return []
+    table = Post._meta.db_table
+    if connection.vendor == 'postgresql':
+        hits_sql = (
+            f"SELECT p.id, ts_rank_cd(p.search_vector, q.query)::float8 AS rank "
+            f"FROM websearch_to_tsquery('{POSTGRES_TS_CONFIG}', %s) AS q(query), LATERAL ("
+            f"SELECT id, search_vector FROM {table} WHERE search_vector @@ q.query ORDER BY id DESC LIMIT %s"
+            f") p"
+        )
+        params = [text, max_candidates()]
+    elif connection.vendor == 'sqlite':
+        match = _sqlite_match(text)
+        if not match:
+            return []
+        # bm25 тем меньше, чем релевантнее, поэтому берётся с обратным знаком;
+        # FTS5 отдаёт совпадения по убыванию rowid без сортировки, LIMIT обрывает обход
+        hits_sql = (
+            f"SELECT rowid AS id, -bm25({table}_fts) AS rank FROM {table}_fts "
+            f"WHERE {table}_fts MATCH %s ORDER BY rowid DESC LIMIT %s"
+        )
+        params = [match, max_candidates()]
+    else:
+        return _fallback_hits(text, position, limit)
+    page_sql, page_params = _page_sql(hits_sql, position, limit)
+    with connection.cursor() as cursor:
+        cursor.execute(page_sql, params + page_params)
+        return [(row[0], float(row[1])) for row in cursor.fetchall()]
+
+
+class SearchPagination(KeysetPagination):
+    """
+    Keyset-пагинация результатов поиска: позиция — (релевантность, id) последнего поста страницы.
+    Текст запроса берётся из параметра q; найденным постам проставляется атрибут search_rank.
+    """
+    ordering = ('-search_rank', '-id')
+    query_param = 'q'
+
+    def get_ordering(self, view):
+        return self.ordering
+
+    def decode_position(self, queryset, ordering, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        values = decode_cursor(cursor)
+        if (
+            values is None or len(values) != 2
+            or not isinstance(values[0], (int, float)) or not isinstance(values[1], int)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return float(values[0]), values[1]
+
+    def fetch_page(self, queryset, position, limit):
+        hits = search_post_hits(self.request.query_params.get(self.query_param), position, limit)
+        if not hits:
+            return []
+        posts = queryset.in_bulk([pk for pk, rank in hits])
+        page = []
+        for pk, rank in hits:
+            post = posts.get(pk)
+            if post is not None:
+                post.search_rank = rank
+                page.append(post)
+        return page
@@ -0,0 +1,411 @@
+# backend/core/seed.py
+# Синтетический набор данных для нагрузочных замеров (команда seed_dataset):
+# - воспроизводимость: все случайные величины берутся из random.Random(seed), одинаковые параметры
+#   дают одинаковые пользователей, граф, тексты и время событий
+# - граф подписок степенной: число подписок пользователя — распределение Парето, авторы выбираются
+#   с весами по закону Ципфа, поэтому есть немногие очень популярные авторы и длинный хвост
+# - посты (с ответами и цитатами), лайки, репосты, комментарии (с ответами) вставляются bulk_create
+#   пачками по batch_size строк
+# - сигналы при bulk_create не срабатывают, поэтому производные данные досчитываются явно:
+#   время создания, entities и индекс хэштегов / упоминаний, счётчики постов и подписок,
+#   домашние ленты, уведомления (лайки и репосты свёрнуты в группы, как в core/notifications.py)
+# - у пользователей набора имена с префиксом SEED_USERNAME_PREFIX; clear_dataset удаляет их
+#   вместе со всеми их данными
+
+import bisect
+import itertools
+import random
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .counters import recount_post_counters
+from .entities import extract_entities, hashtag_ids
+from .models import (
+    Comment, CommentHashtag, CommentMention, Follow, Notification, NotificationSender, Post, PostHashtag,
+    PostMention, Profile, Repost, TimelineEntry,
+)
+from .timeline import backfill_size, fanout_follower_limit
+
+SEED_USERNAME_PREFIX = 'seed_'
+SEED_PASSWORD = 'seed-password'
+
+WORDS = (
+    'сегодня', 'вчера', 'город', 'погода', 'кофе', 'работа', 'проект', 'код', 'релиз', 'идея',
+    'книга', 'фильм', 'музыка', 'концерт', 'поездка', 'море', 'горы', 'утро', 'вечер', 'друзья',
+    'новость', 'вопрос', 'ответ', 'спасибо', 'отлично', 'странно', 'интересно', 'наконец', 'снова',
+    'база', 'данных', 'запрос', 'индекс', 'сервер', 'клиент', 'лента', 'пост', 'комментарий',
+)
+HASHTAGS = (
+    'django', 'python', 'новости', 'спорт', 'музыка', 'кино', 'погода', 'работа', 'путешествия',
+    'еда', 'книги', 'разработка',
+)
+FIRST_NAMES = ('Анна', 'Иван', 'Мария', 'Пётр', 'Ольга', 'Алексей', 'Елена', 'Дмитрий', 'Наталья', 'Сергей')
+LAST_NAMES = ('Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Соколов', 'Морозов', 'Волков')
+
+# Доли и средние значения распределений
+REPLY_SHARE = 0.15
+QUOTE_SHARE = 0.05
+HASHTAG_SHARE = 0.3
+MENTION_SHARE = 0.15
+COMMENT_REPLY_SHARE = 0.3
+REPOST_SHARE = 0.1
+READ_AFTER_DAYS = 3
+
+
+def seed_users():
+    return User.objects.filter(username__startswith=SEED_USERNAME_PREFIX)
+
+
+def clear_dataset():
+    """Удаляет пользователей набора со всеми их данными (каскадно, с сигналами). Возвращает их число."""
+    with transaction.atomic():
+        count = seed_users().count()
+        seed_users().delete()
+    return count
+
+
+class DatasetGenerator:
+    """
+    Генератор набора: users пользователей, в среднем posts_per_user постов и follows_per_user подписок
+    на пользователя, likes_per_post лайков и comments_per_post комментариев на пост.
+    События распределены по последним days дням. run() возвращает Counter с числом вставленных строк.
+    """
+
+    def __init__(self, users=1000, posts_per_user=20, follows_per_user=20, likes_per_post=5,
+                 comments_per_post=1.5, days=30, seed=42, batch_size=1000, now=None):
+        self.rng = random.Random(seed)
+        self.users_count = users
+        self.posts_per_user = posts_per_user
+        self.follows_per_user = follows_per_user
+        self.likes_per_post = likes_per_post
+        self.comments_per_post = comments_per_post
+        self.span = timedelta(days=days).total_seconds()
+        self.batch_size = batch_size
+        self.now = (now or timezone.now()).replace(microsecond=0)
+        self.stats = Counter()
+
+    # --- случайные величины ---
+
+    def moment(self, after=None):
+        """Случайный момент из окна набора, не раньше after."""
+        start = self.now.timestamp() - self.span if after is None else after.timestamp()
+        return datetime.fromtimestamp(self.rng.uniform(start, self.now.timestamp()), tz=dt_timezone.utc)
+
+    def heavy_tail(self, mean, alpha=1.5):
+        """Целое с распределением Парето (alpha > 1) и средним примерно mean."""
+        return int(mean * (alpha - 1) / alpha * self.rng.paretovariate(alpha))
+
+    def sentence(self, low=5, high=20):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def text(self, mentionable=()):
+        parts = [self.sentence()]
+        if self.rng.random() < HASHTAG_SHARE:
+            parts.append(f'#{self.rng.choice(HASHTAGS)}')
+        if mentionable and self.rng.random() < MENTION_SHARE:
+            parts.append(f'@{self.rng.choice(mentionable).username}')
+        return ' '.join(parts)[:280]
+
+    def entities(self, text):
+        """То же, что core.entities.parse_entities, но по известным пользователям набора, без запросов."""
+        mentions, hashtags = extract_entities(text)
+        return {
+            'mentions': [
+                {'start': start, 'end': end, 'username': username, 'user_id': self.user_ids[username]}
+                for start, end, username in mentions if username in self.user_ids
+            ],
+            'hashtags': [{'start': start, 'end': end, 'tag': tag.lower()} for start, end, tag in hashtags],
+        }
+
+    # --- вставка ---
+
+    def bulk_create(self, model, objects, **kwargs):
+        objects = list(objects)
+        model.objects.bulk_create(objects, batch_size=self.batch_size, **kwargs)
+        self.stats[model._meta.model_name] += len(objects)
+        return objects
+
+    def bulk_create_dated(self, model, objects, update_fields=()):
+        """
+        bulk_create с сохранением сгенерированного created_at: auto_now_add перезаписывает его
+        при вставке, поэтому время событий записывается вторым проходом (bulk_update) вместе с update_fields.
+        """
+        objects = list(objects)
+        times = [obj.created_at for obj in objects]
+        self.bulk_create(model, objects)
+        for obj, created_at in zip(objects, times):
+            obj.created_at = created_at
+        model.objects.bulk_update(objects, ['created_at', *update_fields], batch_size=self.batch_size)
+        return objects
+
+    def run(self):
+        users = self.create_users()
+        followers = self.create_follows(users)
+        posts = self.create_posts(users, followers)
+        events = []
+        events += self.create_likes(users, posts, followers)
+        events += self.create_reposts(users, posts)
+        events += self.create_comments(users, posts)
+        events += self.mention_events(posts)
+        self.create_notifications(events)
+        self.create_timelines(users, posts, followers)
+        self.recount(posts)
+        return self.stats
+
+    def create_users(self):
+        password = make_password(SEED_PASSWORD)
+        users = []
+        for n in range(self.users_count):
+            users.append(User(
+                username=f'{SEED_USERNAME_PREFIX}{n:06d}',
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                email=f'{SEED_USERNAME_PREFIX}{n:06d}@example.com',
+                password=password,
+                date_joined=self.moment(),
+            ))
+        users = self.bulk_create(User, users)
+        self.bulk_create(Profile, [Profile(user=user, bio=self.sentence(3, 10)) for user in users])
+        self.user_ids = {user.username: user.pk for user in users}
+        return users
+
+    def create_follows(self, users):
+        """Степенной граф подписок. Возвращает {автор: [подписчики]}."""
+        # популярность автора — по закону Ципфа от его места в случайной перестановке
+        ranked = users[:]
+        self.rng.shuffle(ranked)
+        cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(ranked))))
+        followers = defaultdict(list)
+        follows = []
+        for user in users:
+            wanted = min(len(users) - 1, self.heavy_tail(self.follows_per_user))
+            chosen = {}  # словарь, а не множество: порядок не зависит от id в базе
+            for _ in range(wanted * 3):
+                if len(chosen) >= wanted:
+                    break
+                author = ranked[bisect.bisect(cum_weights, self.rng.random() * cum_weights[-1])]
+                if author is not user:
+                    chosen[author.username] = author
+            for author in chosen.values():
+                followers[author].append(user)
+                follows.append(Follow(follower=user, following=author))
+        self.bulk_create(Follow, follows)
+        return followers
+
+    def create_posts(self, users, followers):
+        """Посты в порядке времени; ответы и цитаты ссылаются только на более ранние посты."""
+        following = defaultdict(list)
+        for author, readers in followers.items():
+            for reader in readers:
+                following[reader].append(author)
+        posts = []
+        for user in users:
+            for _ in range(self.heavy_tail(self.posts_per_user)):
+                posts.append(Post(author=user, created_at=self.moment()))
+        posts.sort(key=lambda post: post.created_at)
+        times = [post.created_at for post in posts]
+
+        for index, post in enumerate(posts):
+            earlier = posts[self.rng.randrange(index)] if index else None
+            post.reply_to = post.quote_of = None
+            roll = self.rng.random()
+            if earlier is not None and roll < REPLY_SHARE:
+                post.reply_to = earlier
+                post.content = f'@{earlier.author.username} {self.sentence()}'[:280]
+            else:
+                if earlier is not None and roll < REPLY_SHARE + QUOTE_SHARE:
+                    post.quote_of = earlier
+                    post.is_quote = True
+                post.content = self.text(following[post.author])
+            post.entities = self.entities(post.content)
+
+        # ссылки на другие посты проставляются после вставки, когда у всех постов есть id
+        self.bulk_create(Post, posts)
+        for post, created_at in zip(posts, times):
+            post.created_at = created_at
+            post.parent = post.reply_to
+            post.quoted_post = post.quote_of
+        Post.objects.bulk_update(posts, ['created_at'], batch_size=self.batch_size)
+        linked = [post for post in posts if post.parent or post.quoted_post]
+        Post.objects.bulk_update(linked, ['parent', 'quoted_post'], batch_size=self.batch_size)
+
+        self.bulk_create(PostMention, [
+            PostMention(post=post, user_id=mention['user_id'], created_at=post.created_at)
+            for post in posts for mention in {m['user_id']: m for m in post.entities['mentions']}.values()
+        ])
+        tags = hashtag_ids(sorted({h['tag'] for post in posts for h in post.entities['hashtags']}))
+        self.bulk_create(PostHashtag, [
+            PostHashtag(post=post, hashtag_id=tags[tag], created_at=post.created_at)
+            for post in posts for tag in dict.fromkeys(h['tag'] for h in post.entities['hashtags'])
+        ])
+        return posts
+
+    def create_likes(self, users, posts, followers):
+        """Лайки: число на пост — с тяжёлым хвостом, лайкают в основном подписчики автора."""
+        Like = Post.likes.through
+        likes, events = [], []
+        for post in posts:
+            audience = followers.get(post.author) or users
+            count = min(len(audience), self.heavy_tail(self.likes_per_post))
+            for user in self.rng.sample(audience, count):
+                likes.append(Like(post_id=post.pk, user_id=user.pk))
+                events.append({
+                    'recipient_id': post.author_id, 'sender_id': user.pk, 'notification_type': 'like',
+                    'post_id': post.pk, 'last_activity_at': self.moment(post.created_at),
+                })
+        self.bulk_create(Like, likes, ignore_conflicts=True)
+        return events
+
+    def create_reposts(self, users, posts):
+        """Репосты: в среднем REPOST_SHARE от числа лайков, не больше одного на пару (пользователь, пост)."""
+        reposts = []
+        for post in posts:
+            count = self.heavy_tail(self.likes_per_post * REPOST_SHARE)
+            reposters = {self.rng.choice(users) for _ in range(count)} - {post.author}
+            for user in sorted(reposters, key=lambda user: user.pk):
+                reposts.append(Repost(user=user, original_post=post, created_at=self.moment(post.created_at)))
+        self.bulk_create_dated(Repost, reposts)
+        return [{
+            'recipient_id': repost.original_post.author_id, 'sender_id': repost.user_id,
+            'notification_type': 'repost', 'post_id': repost.original_post_id, 'repost_id': repost.pk,
+            'last_activity_at': repost.created_at,
+        } for repost in reposts]
+
+    def create_comments(self, users, posts):
+        """Комментарии верхнего уровня, затем ответы на них (в том же посте и позже по времени)."""
+        top, replies = [], []
+        for post in posts:
+            for _ in range(self.heavy_tail(self.comments_per_post)):
+                content = self.text()
+                top.append(Comment(user=self.rng.choice(users), post=post, content=content,
+                                   created_at=self.moment(post.created_at), entities=self.entities(content)))
+        self.bulk_create_dated(Comment, top)
+        for comment in top:
+            if self.rng.random() < COMMENT_REPLY_SHARE:
+                content = f'@{comment.user.username} {self.sentence()}'[:280]
+                replies.append(Comment(user=self.rng.choice(users), post=comment.post, parent=comment,
+                                       content=content, created_at=self.moment(comment.created_at),
+                                       entities=self.entities(content)))
+        self.bulk_create_dated(Comment, replies)
+        comments = top + replies
+        self.bulk_create(CommentMention, [
+            CommentMention(comment=comment, user_id=mention['user_id'], created_at=comment.created_at)
+            for comment in comments for mention in {m['user_id']: m for m in comment.entities['mentions']}.values()
+        ])
+        tags = hashtag_ids(sorted({h['tag'] for comment in comments for h in comment.entities['hashtags']}))
+        self.bulk_create(CommentHashtag, [
+            CommentHashtag(comment=comment, hashtag_id=tags[tag], created_at=comment.created_at)
+            for comment in comments for tag in dict.fromkeys(h['tag'] for h in comment.entities['hashtags'])
+        ])
+        events = [{
+            'recipient_id': comment.post.author_id, 'sender_id': comment.user_id,
+            'notification_type': 'comment', 'post_id': comment.post_id, 'comment_id': comment.pk,
+            'last_activity_at': comment.created_at,
+        } for comment in comments]
+        # упоминания в комментариях — как в core/signals.py: автору поста хватает уведомления 'comment'
+        events += [{
+            'recipient_id': mention['user_id'], 'sender_id': comment.user_id, 'notification_type': 'mention',
+            'post_id': comment.post_id, 'comment_id': comment.pk, 'last_activity_at': comment.created_at,
+        } for comment in comments for mention in comment.entities['mentions']
+            if mention['user_id'] != comment.post.author_id]
+        return events
+
+    def mention_events(self, posts):
+        return [{
+            'recipient_id': mention['user_id'], 'sender_id': post.author_id, 'notification_type': 'mention',
+            'post_id': post.pk, 'last_activity_at': post.created_at,
+        } for post in posts for mention in {m['user_id']: m for m in post.entities['mentions']}.values()]
+
+    def create_notifications(self, events):
+        """
+        Уведомления в том виде, в каком их записал бы core/notifications.py: лайки и репосты поста
+        свёрнуты в строку группы (count, recent_senders, NotificationSender), остальные события —
+        по строке на событие. Группы собираются в памяти и вставляются bulk_create, без обновлений
+        строк групп на каждую пачку событий.
+        """
+        events = sorted(
+            (event for event in events if event['recipient_id'] != event['sender_id']),
+            key=lambda event: event['last_activity_at'],
+        )
+        rows, groups, group_senders = [], {}, defaultdict(dict)
+        for event in events:
+            key = Notification.group_key_for(event['notification_type'], event['post_id'])
+            if key is None:
+                rows.append(Notification(recent_senders=[event['sender_id']], **event))
+                continue
+            group = groups.get((event['recipient_id'], key))
+            if group is None:
+                group = groups[(event['recipient_id'], key)] = Notification(
+                    recipient_id=event['recipient_id'], group_key=key, notification_type=event['notification_type'],
+                    post_id=event['post_id'], count=0, recent_senders=[],
+                )
+            senders = group_senders[(event['recipient_id'], key)]
+            if event['sender_id'] in senders:
+                continue
+            senders[event['sender_id']] = event['last_activity_at']
+            group.count += 1
+            group.sender_id = event['sender_id']
+            group.last_activity_at = event['last_activity_at']
+            group.recent_senders = [event['sender_id'], *group.recent_senders][:Notification.RECENT_SENDERS_LIMIT]
+        rows.extend(groups.values())
+        # старые уведомления считаются прочитанными
+        read_before = self.now - timedelta(days=READ_AFTER_DAYS)
+        for row in rows:
+            row.is_read = row.last_activity_at < read_before
+        self.bulk_create(Notification, rows)
+        self.bulk_create(NotificationSender, [
+            NotificationSender(notification=groups[group], sender_id=sender_id, created_at=created_at)
+            for group, senders in group_senders.items() for sender_id, created_at in senders.items()
+        ])
+
+        unread = (
+            Notification.objects.filter(recipient_id=OuterRef('user_id'), is_read=False)
+            .order_by().values('recipient_id').annotate(n=Count('pk')).values('n')
+        )
+        Profile.objects.filter(user__username__startswith=SEED_USERNAME_PREFIX).update(
+            unread_notifications_count=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+        )
+
+    def create_timelines(self, users, posts, followers):
+        """
+        Ленты в состоянии после rebuild_timeline: свои посты и последние backfill_size постов
+        каждого автора, раскладываемого при записи.
+        """
+        recent = defaultdict(list)
+        for post in reversed(posts):
+            if len(recent[post.author]) < backfill_size():
+                recent[post.author].append(post)
+        limit = fanout_follower_limit()
+        entries = []
+        for author, author_posts in recent.items():
+            readers = [author] + (followers.get(author, []) if len(followers.get(author, [])) < limit else [])
+            for reader in readers:
+                entries.extend(
+                    TimelineEntry(user=reader, post=post, author=author, created_at=post.created_at)
+                    for post in author_posts
+                )
+                if len(entries) >= self.batch_size * 10:
+                    self.bulk_create(TimelineEntry, entries, ignore_conflicts=True)
+                    entries = []
+        self.bulk_create(TimelineEntry, entries, ignore_conflicts=True)
+
+    def recount(self, posts):
+        recount_post_counters(Post.objects.filter(author__username__startswith=SEED_USERNAME_PREFIX))
+
+        def counted(field):
+            subquery = (
+                Follow.objects.filter(**{field: OuterRef('user_id')})
+                .order_by().values(field).annotate(n=Count('pk')).values('n')
+            )
+            return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+        Profile.objects.filter(user__username__startswith=SEED_USERNAME_PREFIX).update(
+            followers_count=counted('following'), following_count=counted('follower'),
+        )
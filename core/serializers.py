@@ -4,6 +4,7 @@
 # - Пользователи и расширенные профили с аватаром, баннером, подписками
 # - Посты с поддержкой лайков, репостов, комментариев, цитат (quoted_post)
 # - Комментарии с рекурсивной вложенностью (ответы на комментарии)
+# - Упоминания и хэштеги постов и комментариев со смещениями (поле entities)
 # - Репосты и избранное
 # - Регистрация с подтверждением email и автогенерацией пароля
 # - Сброс и смена пароля с проверкой токенов
@@ -15,17 +16,65 @@
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import models
 from .models import Profile, Post, Repost, Comment, Notification
+from .loaders import RequestLoaders, ViewerState
+from .mailer import queue_email
+from .images import ImageRejected, check_image_upload, image_url, schedule_profile_images
+from .timing import TimedListSerializer, TimedModelSerializer, TimedSerializer
 from django.contrib.auth.models import User
 
 import random
 import string
+from urllib.parse import urlencode
 from rest_framework import serializers
 
 
-class UserSerializer(serializers.ModelSerializer):
+def _user_fk(model, name):
+    """Поле модели name, если это внешний ключ на пользователя, иначе None."""
+    try:
+        field = model._meta.get_field(name)
+    except Exception:
+        return None
+    if field.many_to_one and field.related_model is User:
+        return field
+    return None
+
+
+class LoadedUserMixin:
+    """
+    Вложенный сериализатор пользователя, который берёт связанного пользователя через
+    загрузчик запроса (core.loaders.RequestLoaders) вместо ленивого obj.<fk> на каждый объект.
+    Если связь уже загружена через select_related, используется она.
+    """
+
+    def get_attribute(self, instance):
+        if _user_fk(type(instance), self.source) is None:
+            return super().get_attribute(instance)
+        return RequestLoaders.for_context(self.context).user_for(instance, self.source)
+
+
+class UserBatchListSerializer(TimedListSerializer):
+    """
+    Список объектов со вложенными пользователями: до сериализации собирает id всех
+    пользователей страницы (и их профилей), чтобы загрузчик получил их одним IN-запросом.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        model = getattr(getattr(self.child, 'Meta', None), 'model', None)
+        user_ids = []
+        for field in self.child.fields.values():
+            fk = isinstance(field, LoadedUserMixin) and model and _user_fk(model, field.source)
+            if fk:
+                user_ids.extend(getattr(item, fk.attname) for item in items)
+        if user_ids:
+            RequestLoaders.for_context(self.context).prime_users(user_ids)
+        return super().to_representation(items)
+
+
+class UserSerializer(LoadedUserMixin, TimedModelSerializer):
     avatar = serializers.SerializerMethodField()
     display_name = serializers.SerializerMethodField()
 
@@ -35,7 +84,8 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_avatar(self, obj):
         try:
-            return obj.profile.avatar.url if obj.profile.avatar else None
+            profile = RequestLoaders.for_context(self.context).profile_for(obj)
+            return image_url(profile, 'avatar', 'sm', self.context.get('request'), absolute=False)
         except Exception:
             return None
 
@@ -47,19 +97,38 @@ class UserSerializer(serializers.ModelSerializer):
             return obj.username
 
 
-class RecursiveField(serializers.Serializer):
+class EntitiesField(serializers.ReadOnlyField):
+    """
+    Упоминания и хэштеги со смещениями, разобранные при сохранении (core/entities.py).
+    У текстов, ещё не разобранных командой reindex_entities, — пустые списки.
+    """
+
     def to_representation(self, value):
-        serializer = self.parent.parent.__class__(value, context=self.context)
-        return serializer.data
+        return {'mentions': [], 'hashtags': [], **(value or {})}
+
+
+class CommentListSerializer(UserBatchListSerializer):
+    """Ответы на все комментарии страницы загружаются вместе, по запросу на уровень вложенности."""
 
+    def to_representation(self, data):
+        comments = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        RequestLoaders.for_context(self.context).replies.prime(comment.pk for comment in comments)
+        return super().to_representation(comments)
 
-class CommentSerializer(serializers.ModelSerializer):
+
+class CommentSerializer(TimedModelSerializer):
     user = UserSerializer(read_only=True)
-    replies = RecursiveField(many=True, read_only=True)
+    replies = serializers.SerializerMethodField()
+    entities = EntitiesField()
 
     class Meta:
         model = Comment
-        fields = ['id', 'user', 'content', 'created_at', 'parent', 'replies']
+        fields = ['id', 'user', 'content', 'entities', 'created_at', 'parent', 'replies']
+        list_serializer_class = CommentListSerializer
+
+    def get_replies(self, obj):
+        replies = RequestLoaders.for_context(self.context).replies_for(obj)
+        return self.__class__(replies, many=True, context=self.context).data
 
     def create(self, validated_data):
         user = self.context['request'].user
@@ -69,13 +138,40 @@ class CommentSerializer(serializers.ModelSerializer):
         return Comment.objects.create(user=user, post=post, content=content, parent=parent)
 
 
-class SimpleUserSerializer(serializers.ModelSerializer):
+class CommentTreeSerializer(CommentSerializer):
+    """
+    Узел дерева комментариев, собранного в памяти (core.comment_tree.CommentTree):
+    ответы берутся из tree_replies и не запрашиваются из БД.
+    replies_next — ссылка на продолжение ветки, если ответы обрезаны по глубине или ширине.
+    """
+    replies = serializers.SerializerMethodField()
+    replies_count = serializers.IntegerField(source='tree_replies_count', read_only=True)
+    replies_next = serializers.SerializerMethodField()
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['replies_count', 'replies_next']
+
+    def get_replies(self, obj):
+        return CommentTreeSerializer(obj.tree_replies, many=True, context=self.context).data
+
+    def get_replies_next(self, obj):
+        if not obj.tree_has_more:
+            return None
+        request = self.context.get('request')
+        params = {'parent': obj.id}
+        if obj.tree_cursor:
+            params['cursor'] = obj.tree_cursor
+        url = f"{request.path}?{urlencode(params)}" if request else f"?{urlencode(params)}"
+        return request.build_absolute_uri(url) if request else url
+
+
+class SimpleUserSerializer(TimedModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username')
 
 
-class SimplePostSerializer(serializers.ModelSerializer):
+class SimplePostSerializer(TimedModelSerializer):
     author = SimpleUserSerializer(read_only=True)
 
     class Meta:
@@ -83,7 +179,7 @@ class SimplePostSerializer(serializers.ModelSerializer):
         fields = ('id', 'author', 'content', 'created_at')
 
 
-class SimpleRepostSerializer(serializers.ModelSerializer):
+class SimpleRepostSerializer(TimedModelSerializer):
     user = SimpleUserSerializer(read_only=True)
 
     class Meta:
@@ -91,7 +187,7 @@ class SimpleRepostSerializer(serializers.ModelSerializer):
         fields = ('id', 'user', 'created_at')
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedModelSerializer):
     avatar = serializers.SerializerMethodField()
     banner = serializers.SerializerMethodField()
     name = serializers.CharField(source='user.get_full_name', read_only=True)
@@ -120,40 +216,29 @@ class ProfileSerializer(serializers.ModelSerializer):
         )
 
     def get_avatar(self, obj):
-        request = self.context.get('request')
-        if obj.avatar and hasattr(obj.avatar, 'url'):
-            return request.build_absolute_uri(obj.avatar.url) if request else obj.avatar.url
-        return None
+        return image_url(obj, 'avatar', 'lg', self.context.get('request'))
 
     def get_banner(self, obj):
-        request = self.context.get('request')
-        if obj.banner and hasattr(obj.banner, 'url'):
-            return request.build_absolute_uri(obj.banner.url) if request else obj.banner.url
-        return None
+        return image_url(obj, 'banner', 'lg', self.context.get('request'))
 
     def get_posts(self, obj):
-        qs = Post.objects.filter(author=obj.user).order_by('-created_at')
+        qs = Post.objects.filter(author=obj.user).select_related('author').order_by('-created_at')
         return SimplePostSerializer(qs, many=True, context=self.context).data
 
     def get_reposts(self, obj):
-        qs = Repost.objects.filter(user=obj.user).order_by('-created_at')
+        qs = Repost.objects.filter(user=obj.user).select_related('user').order_by('-created_at')
         return SimpleRepostSerializer(qs, many=True, context=self.context).data
 
     def get_liked_posts(self, obj):
-        qs = Post.objects.filter(likes=obj.user).order_by('-created_at')
+        qs = Post.objects.filter(likes=obj.user).select_related('author').order_by('-created_at')
         return SimplePostSerializer(qs, many=True, context=self.context).data
 
+    # Денормализованные счётчики профиля (поддерживаются сигналами Follow), без COUNT по подпискам
     def get_followers_count(self, obj):
-        try:
-            return obj.user.followers.count()
-        except Exception:
-            return 0
+        return obj.followers_count
 
     def get_following_count(self, obj):
-        try:
-            return obj.user.following.count()
-        except Exception:
-            return 0
+        return obj.following_count
 
     def get_is_followed_by_user(self, obj):
         request = self.context.get('request')
@@ -165,7 +250,7 @@ class ProfileSerializer(serializers.ModelSerializer):
             return False
 
 
-class ProfileUpdateSerializer(serializers.ModelSerializer):
+class ProfileUpdateSerializer(TimedModelSerializer):
     first_name = serializers.CharField(source='user.first_name', allow_blank=True, required=False)
     last_name = serializers.CharField(source='user.last_name', allow_blank=True, required=False)
     email = serializers.EmailField(source='user.email', required=False)
@@ -187,6 +272,20 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
             'country', 'city'
         )
 
+    def validate_image(self, value):
+        if value:
+            try:
+                check_image_upload(value)
+            except ImageRejected:
+                raise serializers.ValidationError("Изображение слишком большое.")
+        return value
+
+    def validate_avatar(self, value):
+        return self.validate_image(value)
+
+    def validate_banner(self, value):
+        return self.validate_image(value)
+
     def validate(self, data):
         pw = data.get('password')
         pw2 = data.get('password2')
@@ -207,14 +306,21 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
             setattr(user, attr, val)
         user.save()
 
+        uploaded = []
         for attr, val in validated_data.items():
             setattr(instance, attr, val)
+            if attr in ('avatar', 'banner'):
+                # Копии пересоздаются в фоне (core/images.py); до этого отдаётся оригинал
+                setattr(instance, f'{attr}_variants', {})
+                if val:
+                    uploaded.append(attr)
         instance.save()
+        schedule_profile_images(instance, uploaded)
 
         return instance
 
 
-class UserWithProfileSerializer(serializers.ModelSerializer):
+class UserWithProfileSerializer(TimedModelSerializer):
     profile = ProfileSerializer(read_only=True)
     name = serializers.SerializerMethodField()
 
@@ -226,50 +332,107 @@ class UserWithProfileSerializer(serializers.ModelSerializer):
         return f"{obj.first_name} {obj.last_name}".strip()
 
 
-class PostSerializer(serializers.ModelSerializer):
-    author = UserWithProfileSerializer(read_only=True)
+class AuthorCardSerializer(LoadedUserMixin, TimedModelSerializer):
+    """
+    Компактная карточка автора поста: id, username, отображаемое имя и URL аватара.
+    Карточки кэшируются в контексте запроса (identity map): каждый автор сериализуется
+    один раз на ответ, сколько бы его постов ни было на странице.
+    Для аватара нужен select_related('author__profile') в запросе постов.
+    """
+    context_key = 'author_cards'
+
+    display_name = serializers.SerializerMethodField()
+    avatar = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'display_name', 'avatar')
+
+    def to_representation(self, instance):
+        cards = self.context.setdefault(self.context_key, {})
+        card = cards.get(instance.pk)
+        if card is None:
+            card = cards[instance.pk] = super().to_representation(instance)
+        return card
+
+    def get_display_name(self, obj):
+        return obj.get_full_name() or obj.username
+
+    def get_avatar(self, obj):
+        profile = RequestLoaders.for_context(self.context).profile_for(obj)
+        return image_url(profile, 'avatar', 'sm', self.context.get('request'))
+
+
+class PostListSerializer(UserBatchListSerializer):
+    """
+    Перед сериализацией страницы загружает состояние текущего пользователя, комментарии
+    и репосты для всех её постов.
+    """
+
+    def to_representation(self, data):
+        posts = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        ViewerState.for_context(self.context).prime(post.pk for post in posts)
+        RequestLoaders.for_context(self.context).prime_posts(post.pk for post in posts)
+        return super().to_representation(posts)
+
+
+class PostSerializer(TimedModelSerializer):
+    author = AuthorCardSerializer(read_only=True)
     author_username = serializers.CharField(source='author.username', read_only=True)
     like_count = serializers.IntegerField(read_only=True)
     comment_count = serializers.IntegerField(read_only=True)
     repost_count = serializers.IntegerField(read_only=True)
     liked_by_user = serializers.SerializerMethodField()
     reposted_by_user = serializers.SerializerMethodField()
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
     reposts = serializers.SerializerMethodField()
     quoted_post = SimplePostSerializer(read_only=True)  # если есть поле quoted_post в модели
+    entities = EntitiesField()
 
     class Meta:
         model = Post
         fields = (
-            'id', 'author', 'author_username', 'content', 'created_at',
+            'id', 'author', 'author_username', 'content', 'entities', 'created_at',
             'like_count', 'comment_count', 'repost_count', 'liked_by_user',
             'reposted_by_user', 'comments', 'reposts', 'quoted_post',
         )
+        list_serializer_class = PostListSerializer
 
     def get_liked_by_user(self, obj):
-        request = self.context.get('request')
-        return request.user.is_authenticated and obj.likes.filter(id=request.user.id).exists()
+        return ViewerState.for_context(self.context).is_liked(obj.pk)
 
     def get_reposted_by_user(self, obj):
-        request = self.context.get('request')
-        if not request.user.is_authenticated:
-            return False
-        return obj.reposts.filter(user=request.user).exists()
+        return ViewerState.for_context(self.context).is_reposted(obj.pk)
+
+    def get_comments(self, obj):
+        comments = RequestLoaders.for_context(self.context).comments.load(obj.pk)
+        return CommentSerializer(comments, many=True, context=self.context).data
 
     def get_reposts(self, obj):
-        return obj.reposts.values('id')
+        return RequestLoaders.for_context(self.context).repost_ids.load(obj.pk)
+
+
+class RepostListSerializer(UserBatchListSerializer):
+    """Загружает состояние текущего пользователя, комментарии и репосты исходных постов всей страницы."""
+
+    def to_representation(self, data):
+        reposts = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        ViewerState.for_context(self.context).prime(repost.original_post_id for repost in reposts)
+        RequestLoaders.for_context(self.context).prime_posts(repost.original_post_id for repost in reposts)
+        return super().to_representation(reposts)
 
 
-class RepostSerializer(serializers.ModelSerializer):
+class RepostSerializer(TimedModelSerializer):
     user = UserSerializer(read_only=True)
     original_post = PostSerializer(read_only=True)
 
     class Meta:
         model = Repost
         fields = ('id', 'user', 'created_at', 'original_post')
+        list_serializer_class = RepostListSerializer
 
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(TimedModelSerializer):
     generated_password = None
 
     class Meta:
@@ -331,16 +494,16 @@ class RegisterSerializer(serializers.ModelSerializer):
         uid = urlsafe_base64_encode(force_bytes(user.pk))
         token = default_token_generator.make_token(user)
         link = f"http://localhost:3000/activate?uid={uid}&token={token}"
-        send_mail(
+        # Письмо уходит через outbox (core/mailer.py), ответ не ждёт SMTP
+        queue_email(
             subject='Подтверждение регистрации',
-            message=f'Для активации аккаунта перейдите по ссылке:\n{link}',
-            from_email=settings.DEFAULT_FROM_EMAIL,
+            body=f'Для активации аккаунта перейдите по ссылке:\n{link}',
             recipient_list=[user.email],
-            fail_silently=False,
+            from_email=settings.DEFAULT_FROM_EMAIL,
         )
 
 
-class SendPasswordResetEmailSerializer(serializers.Serializer):
+class SendPasswordResetEmailSerializer(TimedSerializer):
     email = serializers.EmailField()
 
     def validate_email(self, value):
@@ -354,16 +517,15 @@ class SendPasswordResetEmailSerializer(serializers.Serializer):
         uid = urlsafe_base64_encode(force_bytes(user.pk))
         token = default_token_generator.make_token(user)
         reset_url = f"http://localhost:3000/reset-password?uid={uid}&token={token}"
-        send_mail(
+        queue_email(
             'Восстановление пароля',
             f"Перейдите по ссылке для сброса: {reset_url}",
-            settings.DEFAULT_FROM_EMAIL,
             [email],
-            fail_silently=False,
+            from_email=settings.DEFAULT_FROM_EMAIL,
         )
 
 
-class ResetPasswordSerializer(serializers.Serializer):
+class ResetPasswordSerializer(TimedSerializer):
     uid = serializers.CharField()
     token = serializers.CharField()
     new_password = serializers.CharField(min_length=6)
@@ -385,19 +547,48 @@ class ResetPasswordSerializer(serializers.Serializer):
         user.save()
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationListSerializer(UserBatchListSerializer):
+    """
+    Вместе с отправителями и получателями загружает последних отправителей всех групп страницы,
+    авторов комментариев и репостов, а также данные вложенных комментариев и репостнутых постов.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        loaders = RequestLoaders.for_context(self.context)
+        comments = [item.comment for item in items if item.comment_id]
+        reposts = [item.repost for item in items if item.repost_id]
+        loaders.prime_users(pk for item in items for pk in item.recent_senders)
+        loaders.prime_users([comment.user_id for comment in comments] + [repost.user_id for repost in reposts])
+        loaders.replies.prime(comment.pk for comment in comments)
+        loaders.prime_posts(repost.original_post_id for repost in reposts)
+        ViewerState.for_context(self.context).prime(repost.original_post_id for repost in reposts)
+        return super().to_representation(items)
+
+
+class NotificationSerializer(TimedModelSerializer):
+    """
+    Уведомление; для сгруппированных (лайки, репосты) count — число отправителей,
+    recent_senders — карточки последних из них («Алиса и ещё 41 оценили ваш пост»).
+    """
     sender = UserSerializer(read_only=True)
     recipient = UserSerializer(read_only=True)
     post = SimplePostSerializer(read_only=True)
     comment = CommentSerializer(read_only=True)
     repost = RepostSerializer(read_only=True)
+    recent_senders = serializers.SerializerMethodField()
 
     class Meta:
         model = Notification
         fields = '__all__'
+        list_serializer_class = NotificationListSerializer
 
+    def get_recent_senders(self, obj):
+        users = RequestLoaders.for_context(self.context).users.load_many(obj.recent_senders)
+        return [AuthorCardSerializer(user, context=self.context).data for user in users if user is not None]
 
-class PublicProfileSerializer(serializers.ModelSerializer):
+
+class PublicProfileSerializer(TimedModelSerializer):
     name = serializers.SerializerMethodField()
     avatar = serializers.SerializerMethodField()
     bio = serializers.CharField(read_only=True)
@@ -407,16 +598,14 @@ class PublicProfileSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'avatar', 'bio']
 
     def get_name(self, obj):
-        return obj.user.get_full_name() or obj.user.username
+        user = RequestLoaders.for_context(self.context).user_for(obj, 'user')
+        return user.get_full_name() or user.username
 
     def get_avatar(self, obj):
-        request = self.context.get('request')
-        if obj.avatar and hasattr(obj.avatar, 'url'):
-            return request.build_absolute_uri(obj.avatar.url) if request else obj.avatar.url
-        return None
+        return image_url(obj, 'avatar', 'md', self.context.get('request'))
 
 
-class FullProfileSerializer(serializers.ModelSerializer):
+class FullProfileSerializer(TimedModelSerializer):
     user = serializers.SerializerMethodField()
     avatar = serializers.SerializerMethodField()
     banner = serializers.SerializerMethodField()
@@ -438,13 +627,7 @@ class FullProfileSerializer(serializers.ModelSerializer):
         }
 
     def get_avatar(self, obj):
-        request = self.context.get('request')
-        if obj.avatar and hasattr(obj.avatar, 'url'):
-            return request.build_absolute_uri(obj.avatar.url) if request else obj.avatar.url
-        return None
+        return image_url(obj, 'avatar', 'lg', self.context.get('request'))
 
     def get_banner(self, obj):
-        request = self.context.get('request')
-        if obj.banner and hasattr(obj.banner, 'url'):
-            return request.build_absolute_uri(obj.banner.url) if request else obj.banner.url
-        return None
+        return image_url(obj, 'banner', 'lg', self.context.get('request'))
@@ -1,9 +1,19 @@
 #C:\Users\ASUS Vivobook\PycharmProjects\PythonProject1\vdvuhslovah\core\signals.py
 
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import pre_save, post_save, post_delete, post_migrate, m2m_changed
 from django.dispatch import receiver
+from django.db import connections
 from django.contrib.auth.models import User
-from .models import Profile, Post, Comment, Repost, Notification
+from django.db.models import F
+from django.db.models.functions import Greatest
+from .models import Profile, Post, Comment, Repost, Follow, Notification
+from .counters import change_post_counter
+from .likes import likes_changed, notify_likes
+from .timeline import add_own_post, schedule_fan_out, add_followed_posts, remove_followed_posts
+from .cache import invalidate_tags, post_tag, user_tag
+from .notifications import notify, change_unread_counts
+from .search import ensure_sqlite_triggers
+from .entities import parse_entities, index_entities, notify_mentions
 
 
 @receiver(post_save, sender=User)
@@ -14,40 +24,198 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=Comment)
 def create_comment_notification(sender, instance, created, **kwargs):
-    if created and instance.post.author != instance.user:
-        Notification.objects.create(
-            recipient=instance.post.author,
-            sender=instance.user,
-            notification_type='comment',
-            post=instance.post,
-            comment=instance
-        )
+    if created:
+        notify([{
+            'recipient_id': instance.post.author_id,
+            'sender_id': instance.user_id,
+            'notification_type': 'comment',
+            'post_id': instance.post_id,
+            'comment_id': instance.pk,
+        }])
 
 
 @receiver(post_save, sender=Repost)
 def create_repost_notification(sender, instance, created, **kwargs):
-    if created and instance.original_post.author != instance.user:
-        Notification.objects.create(
-            recipient=instance.original_post.author,
-            sender=instance.user,
-            notification_type='repost',
-            post=instance.original_post,
-            repost=instance
-        )
+    if created:
+        notify([{
+            'recipient_id': instance.original_post.author_id,
+            'sender_id': instance.user_id,
+            'notification_type': 'repost',
+            'post_id': instance.original_post_id,
+            'repost_id': instance.pk,
+        }])
+
+
+@receiver(m2m_changed, sender=Post.likes.through)
+def create_like_notification(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        # user.liked_posts.add(*posts): авторов всех постов берём одним запросом
+        likes = Post.objects.filter(pk__in=pk_set).values_list('pk', 'author_id')
+        events = [(post_id, author_id, instance.pk) for post_id, author_id in likes]
+    else:
+        events = [(instance.pk, instance.author_id, user_id) for user_id in pk_set]
+    notify_likes(events)
+
+
+@receiver(post_delete, sender=Notification)
+def on_notification_deleted(sender, instance, **kwargs):
+    # Уведомления удаляются вместе с постом / комментарием — непрочитанные уходят из счётчика
+    if not instance.is_read:
+        change_unread_counts({instance.recipient_id: -1})
+
+# --- Денормализованные счётчики поста ---
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        change_post_counter(instance.post_id, 'comment_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    change_post_counter(instance.post_id, 'comment_count', -1)
+
+
+@receiver(post_save, sender=Repost)
+def increment_repost_count(sender, instance, created, **kwargs):
+    if created:
+        change_post_counter(instance.original_post_id, 'repost_count', 1)
+
+
+@receiver(post_delete, sender=Repost)
+def decrement_repost_count(sender, instance, **kwargs):
+    change_post_counter(instance.original_post_id, 'repost_count', -1)
 
 
 @receiver(m2m_changed, sender=Post.likes.through)
-def create_like_notification(sender, instance, action, pk_set, **kwargs):
+def on_likes_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Поддерживает Post.like_count и сбрасывает кэш ответов затронутых постов
+    для post.likes.add/remove/clear и для обратной стороны (user.liked_posts.*).
+    В post_add Django передаёт только действительно добавленные связи, а для remove/clear
+    реально существующие связи считываются заранее, в pre_*, и передаются в post_* через instance.
+    """
+    if action in ('pre_remove', 'pre_clear'):
+        links = sender.objects.filter(**{'user_id' if reverse else 'post_id': instance.pk})
+        if action == 'pre_remove':
+            links = links.filter(**{'post_id__in' if reverse else 'user_id__in': pk_set})
+        if reverse:
+            instance._removed_likes = (list(links.values_list('post_id', flat=True)), 1)
+        else:
+            instance._removed_likes = ([instance.pk], links.count())
+        return
+
+    # (id затронутых постов, на сколько изменился like_count каждого из них)
     if action == 'post_add':
-        for user_id in pk_set:
-            liker = User.objects.get(pk=user_id)
-            if liker != instance.author:
-                Notification.objects.create(
-                    recipient=instance.author,
-                    sender=liker,
-                    notification_type='like',
-                    post=instance
-                )
+        post_ids, delta = (list(pk_set), 1) if reverse else ([instance.pk], len(pk_set))
+    elif action in ('post_remove', 'post_clear'):
+        post_ids, removed = instance.__dict__.pop('_removed_likes', ([], 0))
+        delta = -removed
+    else:
+        return
+    likes_changed(post_ids, delta)
+
+
+# --- Подписки и домашняя лента ---
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created:
+        add_own_post(instance)
+        # Ленты подписчиков заполняет фоновая очередь (core/timeline.py)
+        schedule_fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def on_follow_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    Profile.objects.filter(user_id=instance.following_id).update(followers_count=F('followers_count') + 1)
+    Profile.objects.filter(user_id=instance.follower_id).update(following_count=F('following_count') + 1)
+    add_followed_posts(instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def on_follow_deleted(sender, instance, **kwargs):
+    Profile.objects.filter(user_id=instance.following_id).update(
+        followers_count=Greatest(F('followers_count') - 1, 0)
+    )
+    Profile.objects.filter(user_id=instance.follower_id).update(
+        following_count=Greatest(F('following_count') - 1, 0)
+    )
+    remove_followed_posts(instance.follower_id, instance.following_id)
+
+
+# --- Инвалидация кэша ответов (core/cache.py) ---
+# (кэш постов при лайках сбрасывает on_likes_changed вместе со счётчиком)
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_cache(sender, instance, **kwargs):
+    invalidate_tags(post_tag(instance.pk), user_tag(instance.author_id))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_cache(sender, instance, **kwargs):
+    invalidate_tags(post_tag(instance.post_id), user_tag(instance.user_id))
+
+
+@receiver(post_save, sender=Repost)
+@receiver(post_delete, sender=Repost)
+def invalidate_repost_cache(sender, instance, **kwargs):
+    invalidate_tags(post_tag(instance.original_post_id), user_tag(instance.user_id))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_tags(user_tag(instance.pk))
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    invalidate_tags(user_tag(instance.user_id))
+
+
+# --- Полнотекстовый индекс постов (core/search.py) ---
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name == 'core':
+        ensure_sqlite_triggers(connections[using])
+
+
+# --- Упоминания и хэштеги (core/entities.py) ---
+
+def _content_saved(update_fields):
+    return update_fields is None or 'content' in update_fields
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def parse_text_entities(sender, instance, update_fields=None, **kwargs):
+    # Текст разбирается один раз при записи, результат сохраняется вместе со строкой
+    if _content_saved(update_fields):
+        instance.entities = parse_entities(instance.content)
+
+
+@receiver(post_save, sender=Post)
+def index_post_mentions_and_hashtags(sender, instance, created, update_fields=None, **kwargs):
+    if _content_saved(update_fields):
+        # При правке поста уведомляются только новые упомянутые
+        notify_mentions(instance.author_id, index_entities(instance, created), instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment_mentions_and_hashtags(sender, instance, created, update_fields=None, **kwargs):
+    if _content_saved(update_fields):
+        # Автор поста уже получает уведомление 'comment' об этом комментарии
+        new_users = index_entities(instance, created)
+        recipients = [pk for pk in new_users if pk != instance.post.author_id]
+        notify_mentions(instance.user_id, recipients, instance.post_id, instance.pk)
+
 
 # updated 2025-07-12 22:40:59
 
@@ -0,0 +1,77 @@
+# backend/core/sqlstats.py
+# Учёт SQL-запросов, выполненных в блоке кода (тесты бюджета запросов, диагностика N+1):
+# - fingerprint: отпечаток запроса — SQL без значений (литералы и параметры заменены на ?,
+#   списки IN (...) и VALUES (...) свёрнуты), так что запросы N+1 получают один отпечаток
+# - QueryLog: обёртка connection.execute_wrapper, записывает SQL и время каждого запроса
+# - capture_queries: контекстный менеджер, возвращающий QueryLog
+# - QueryLog.report(): запросы, сгруппированные по отпечатку, самые частые сверху
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w."])\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?')
+_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_VALUES_RE = re.compile(r'(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Отпечаток SQL: одинаковый у запросов, которые отличаются только значениями."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _LIST_RE.sub('(...)', sql)
+    sql = _VALUES_RE.sub(r'\1', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryLog:
+    """Обёртка выполнения запросов: сохраняет (sql, время в мс) каждого запроса."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+    def __len__(self):
+        return len(self.queries)
+
+    def fingerprints(self):
+        """Counter {отпечаток: число запросов}."""
+        return Counter(fingerprint(sql) for sql, _ in self.queries)
+
+    def report(self, limit=20):
+        """Текстовый отчёт: отпечатки по убыванию числа запросов, с суммарным временем и примером SQL."""
+        groups = {}
+        for sql, duration in self.queries:
+            group = groups.setdefault(fingerprint(sql), [0, 0.0, sql])
+            group[0] += 1
+            group[1] += duration
+        lines = [f"Всего запросов: {len(self.queries)}, разных: {len(groups)}"]
+        ordered = sorted(groups.items(), key=lambda item: (-item[1][0], -item[1][1]))
+        for key, (count, duration, example) in ordered[:limit]:
+            lines.append(f"{count:>5} x {duration:8.2f} мс  {key}")
+            if count > 1:
+                lines.append(f"          пример: {example}")
+        if len(ordered) > limit:
+            lines.append(f"... ещё {len(ordered) - limit} отпечатков")
+        return '\n'.join(lines)
+
+
+@contextmanager
+def capture_queries(using_connection=None):
+    """with capture_queries() as log: ... — запросы блока попадают в log (QueryLog)."""
+    log = QueryLog()
+    with (using_connection or connection).execute_wrapper(log):
+        yield log
@@ -1,25 +0,0 @@
-from django.test import TestCase
-
-# Create your tests here.
-
-# dummy update
-
-# updated 2025-07-12 11:27:40
-
-# updated 2025-07-12 11:31:56
-
-# updated 2025-07-12 11:40:37
-
-# updated 2025-07-12 22:40:59
-
-# updated 2025-07-12 23:07:08
-
-# updated 2025-07-13 21:53:56
-
-# updated 2025-07-13 22:00:14
-
-# updated 2025-07-13 22:09:14
-
-# updated 2025-07-13 23:07:46
-
-# updated 2025-07-13 23:32:13
@@ -0,0 +1,19 @@
+# backend/core/tests/runner.py
+# Запуск тестов (TEST_RUNNER): фоновые обработчики core/background.py не запускают потоков,
+# очереди разбираются только вызовами flush_*() в тестах. Поток, запущенный одним тестом,
+# жил бы до конца прогона и забирал элементы очередей у следующих.
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.inline_workers = override_settings(BACKGROUND_WORKERS_ASYNC=False)
+        self.inline_workers.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.inline_workers.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,50 @@
+# backend/core/tests/test_author_card.py
+# Карточка автора поста (AuthorCardSerializer): состав полей, одна карточка на автора в ответе,
+# авторы и их профили не догружаются по одному.
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Post
+from core.serializers import AuthorCardSerializer, PostSerializer
+
+
+class AuthorCardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            User.objects.create_user(f'author{number}', password='pw', first_name=f'Имя{number}')
+            for number in range(10)
+        ]
+        cls.quoted = Post.objects.create(author=cls.authors[0], content='цитируемый')
+        for number in range(20):
+            Post.objects.create(
+                author=cls.authors[number % 10], content=f'пост {number}',
+                is_quote=number % 2 == 0, quoted_post=cls.quoted if number % 2 == 0 else None,
+            )
+
+    def test_card_fields(self):
+        author = self.client.get('/api/posts/?page_size=1').json()['results'][0]['author']
+        self.assertEqual(author, {'id': self.authors[9].pk, 'username': 'author9', 'display_name': 'Имя9', 'avatar': None})
+        nameless = User.objects.create_user('nameless', password='pw')
+        self.assertEqual(AuthorCardSerializer(nameless).data['display_name'], 'nameless')
+
+    def test_each_author_is_serialized_once(self):
+        posts = list(Post.objects.filter(author=self.authors[0]).select_related('author__profile'))
+        context = {}
+        data = PostSerializer(posts, many=True, context=context).data
+        self.assertIs(data[0]['author'], data[1]['author'])
+        self.assertEqual(list(context['author_cards']), [self.authors[0].pk])
+
+    def test_authors_do_not_add_queries(self):
+        counts = {}
+        for page_size in (2, 20):
+            with CaptureQueriesContext(connection) as queries:
+                results = self.client.get(f'/api/posts/?page_size={page_size}').json()['results']
+            counts[page_size] = len(queries)
+        self.assertEqual(counts[2], counts[20])
+        self.assertEqual(len({post['author']['id'] for post in results}), 10)
+        self.assertEqual(results[1]['quoted_post']['author']['username'], 'author0')
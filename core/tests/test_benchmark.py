@@ -0,0 +1,74 @@
+# backend/core/tests/test_benchmark.py
+# Генератор набора данных (core/seed.py) и замеры маршрутов (core/benchmark.py) на маленьком наборе:
+# воспроизводимость по seed, согласованность денормализованных данных, сравнение с базовым замером.
+
+from datetime import datetime, timezone
+
+from django.db.models import Count
+from django.test import TestCase
+
+from core.benchmark import compare, percentile, run_benchmark
+from core.models import Follow, Notification, Post, Profile
+from core.seed import DatasetGenerator, clear_dataset, seed_users
+
+NOW = datetime(2025, 7, 1, tzinfo=timezone.utc)
+
+
+def generate(seed=7):
+    return DatasetGenerator(users=30, posts_per_user=4, follows_per_user=5, seed=seed, now=NOW).run()
+
+
+def fingerprint():
+    return list(
+        Post.objects.filter(author__username__startswith='seed_').order_by('created_at', 'id')
+        .values_list('author__username', 'content', 'created_at', 'like_count', 'comment_count')
+    )
+
+
+class DatasetGeneratorTests(TestCase):
+
+    def test_same_seed_gives_same_dataset(self):
+        generate()
+        first = fingerprint()
+        self.assertTrue(first)
+        clear_dataset()
+        self.assertFalse(seed_users().exists())
+        generate()
+        self.assertEqual(fingerprint(), first)
+
+    def test_derived_data_is_consistent(self):
+        generate()
+        for profile in Profile.objects.filter(user__in=seed_users()):
+            self.assertEqual(profile.followers_count, Follow.objects.filter(following=profile.user).count())
+            self.assertEqual(
+                profile.unread_notifications_count,
+                Notification.objects.filter(recipient=profile.user, is_read=False).count(),
+            )
+        post = Post.objects.annotate(likes_n=Count('likes')).order_by('-likes_n').first()
+        self.assertEqual(post.like_count, post.likes_n)
+        self.assertTrue(all(p.created_at <= NOW for p in Post.objects.all()))
+
+
+class BenchmarkTests(TestCase):
+
+    def test_percentile(self):
+        self.assertEqual(percentile(range(1, 101), 0.5), 50)
+        self.assertEqual(percentile(range(1, 101), 0.99), 99)
+        self.assertEqual(percentile([5], 0.95), 5)
+
+    def test_routes_are_measured_and_compared(self):
+        generate()
+        user = seed_users().order_by('id').first()
+        results = run_benchmark(user, repeat=2, only=['posts', 'post-comments', 'post-search'])
+        self.assertEqual(set(results['routes']), {'posts', 'post-comments', 'post-search'})
+        for result in results['routes'].values():
+            self.assertEqual(result['status'], 200)
+            self.assertGreater(result['queries'], 0)
+
+        baseline = {'routes': {name: dict(result) for name, result in results['routes'].items()}}
+        baseline['routes']['posts']['queries'] -= 1
+        baseline['routes']['post-search']['p95_ms'] = results['routes']['post-search']['p95_ms'] / 10
+        problems = {name: problems for name, result, base, problems in compare(results, baseline)}
+        self.assertEqual(problems['post-comments'], [])
+        self.assertEqual(len(problems['posts']), 1)
+        self.assertEqual(len(problems['post-search']), 1)
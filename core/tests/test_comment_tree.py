@@ -0,0 +1,60 @@
+# backend/core/tests/test_comment_tree.py
+# Дерево комментариев поста (core/comment_tree.py): одно чтение комментариев независимо от размера
+# и глубины дерева, ограничение глубины и ширины, продолжение веток по replies_next / next.
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Comment, Post
+
+
+@override_settings(COMMENT_TREE_MAX_DEPTH=2, COMMENT_REPLIES_PAGE_SIZE=3)
+class CommentTreeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pw')
+        cls.post = Post.objects.create(author=cls.author, content='пост')
+
+    def comment(self, content, parent=None, post=None):
+        return Comment.objects.create(user=self.author, post=post or self.post, parent=parent, content=content)
+
+    def contents(self, url):
+        return [comment['content'] for comment in self.client.get(url).json()['results']]
+
+    def count_queries(self, post):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(f'/api/posts/{post.pk}/comments/').status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_tree(self):
+        small = Post.objects.create(author=self.author, content='маленькое дерево')
+        self.comment('один', post=small)
+        for number in range(4):
+            root = self.comment(f'корень {number}')
+            for reply in range(3):
+                self.comment(f'ответ {reply}', parent=self.comment(f'ветка {reply}', parent=root))
+        self.assertEqual(self.count_queries(self.post), self.count_queries(small))
+
+    def test_depth_and_width_limits(self):
+        roots = [self.comment(f'r{number}') for number in range(4)]
+        replies = [self.comment(f'k{number}', parent=roots[0]) for number in range(5)]
+        self.comment('g', parent=replies[0])
+
+        data = self.client.get(f'/api/posts/{self.post.pk}/comments/').json()
+        self.assertEqual([comment['content'] for comment in data['results']], ['r0', 'r1', 'r2'])
+        first = data['results'][0]
+        self.assertEqual(first['replies_count'], 5)
+        self.assertEqual([reply['content'] for reply in first['replies']], ['k0', 'k1', 'k2'])
+        # ветка обрезана по глубине: ответов в дереве нет, но есть ссылка на них
+        deep = first['replies'][0]
+        self.assertEqual((deep['replies'], deep['replies_count']), ([], 1))
+        self.assertEqual(self.contents(deep['replies_next']), ['g'])
+        # ветка обрезана по ширине и корневые комментарии — продолжаются курсором
+        self.assertEqual(self.contents(first['replies_next']), ['k3', 'k4'])
+        self.assertEqual(self.contents(data['next']), ['r3'])
+        shallow = self.client.get(f'/api/posts/{self.post.pk}/comments/?depth=1').json()['results'][0]
+        self.assertEqual(shallow['replies'], [])
+        self.assertEqual(self.contents(shallow['replies_next']), ['k0', 'k1', 'k2'])
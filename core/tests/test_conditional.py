@@ -0,0 +1,78 @@
+# backend/core/tests/test_conditional.py
+# Условные GET (core/conditional.py): повторный запрос с тем же ETag получает 304,
+# любое изменение данных ответа — новый ETag и полный ответ.
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.cache import response_cache
+from core.models import Comment, Post, Profile
+from core.notifications import flush_notifications
+
+
+def auth_headers(user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+@override_settings(BACKGROUND_WORKERS_ASYNC=False)
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', password='pw')
+        cls.bob = User.objects.create_user('bob', password='pw')
+        cls.post = Post.objects.create(author=cls.alice, content='пост')
+
+    def setUp(self):
+        response_cache().clear()
+
+    def etag(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200, url)
+        return response['ETag']
+
+    def status(self, url, etag, **headers):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers).status_code
+
+    def test_post_lists(self):
+        for url in ('/api/posts/', '/api/users/alice/posts/'):
+            etag = self.etag(url)
+            self.assertEqual(self.status(url, etag), 304, url)
+            self.post.likes.add(self.bob)
+            self.assertEqual(self.status(url, etag), 200, url)
+            self.post.likes.remove(self.bob)
+        # ETag зависит от зрителя: liked_by_user различается
+        self.assertNotEqual(self.etag('/api/posts/'), self.etag('/api/posts/', **auth_headers(self.bob)))
+
+    def test_public_profile(self):
+        url = '/api/users/alice/profile/'
+        etag = self.etag(url)
+        self.assertEqual(self.status(url, etag), 304)
+        profile = Profile.objects.get(user=self.alice)
+        profile.bio = 'о себе'
+        profile.save()
+        self.assertEqual(self.status(url, etag), 200)
+
+    def test_notifications(self):
+        url, headers = '/api/notifications/', auth_headers(self.alice)
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(user=self.bob, post=self.post, content='комментарий')
+        flush_notifications()
+        response = self.client.get(url, **headers)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.status(url, etag, **headers), 304)
+
+        # отметка прочитанными не двигает last_activity_at, но меняет ответ
+        self.client.post('/api/notifications/mark-read/', **headers)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['results'][0]['is_read'])
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(user=self.bob, post=self.post, content='ещё один')
+        flush_notifications()
+        self.assertEqual(self.status(url, etag, **headers), 200)
+        self.assertEqual(self.client.get(url).status_code, 401)
@@ -0,0 +1,83 @@
+# backend/core/tests/test_counters.py
+# Денормализованные счётчики поста (core/counters.py): сигналы меняют like_count, comment_count и
+# repost_count через F() / Greatest, а recount_post_counters пересчитывает их по исходным таблицам —
+# после любых действий обе величины должны совпадать.
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.counters import POST_COUNTER_FIELDS, change_post_counter, recount_post_counters
+from core.models import Comment, Post, Repost
+
+
+class PostCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pw')
+        cls.readers = [User.objects.create_user(f'reader{number}', password='pw') for number in range(3)]
+        cls.post = Post.objects.create(author=cls.author, content='пост')
+        cls.other = Post.objects.create(author=cls.author, content='другой пост')
+
+    def counters(self, post):
+        return Post.objects.filter(pk=post.pk).values_list(*POST_COUNTER_FIELDS).get()
+
+    def assertMatchesRecount(self, *posts):
+        stored = [self.counters(post) for post in posts]
+        recount_post_counters()
+        self.assertEqual(stored, [self.counters(post) for post in posts])
+
+    def test_likes_from_both_sides(self):
+        first, second, third = self.readers
+        self.post.likes.add(first, second)
+        self.post.likes.add(second)  # уже есть — счётчик не меняется
+        third.liked_posts.add(self.post, self.other)
+        self.assertEqual(self.counters(self.post)[0], 3)
+        self.assertMatchesRecount(self.post, self.other)
+
+        self.post.likes.remove(first, first)
+        third.liked_posts.remove(self.post)
+        second.liked_posts.remove(self.other)  # лайка нет — счётчик не меняется
+        self.assertEqual(self.counters(self.post)[0], 1)
+        self.assertMatchesRecount(self.post, self.other)
+
+        third.liked_posts.clear()
+        self.post.likes.clear()
+        self.assertEqual((self.counters(self.post)[0], self.counters(self.other)[0]), (0, 0))
+        self.assertMatchesRecount(self.post, self.other)
+
+    def test_comments_and_reposts(self):
+        first, second, _ = self.readers
+        comment = Comment.objects.create(user=first, post=self.post, content='комментарий')
+        Comment.objects.create(user=second, post=self.post, parent=comment, content='ответ')
+        repost = Repost.objects.create(user=first, original_post=self.post)
+        Repost.objects.create(user=second, original_post=self.post)
+        self.assertEqual(self.counters(self.post), (0, 2, 2))
+        self.assertMatchesRecount(self.post)
+
+        # удаление комментария каскадно удаляет ответ — оба уходят из счётчика
+        comment.delete()
+        repost.delete()
+        self.assertEqual(self.counters(self.post), (0, 0, 1))
+        self.assertMatchesRecount(self.post)
+
+    def test_counter_never_goes_negative(self):
+        change_post_counter(self.post.pk, 'like_count', -5)
+        self.assertEqual(self.counters(self.post)[0], 0)
+        with self.assertRaises(ValueError):
+            change_post_counter(self.post.pk, 'views', 1)
+
+    def test_recount_command_repairs_drift(self):
+        self.post.likes.add(self.readers[0])
+        Post.objects.filter(pk=self.post.pk).update(like_count=50, comment_count=7, repost_count=3)
+        Post.objects.update(activity_at=None)
+        output = StringIO()
+        call_command('recount_post_counters', batch_size=1, stdout=output)
+        self.assertEqual(self.counters(self.post), (1, 0, 0))
+        self.assertIn('у 1 постов', output.getvalue())
+        # activity_at отмечается только у поста, счётчики которого изменились
+        self.assertEqual(list(Post.objects.filter(activity_at__isnull=False).values_list('pk', flat=True)), [self.post.pk])
+        self.assertEqual(recount_post_counters(), 0)
@@ -0,0 +1,128 @@
+# backend/core/tests/test_entities.py
+# Упоминания и хэштеги (core/entities.py): разбор со смещениями, индекс PostHashtag / PostMention
+# и CommentHashtag / CommentMention при создании и правке, уведомления только новым упомянутым,
+# пересборка командой reindex_entities с одним запросом пользователей на пачку.
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.entities import extract_entities, parse_entities, reindex_entities
+from core.models import Comment, CommentHashtag, CommentMention, Notification, Post, PostHashtag, PostMention
+from core.notifications import flush_notifications
+
+
+class EntityParsingTests(TestCase):
+
+    def test_extract_entities(self):
+        text = 'привет, @bob. и @a.b+c-! #Django #1 #тег_2 email@host.ru a#b ##x'
+        mentions, hashtags = extract_entities(text)
+        self.assertEqual([username for _, _, username in mentions], ['bob', 'a.b+c'])
+        self.assertEqual([tag for _, _, tag in hashtags], ['Django', 'тег_2'])
+        for start, end, value in mentions + hashtags:
+            self.assertEqual(text[start + 1:end], value)
+        self.assertEqual(extract_entities(None), ([], []))
+
+    def test_parse_entities_keeps_existing_users(self):
+        bob = User.objects.create_user('bob', password='pw')
+        with self.assertNumQueries(1):
+            entities = parse_entities('@bob @ghost #Тег')
+        self.assertEqual(entities['mentions'], [{'start': 0, 'end': 4, 'username': 'bob', 'user_id': bob.pk}])
+        self.assertEqual(entities['hashtags'], [{'start': 12, 'end': 16, 'tag': 'тег'}])
+        with self.assertNumQueries(0):
+            parse_entities('#без_упоминаний')
+
+
+@override_settings(BACKGROUND_WORKERS_ASYNC=False)
+class EntityIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.bob, cls.carol = [User.objects.create_user(name, password='pw') for name in ('author', 'bob', 'carol')]
+
+    def setUp(self):
+        flush_notifications()
+
+    def save(self, post):
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        flush_notifications()
+        return post
+
+    def index(self, post):
+        return (
+            set(PostMention.objects.filter(post=post).values_list('user__username', flat=True)),
+            set(PostHashtag.objects.filter(post=post).values_list('hashtag__name', flat=True)),
+        )
+
+    def comment_index(self, comment):
+        return (
+            set(CommentMention.objects.filter(comment=comment).values_list('user__username', flat=True)),
+            set(CommentHashtag.objects.filter(comment=comment).values_list('hashtag__name', flat=True)),
+        )
+
+    def mentions_of(self, user):
+        return Notification.objects.filter(recipient=user, notification_type='mention').count()
+
+    def test_edit_updates_index_and_notifies_new_mentions(self):
+        post = self.save(Post(author=self.author, content='@bob #Один #два'))
+        self.assertEqual(self.index(post), ({'bob'}, {'один', 'два'}))
+        post.content = '@bob @carol #два #три'
+        self.save(post)
+        self.assertEqual(self.index(post), ({'bob', 'carol'}, {'два', 'три'}))
+        self.assertEqual((self.mentions_of(self.bob), self.mentions_of(self.carol)), (1, 1))
+        post.content = 'без сущностей'
+        self.save(post)
+        self.assertEqual(self.index(post), (set(), set()))
+        self.assertEqual(post.entities, {'mentions': [], 'hashtags': []})
+
+    def test_hashtag_and_mention_lists(self):
+        first = self.save(Post(author=self.author, content='#Тег @bob'))
+        second = self.save(Post(author=self.carol, content='ещё #тег'))
+        self.save(Post(author=self.author, content='#другой'))
+        posts = self.client.get('/api/tags/%23ТЕГ/posts/?page_size=1').json()
+        self.assertEqual([post['id'] for post in posts['results']], [second.pk])
+        self.assertEqual([post['id'] for post in self.client.get(posts['next']).json()['results']], [first.pk])
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.bob)}'}
+        mentioned = self.client.get('/api/posts/mentions/', **headers).json()['results']
+        self.assertEqual([post['id'] for post in mentioned], [first.pk])
+
+    def test_comment_mentions_skip_post_author(self):
+        post = self.save(Post(author=self.author, content='пост'))
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(user=self.carol, post=post, content='@author @bob смотрите #Тег')
+        flush_notifications()
+        self.assertEqual((self.mentions_of(self.author), self.mentions_of(self.bob)), (0, 1))
+        self.assertEqual(self.comment_index(comment), ({'author', 'bob'}, {'тег'}))
+        # правка: индекс следует за текстом, уже упомянутый повторно не уведомляется
+        comment.content = '@bob'
+        self.save(comment)
+        self.assertEqual(self.comment_index(comment), ({'bob'}, set()))
+        self.assertEqual(self.mentions_of(self.bob), 1)
+
+    def test_reindex_command(self):
+        post = self.save(Post(author=self.author, content='@bob #старый'))
+        # текст изменён в обход сигналов (массовый импорт): индекс устарел
+        Post.objects.filter(pk=post.pk).update(content='@carol #новый')
+        Comment.objects.bulk_create([Comment(user=self.bob, post=post, content='@carol #новый')])
+        call_command('reindex_entities', batch_size=1, stdout=StringIO())
+        self.assertEqual(self.index(post), ({'carol'}, {'новый'}))
+        comment = Comment.objects.get()
+        self.assertEqual(comment.entities['mentions'][0]['user_id'], self.carol.pk)
+        self.assertEqual(self.comment_index(comment), ({'carol'}, {'новый'}))
+        self.assertEqual(self.mentions_of(self.carol), 0)
+
+    def test_reindex_resolves_mentions_once_per_batch(self):
+        posts = Post.objects.bulk_create([
+            Post(author=self.author, content=content) for content in ('@bob', '@carol #тег', '@ghost', 'текст')
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(reindex_entities(Post, Post.objects.filter(pk__in=[post.pk for post in posts])), 4)
+        user_queries = [query for query in queries if 'FROM "auth_user"' in query['sql']]
+        self.assertEqual(len(user_queries), 1)
+        self.assertEqual([self.index(post)[0] for post in posts], [{'bob'}, {'carol'}, set(), set()])
@@ -0,0 +1,98 @@
+# backend/core/tests/test_images.py
+# Изображения профиля (core/images.py): поворот по EXIF и удаление метаданных, отказ для слишком
+# больших изображений, копии в JPEG и WebP и их URL в ответах API.
+
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.images import ImageRejected, build_variants, check_image_upload, flush_images, image_url
+from core.models import Profile
+
+ORIENTATION = 0x0112
+
+
+def make_jpeg(size, orientation=None):
+    image = Image.new('RGB', size, (200, 30, 30))
+    exif = Image.Exif()
+    if orientation:
+        exif[ORIENTATION] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+@override_settings(BACKGROUND_WORKERS_ASYNC=False)
+class ProfileImageTests(TestCase):
+    client_class = APIClient  # multipart PATCH
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_exif_rotation_is_applied_and_metadata_dropped(self):
+        # ориентация 6: снимок повёрнут на 90°, после поворота баннер 300x100 становится 100x300
+        variants = build_variants('banner', make_jpeg((300, 100), orientation=6))
+        self.assertEqual((variants['sm']['width'], variants['sm']['height']), (100, 33))
+        self.assertEqual(build_variants('banner', make_jpeg((300, 100)))['sm']['width'], 300)
+        with default_storage.open(variants['sm']['jpeg']) as stored, Image.open(stored) as image:
+            self.assertNotIn(ORIENTATION, image.getexif())
+        with default_storage.open(variants['sm']['webp']) as stored, Image.open(stored) as image:
+            self.assertEqual(image.format, 'WEBP')
+
+    @override_settings(IMAGE_MAX_PIXELS=100)
+    def test_pixel_limit(self):
+        upload = SimpleUploadedFile('big.jpg', make_jpeg((20, 20)))
+        with self.assertRaises(ImageRejected):
+            check_image_upload(upload)
+        self.assertEqual(upload.tell(), 0)
+        with self.assertRaises(ImageRejected):
+            build_variants('avatar', make_jpeg((20, 20)))
+        check_image_upload(SimpleUploadedFile('small.jpg', make_jpeg((10, 10))))
+
+    def test_upload_and_urls(self):
+        user = User.objects.create_user('owner', password='pw')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                '/api/profile/', {'avatar': SimpleUploadedFile('a.jpg', make_jpeg((500, 500)), 'image/jpeg')},
+                format='multipart', **headers,
+            )
+        self.assertEqual(response.status_code, 200)
+        profile = Profile.objects.get(user=user)
+        # до обработки отдаётся оригинал
+        self.assertEqual(image_url(profile, 'avatar', 'sm', absolute=False), profile.avatar.url)
+
+        self.assertEqual(flush_images(), 1)
+        profile.refresh_from_db()
+        self.assertEqual(set(profile.avatar_variants), {'sm', 'md', 'lg'})
+        self.assertEqual(profile.avatar.name, profile.avatar_variants['lg']['jpeg'])
+        self.assertEqual(profile.avatar_variants['lg']['width'], 400)
+        jpeg = self.client.get('/api/users/owner/profile/').json()['avatar']
+        webp = self.client.get('/api/users/owner/profile/?image_format=webp').json()['avatar']
+        self.assertTrue(jpeg.endswith('_md.jpg'), jpeg)
+        self.assertTrue(webp.endswith('_md.webp'), webp)
+
+        with override_settings(IMAGE_MAX_PIXELS=100):
+            response = self.client.patch(
+                '/api/profile/', {'avatar': SimpleUploadedFile('b.jpg', make_jpeg((20, 20)), 'image/jpeg')},
+                format='multipart', **headers,
+            )
+        self.assertEqual(response.status_code, 400)
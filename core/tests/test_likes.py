@@ -0,0 +1,51 @@
+# backend/core/tests/test_likes.py
+# Лайки через API (core/likes.py): PUT и DELETE идемпотентны, счётчик и уведомление меняются,
+# только если связь действительно вставлена / удалена.
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Notification, Post
+from core.notifications import flush_notifications
+
+
+@override_settings(BACKGROUND_WORKERS_ASYNC=False)
+class PostLikeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pw')
+        cls.reader = User.objects.create_user('reader', password='pw')
+        cls.post = Post.objects.create(author=cls.author, content='пост')
+
+    def setUp(self):
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.reader)}'}
+        self.url = f'/api/posts/{self.post.pk}/like/'
+
+    def request(self, method):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(self.url, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        flush_notifications()
+        return response.json()
+
+    def test_repeated_put_and_delete(self):
+        for _ in range(2):
+            self.assertEqual(self.request('put'), {'liked': True, 'like_count': 1})
+        self.assertEqual(Notification.objects.get(recipient=self.author).count, 1)
+        for _ in range(2):
+            self.assertEqual(self.request('delete'), {'liked': False, 'like_count': 0})
+        self.assertFalse(self.post.likes.exists())
+
+    def test_toggle(self):
+        self.assertEqual(self.request('post'), {'liked': True, 'like_count': 1})
+        self.assertEqual(self.request('post'), {'liked': False, 'like_count': 0})
+
+    def test_concurrent_insert_is_not_counted(self):
+        # связь вставлена параллельным запросом между проверкой и вставкой: конфликт, счётчик не меняется
+        Post.likes.through.objects.create(post_id=self.post.pk, user_id=self.reader.pk)
+        self.assertEqual(self.request('put'), {'liked': True, 'like_count': 0})
+        self.assertFalse(Notification.objects.exists())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
@@ -0,0 +1,85 @@
+# backend/core/tests/test_loaders.py
+# Загрузчики запроса (core/loaders.py): накопленные ключи загружаются одним вызовом, пользователи и
+# профили страницы — одним запросом, вложенные комментарии постов не дают N+1.
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.cache import response_cache
+from core.loaders import DataLoader, RequestLoaders
+from core.models import Comment, Post
+from core.serializers import CommentSerializer
+
+
+class DataLoaderTests(TestCase):
+
+    def test_pending_keys_are_loaded_in_one_batch(self):
+        calls = []
+
+        def batch(keys):
+            calls.append(sorted(keys))
+            # лишний ключ 99 кэшируется, отсутствующий 3 — как None
+            return {key: key * 10 for key in keys if key != 3} | {99: 990}
+
+        loader = DataLoader(batch)
+        loader.prime([1, 2, 3, None])
+        self.assertEqual(loader.load_many([1, 2]), [10, 20])
+        self.assertEqual(loader.load(3), None)
+        self.assertEqual(loader.load(99), 990)
+        self.assertEqual(loader.load(None), None)
+        self.assertEqual(calls, [[1, 2, 3]])
+        self.assertEqual(loader.load(4), 40)
+        self.assertEqual(calls, [[1, 2, 3], [4]])
+
+
+class RequestLoaderTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f'user{number}', password='pw') for number in range(6)]
+        cls.post = Post.objects.create(author=cls.users[0], content='пост')
+
+    def test_users_and_profiles_are_batched(self):
+        loaders = RequestLoaders()
+        loaders.prime_users(user.pk for user in self.users)
+        with self.assertNumQueries(2):
+            users = loaders.users.load_many(user.pk for user in self.users)
+            profiles = [loaders.profile_for(user) for user in users]
+        self.assertEqual([profile.user_id for profile in profiles], [user.pk for user in self.users])
+        with self.assertNumQueries(0):
+            self.assertIs(users[0].profile, profiles[0])
+
+    def comment_tree(self, post, width):
+        """width корневых комментариев, у каждого ветка из двух уровней ответов от разных пользователей."""
+        for number in range(width):
+            root = Comment.objects.create(user=self.users[number % 6], post=post, content=f'корень {number}')
+            reply = Comment.objects.create(user=self.users[(number + 1) % 6], post=post, parent=root, content='ответ')
+            Comment.objects.create(user=self.users[(number + 2) % 6], post=post, parent=reply, content='ответ')
+
+    def count_queries(self, url):
+        response_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_nested_comments_of_post_list(self):
+        self.comment_tree(self.post, 1)
+        small, _ = self.count_queries('/api/posts/')
+        for number in range(4):
+            self.comment_tree(Post.objects.create(author=self.users[number], content=f'пост {number}'), 3)
+        large, data = self.count_queries('/api/posts/')
+        self.assertEqual(small, large)
+        first = data['results'][0]['comments'][0]
+        self.assertEqual(first['replies'][0]['replies'][0]['content'], 'ответ')
+
+    def test_replies_are_loaded_per_level(self):
+        self.comment_tree(self.post, 4)
+        comments = list(Comment.objects.filter(parent=None).select_related('user__profile'))
+        # по запросу на каждый из двух уровней ответов и последний, пустой; авторы ответов — из select_related
+        with self.assertNumQueries(3):
+            data = CommentSerializer(comments, many=True, context={}).data
+        self.assertEqual(len(data), 4)
+        self.assertEqual(len(data[0]['replies'][0]['replies']), 1)
@@ -0,0 +1,58 @@
+# backend/core/tests/test_mailer.py
+# Outbox писем (core/mailer.py): отправка после фиксации транзакции, повторы с задержкой,
+# тело письма с токенами не хранится после отправки или последней попытки.
+
+from django.contrib import admin
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.mailer import dispatch_outbox, flush_outbox, queue_email
+from core.models import EmailOutbox
+
+
+class BrokenBackend(BaseEmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@override_settings(BACKGROUND_WORKERS_ASYNC=False)
+class EmailOutboxTests(TestCase):
+
+    def setUp(self):
+        flush_outbox()
+        mail.outbox = []
+
+    def queue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return queue_email('Сброс пароля', 'https://example.com/reset/секрет/', ['user@example.com'])
+
+    def test_body_is_cleared_after_sending(self):
+        message = self.queue()
+        self.assertEqual(flush_outbox(), 1)
+        self.assertEqual(mail.outbox[0].body, 'https://example.com/reset/секрет/')
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.body), ('sent', ''))
+        self.assertIsNotNone(message.sent_at)
+
+    @override_settings(EMAIL_BACKEND='core.tests.test_mailer.BrokenBackend', EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_body_is_kept_for_retries_and_cleared_on_failure(self):
+        message = self.queue()
+        flush_outbox()
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('pending', 1))
+        self.assertIn('секрет', message.body)
+        self.assertIn('ConnectionError', message.last_error)
+
+        EmailOutbox.objects.update(next_attempt_at=message.created_at)
+        self.assertEqual(dispatch_outbox(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts, message.body), ('failed', 2, ''))
+
+    def test_admin_does_not_show_body(self):
+        message = self.queue()
+        model_admin = admin.site._registry[EmailOutbox]
+        request = RequestFactory().get('/')
+        self.assertNotIn('body', model_admin.get_list_display(request))
+        self.assertNotIn('body', model_admin.get_fields(request, message))
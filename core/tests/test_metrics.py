@@ -0,0 +1,134 @@
+# backend/core/tests/test_metrics.py
+# Метрики Prometheus (core/metrics.py): метки маршрутов, доступ к /metrics, кэш ответов, потоки
+# и слияние значений завершившихся потоков, снимки нескольких процессов.
+
+import hmac
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from core.metrics import CACHE, REQUESTS, Registry, registry
+from core.models import Post
+
+
+def value(name, *labels):
+    return registry.collect().get((name, labels), 0)
+
+
+class MetricsEndpointTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', password='pw')
+        Post.objects.create(author=author, content='пост')
+
+    def test_requests_are_labelled_by_route_name(self):
+        before = value(REQUESTS.name, 'user-posts', 'GET', '200')
+        unmatched = value(REQUESTS.name, 'unmatched', 'GET', '404')
+        self.client.get('/api/users/author/posts/')
+        self.client.get('/api/no-such-route/')
+        self.assertEqual(value(REQUESTS.name, 'user-posts', 'GET', '200'), before + 1)
+        self.assertEqual(value(REQUESTS.name, 'unmatched', 'GET', '404'), unmatched + 1)
+
+        with self.settings(DEBUG=True):
+            response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('http_request_duration_seconds_bucket{route="user-posts",method="GET",le="+Inf"}', text)
+        self.assertIn('http_request_db_queries_count{route="user-posts"}', text)
+        self.assertIn('app_queue_depth{queue="notifications"}', text)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=60)
+    def test_response_cache_hits_and_misses(self):
+        hits, misses = value(CACHE.name, 'response', 'hit'), value(CACHE.name, 'response', 'miss')
+        self.client.get('/api/users/author/posts/?page_size=7')
+        self.client.get('/api/users/author/posts/?page_size=7')
+        self.assertEqual(value(CACHE.name, 'response', 'miss'), misses + 1)
+        self.assertEqual(value(CACHE.name, 'response', 'hit'), hits + 1)
+
+    def test_token(self):
+        # без токена метрики закрыты, если не включён DEBUG
+        with self.settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with self.settings(METRICS_TOKEN='secret', DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer sécret').status_code, 403)
+            with mock.patch('core.metrics.hmac.compare_digest', wraps=hmac.compare_digest) as compare:
+                response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        compare.assert_called_once_with(b'Bearer secret', b'Bearer secret')
+
+
+class RegistryTests(TestCase):
+
+    def test_threads_do_not_lose_increments(self):
+        local = Registry()
+        counter = local.counter('test_total', 'test', ('kind',))
+        histogram = local.histogram('test_seconds', 'test', buckets=(0.5,))
+
+        def work():
+            for _ in range(5000):
+                counter.inc('a')
+                histogram.observe(0.1)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        snapshot = local.collect()
+        self.assertEqual(snapshot[('test_total', ('a',))], 40000)
+        self.assertEqual(snapshot[('test_seconds', ())][-1], 40000)
+        self.assertIn('test_seconds_bucket{le="0.5"} 40000', local.render())
+
+    def test_finished_threads_are_merged(self):
+        local = Registry()
+        counter = local.counter('test_total', 'test')
+        histogram = local.histogram('test_seconds', 'test', buckets=(0.5,))
+
+        def work():
+            counter.inc(amount=2)
+            histogram.observe(1.0)
+
+        for _ in range(3):
+            threads = [threading.Thread(target=work) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            local.collect()
+            self.assertEqual(local.shards, [])
+        counter.inc()
+        snapshot = local.collect()
+        self.assertEqual(len(local.shards), 1)
+        self.assertEqual(snapshot[('test_total', ())], 61)
+        self.assertEqual(snapshot[('test_seconds', ())], [0, 30, 30.0, 30])
+        # повторный сбор не суммирует значения завершившихся потоков дважды
+        self.assertEqual(local.collect(), snapshot)
+
+    def test_snapshots_of_processes_are_summed(self):
+        local = Registry()
+        counter = local.counter('test_total', 'test', ('kind',))
+        gauge = local.gauge('test_in_flight', 'test')
+        counter.inc('a', amount=2)
+        gauge.inc()
+        with tempfile.TemporaryDirectory() as directory:
+            other = {'written_at': time.time(), 'values': [['test_total', ['a'], 3], ['test_in_flight', [], 4]]}
+            gone = {'written_at': time.time() - 3600, 'values': [['test_total', ['a'], 5], ['test_in_flight', [], 6]]}
+            Path(directory, 'metrics-1.json').write_text(json.dumps(other), encoding='utf-8')
+            Path(directory, 'metrics-2.json').write_text(json.dumps(gone), encoding='utf-8')
+            with override_settings(METRICS_DIR=directory):
+                snapshot = local.collect()
+            # счётчики завершившегося процесса сохраняются, его gauge — нет
+            self.assertEqual(snapshot[('test_total', ('a',))], 2 + 3 + 5)
+            self.assertEqual(snapshot[('test_in_flight', ())], 1 + 4)
+            self.assertEqual(len(list(Path(directory).glob('metrics-*.json'))), 3)
@@ -0,0 +1,164 @@
+# backend/core/tests/test_notifications.py
+# Уведомления (core/notifications.py): запись в фоне пачками после фиксации транзакции,
+# ошибочное событие не теряет остальные события пачки; лайки и репосты поста сворачиваются в одну
+# строку на получателя с числом и последними отправителями, повтор от того же отправителя не считается;
+# счётчик непрочитанных в профиле следует за записью, отметкой прочитанными и удалением уведомлений.
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Comment, Notification, Post, Profile, Repost
+from core.notifications import flush_notifications, mark_notifications_read, notification_writer
+
+
+def auth_headers(user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+@override_settings(BACKGROUND_WORKERS_ASYNC=False)
+class NotificationTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pw')
+        cls.readers = [User.objects.create_user(f'reader{number}', password='pw') for number in range(3)]
+        cls.post = Post.objects.create(author=cls.author, content='пост')
+
+    def setUp(self):
+        flush_notifications()
+
+    def unread(self, user=None):
+        return Profile.objects.get(user=user or self.author).unread_notifications_count
+
+
+class NotificationWriterTests(NotificationTestCase):
+
+    def test_written_in_background_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for reader in self.readers:
+                Comment.objects.create(user=reader, post=self.post, content='комментарий')
+            Comment.objects.create(user=self.author, post=self.post, content='свой')
+            self.assertEqual(notification_writer.pending(), 0)
+        self.assertFalse(Notification.objects.exists())
+        # точка сохранения, одна вставка на все события и одно обновление счётчика
+        with self.assertNumQueries(4):
+            self.assertEqual(flush_notifications(), 3)
+        self.assertEqual(Notification.objects.filter(recipient=self.author, notification_type='comment').count(), 3)
+        self.assertEqual(self.unread(), 3)
+
+    def test_failing_event_does_not_lose_batch(self):
+        def event(sender, notification_type='comment'):
+            return {
+                'recipient_id': self.author.pk, 'sender_id': sender.pk, 'notification_type': notification_type,
+                'post_id': self.post.pk, 'last_activity_at': timezone.now(),
+            }
+
+        notification_writer.submit(event(self.readers[0]))
+        notification_writer.submit(event(self.readers[1], notification_type=None))
+        notification_writer.submit(event(self.readers[2], notification_type='like'))
+        with self.assertLogs('core.background', 'WARNING') as logs:
+            self.assertEqual(flush_notifications(), 3)
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('sender_id', flat=True)),
+            [self.readers[0].pk, self.readers[2].pk],
+        )
+        self.assertEqual(self.unread(), 2)
+
+
+class NotificationRollupTests(NotificationTestCase):
+
+    def like(self, *users, remove=False):
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in users:
+                (self.post.likes.remove if remove else self.post.likes.add)(user)
+        flush_notifications()
+
+    def test_likes_are_grouped_per_post(self):
+        users = self.readers + [User.objects.create_user(f'extra{number}', password='pw') for number in range(2)]
+        self.like(*users[:2])
+        self.like(*users[2:])
+        group = Notification.objects.get(recipient=self.author)
+        self.assertEqual((group.notification_type, group.post_id, group.count), ('like', self.post.pk, 5))
+        self.assertEqual(group.recent_senders, [user.pk for user in reversed(users)][:Notification.RECENT_SENDERS_LIMIT])
+        self.assertEqual(group.sender_id, users[-1].pk)
+        self.assertEqual(self.unread(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Repost.objects.create(user=self.readers[0], original_post=self.post)
+        flush_notifications()
+        self.assertEqual(Notification.objects.filter(recipient=self.author).count(), 2)
+
+        results = self.client.get('/api/notifications/', **auth_headers(self.author)).json()['results']
+        self.assertEqual([item['notification_type'] for item in results], ['repost', 'like'])
+        self.assertEqual(results[1]['count'], 5)
+        self.assertEqual([sender['username'] for sender in results[1]['recent_senders']], ['extra1', 'extra0', 'reader2'])
+
+    def test_repeated_like_is_deduplicated(self):
+        self.like(self.readers[0])
+        group = Notification.objects.get(recipient=self.author)
+        activity = group.last_activity_at
+        for _ in range(3):
+            self.like(self.readers[0], remove=True)
+            self.like(self.readers[0])
+        group.refresh_from_db()
+        self.assertEqual((group.count, group.last_activity_at), (1, activity))
+        self.assertEqual(group.senders.count(), 1)
+        self.assertEqual(self.unread(), 1)
+
+    def test_read_group_becomes_unread_again(self):
+        self.like(self.readers[0])
+        mark_notifications_read(self.author)
+        self.assertEqual(self.unread(), 0)
+        self.like(self.readers[1])
+        group = Notification.objects.get(recipient=self.author)
+        self.assertEqual((group.count, group.is_read), (2, False))
+        self.assertEqual(self.unread(), 1)
+
+
+class UnreadCounterTests(NotificationTestCase):
+
+    def comment(self, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(user=user, post=self.post, content='комментарий')
+        flush_notifications()
+        return comment
+
+    def unread_count(self):
+        return self.client.get('/api/notifications/unread-count/', **auth_headers(self.author)).json()['unread_count']
+
+    def mark_read(self, **data):
+        return self.client.post('/api/notifications/mark-read/', data, **auth_headers(self.author)).json()
+
+    def test_count_and_mark_read(self):
+        for reader in self.readers:
+            self.comment(reader)
+        self.assertEqual(self.unread_count(), 3)
+        # до второго по свежести включительно: самое свежее остаётся непрочитанным
+        second = Notification.objects.order_by('-last_activity_at', '-id')[1]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.mark_read(up_to_id=second.pk), {'marked': 2, 'unread_count': 1})
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "core_notification"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.mark_read(), {'marked': 1, 'unread_count': 0})
+        self.assertEqual(self.mark_read(), {'marked': 0, 'unread_count': 0})
+        self.assertEqual(self.client.post('/api/notifications/mark-read/', {'up_to_id': 'x'}, **auth_headers(self.author)).status_code, 400)
+        other = User.objects.create_user('other', password='pw')
+        stranger = Notification.objects.create(recipient=other, sender=self.author, notification_type='comment')
+        self.assertEqual(self.client.post('/api/notifications/mark-read/', {'up_to_id': stranger.pk}, **auth_headers(self.author)).status_code, 404)
+
+    def test_deleted_notifications_and_never_negative(self):
+        comments = [self.comment(reader) for reader in self.readers]
+        mark_notifications_read(self.author, Notification.objects.get(comment=comments[0]))
+        self.assertEqual(self.unread(), 2)
+        # удаление прочитанного уведомления счётчик не меняет, непрочитанного — уменьшает
+        comments[0].delete()
+        comments[1].delete()
+        self.assertEqual(self.unread(), 1)
+        Profile.objects.filter(user=self.author).update(unread_notifications_count=0)
+        comments[2].delete()
+        self.assertEqual(self.unread(), 0)
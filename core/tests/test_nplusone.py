@@ -0,0 +1,64 @@
+# backend/core/tests/test_nplusone.py
+# Поиск N+1 (core/nplusone.py): источник запроса по стеку и режимы warn / log / raise.
+# Что маршрутов core/urls.py N+1 не касается, проверяет test_query_budget (NPLUSONE_MODE='raise').
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework import serializers
+
+from core.models import Post, Repost
+from core.nplusone import NPlusOneError, NPlusOneWarning, detect_nplusone
+
+
+class LeakyPostSerializer(serializers.ModelSerializer):
+    """Сериализатор с двумя N+1: метод и поле через ленивый внешний ключ."""
+    author_name = serializers.CharField(source='author.username')
+    reposts = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = ('id', 'author_name', 'reposts')
+
+    def get_reposts(self, obj):
+        return list(obj.reposts.values_list('id', flat=True))
+
+
+class NPlusOneTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(f'user{number}', password='pw') for number in range(5)]
+        for user in users:
+            post = Post.objects.create(author=user, content=f'пост {user.username}')
+            Repost.objects.create(user=users[0], original_post=post)
+
+    def serialize(self):
+        return LeakyPostSerializer(Post.objects.order_by('id'), many=True).data
+
+    def test_sources_are_attributed_to_serializer_fields(self):
+        with self.assertRaises(NPlusOneError) as raised:
+            with detect_nplusone('raise'):
+                self.serialize()
+        message = str(raised.exception)
+        self.assertIn('LeakyPostSerializer.get_reposts (5)', message)
+        self.assertIn('LeakyPostSerializer.author_name (5)', message)
+
+    def test_below_threshold_is_quiet(self):
+        with detect_nplusone('raise', threshold=5) as detector:
+            self.serialize()
+        self.assertEqual(detector.problems(), [])
+
+    def test_warn_and_log_modes(self):
+        with self.assertWarns(NPlusOneWarning):
+            with detect_nplusone('warn'):
+                self.serialize()
+        with self.assertLogs('core.nplusone', 'WARNING') as logs:
+            with detect_nplusone('log'):
+                self.serialize()
+        self.assertIn('get_reposts', logs.output[0])
+
+    @override_settings(NPLUSONE_MODE='log', NPLUSONE_THRESHOLD=0)
+    def test_middleware_reports_request(self):
+        with self.assertLogs('core.nplusone', 'WARNING') as logs:
+            self.client.get('/api/posts/')
+        self.assertIn('N+1 GET /api/posts/', logs.output[0])
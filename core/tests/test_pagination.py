@@ -0,0 +1,57 @@
+# backend/core/tests/test_pagination.py
+# Keyset-пагинация (core/pagination.py): границы страниц, одинаковый created_at, повреждённый курсор.
+
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from core.models import Post
+from core.pagination import decode_cursor, encode_cursor
+
+CREATED_AT = datetime(2025, 7, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pw')
+        Post.objects.bulk_create([Post(author=cls.author, content=f'пост {number}') for number in range(9)])
+        cls.ids = sorted(Post.objects.values_list('id', flat=True), reverse=True)
+
+    def walk(self, url):
+        """[[id постов страницы], ...] при переходе по ссылкам next до конца списка."""
+        pages = []
+        while url:
+            data = self.client.get(url).json()
+            pages.append([post['id'] for post in data['results']])
+            url = data['next']
+        return pages
+
+    def test_page_boundaries(self):
+        # последняя страница неполная; ровно заполненная страница не даёт пустой следующей
+        self.assertEqual(self.walk('/api/posts/?page_size=4'), [self.ids[:4], self.ids[4:8], self.ids[8:]])
+        self.assertEqual(self.walk('/api/posts/?page_size=3'), [self.ids[:3], self.ids[3:6], self.ids[6:]])
+        self.assertEqual(self.walk('/api/posts/?page_size=9'), [self.ids])
+        self.assertEqual(self.walk('/api/users/author/posts/?page_size=1000'), [self.ids])
+
+    def test_equal_created_at_is_ordered_by_id(self):
+        Post.objects.update(created_at=CREATED_AT)
+        pages = self.walk('/api/posts/?page_size=2')
+        self.assertEqual(sum(pages, []), self.ids)
+
+    def test_new_posts_do_not_shift_pages(self):
+        first = self.client.get('/api/posts/?page_size=4').json()
+        Post.objects.create(author=self.author, content='новый')
+        second = self.client.get(first['next']).json()
+        self.assertEqual([post['id'] for post in second['results']], self.ids[4:8])
+
+    def test_bad_cursor(self):
+        for cursor in ('zzz', '!!!', encode_cursor([1]), encode_cursor(['вчера', 'x']), encode_cursor({'a': 1})):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get('/api/posts/', {'cursor': cursor}).status_code, 404)
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor([CREATED_AT, 5])), [CREATED_AT.isoformat(), 5])
+        self.assertIsNone(decode_cursor('%%%'))
@@ -0,0 +1,136 @@
+# backend/core/tests/test_query_budget.py
+# Бюджет SQL-запросов для каждого GET-маршрута core/urls.py:
+# - набор данных генерируется в двух размерах (core/seed.py), каждый маршрут запрашивается
+#   со страницей двух размеров
+# - число запросов не должно превышать бюджет маршрута и не должно меняться ни от размера
+#   страницы, ни от объёма данных — иначе это N+1
+# - при нарушении в сообщение попадают запросы, сгруппированные по отпечатку (core/sqlstats.py)
+# - запросы идут с NPLUSONE_MODE='raise': N+1 сразу падает с указанием сериализатора (core/nplusone.py)
+
+from datetime import datetime, timezone
+
+from django.test import Client, TestCase, override_settings
+from rest_framework.utils.urls import replace_query_param
+
+from core.benchmark import auth_headers, get_routes, route_arguments
+from core.cache import response_cache
+from core.models import Comment, Post, Repost
+from core.notifications import flush_notifications
+from core.seed import DatasetGenerator, clear_dataset, seed_users
+from core.sqlstats import capture_queries, fingerprint
+
+NOW = datetime(2025, 7, 1, tzinfo=timezone.utc)
+
+DATASETS = {
+    'small': dict(users=12, posts_per_user=3, follows_per_user=4, likes_per_post=3),
+    'large': dict(users=40, posts_per_user=8, follows_per_user=10, likes_per_post=6),
+}
+PAGE_SIZES = (5, 20)
+
+# Наибольшее допустимое число запросов (включая аутентификацию); новые маршруты — DEFAULT_QUERY_BUDGET.
+# Бюджет меняется вместе с кодом, который осознанно добавляет запрос.
+QUERY_BUDGETS = {
+    'profile-detail': 7,
+    'posts': 7,
+    'post-comments': 3,
+    'home-timeline': 8,
+    'popular-posts': 2,
+    'post-search': 7,
+    'hashtag-posts': 8,
+    'mentioned-posts': 7,
+    'liked-posts': 6,
+    'user-reposts-list': 6,
+    'user-posts': 7,
+    'user-reposts': 6,
+    'user-comments': 6,
+    'public-profile': 3,
+    'current-user': 2,
+    'notifications': 7,
+    'notifications-unread-count': 2,
+}
+DEFAULT_QUERY_BUDGET = 8
+
+
+@override_settings(NPLUSONE_MODE='raise')
+class QueryBudgetTests(TestCase):
+
+    def prepare_viewer(self):
+        """
+        Пользователь, от имени которого идут запросы: самый популярный в наборе. Ему добавляются
+        лайки, репосты, комментарии с ответами и уведомления всех видов, чтобы ни один личный список
+        не оказался пустым или плоским — на пустой странице запросов меньше, и сравнение размеров
+        набора теряет смысл. Ответы загружаются по запросу на уровень вложенности, поэтому глубина
+        веток здесь (2) не больше, чем в наборе core/seed.py.
+        """
+        viewer = seed_users().order_by('-profile__followers_count', 'id').first()
+        other = seed_users().exclude(pk=viewer.pk).order_by('id').first()
+        for post in Post.objects.exclude(author=viewer).order_by('-comment_count', 'id')[:3]:
+            post.likes.add(viewer)
+            Repost.objects.get_or_create(user=viewer, original_post=post)
+        own = Post.objects.filter(author=viewer).order_by('-created_at', '-id').first()
+        foreign = Post.objects.exclude(author=viewer).order_by('-created_at', '-id').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(user=other, post=own, content=f'@{viewer.username} #budget')
+            Comment.objects.create(user=viewer, post=own, parent=comment, content='ответ')
+            comment = Comment.objects.create(user=viewer, post=foreign, content='комментарий')
+            Comment.objects.create(user=other, post=foreign, parent=comment, content='ответ')
+            Repost.objects.get_or_create(user=other, original_post=own)
+        flush_notifications()
+        return viewer
+
+    def measure(self, user, page_size):
+        """{маршрут: (число запросов, QueryLog)} для всех GET-маршрутов от имени user."""
+        client = Client(SERVER_NAME='localhost')
+        headers = auth_headers(user)
+        measured = {}
+        for name, path in get_routes(route_arguments(user)):
+            path = replace_query_param(path, 'page_size', page_size)
+            response_cache().clear()
+            with capture_queries() as log:
+                response = client.get(path, **headers)
+            self.assertEqual(response.status_code, 200, f"{name}: {response.status_code}")
+            measured[name] = (len(log), log)
+        return measured
+
+    def test_query_count_is_bounded_and_constant(self):
+        runs = {}
+        for size, options in DATASETS.items():
+            clear_dataset()
+            DatasetGenerator(seed=11, now=NOW, **options).run()
+            viewer = self.prepare_viewer()
+            for page_size in PAGE_SIZES:
+                runs[size, page_size] = self.measure(viewer, page_size)
+
+        first = runs['small', PAGE_SIZES[0]]
+        for name in first:
+            with self.subTest(route=name):
+                counts = {key: run[name][0] for key, run in runs.items()}
+                largest = max(runs.values(), key=lambda run: run[name][0])[name][1]
+                budget = QUERY_BUDGETS.get(name, DEFAULT_QUERY_BUDGET)
+                self.assertLessEqual(
+                    max(counts.values()), budget,
+                    f"{name}: запросов больше бюджета {budget}: {counts}\n{largest.report()}",
+                )
+                self.assertEqual(
+                    len(set(counts.values())), 1,
+                    f"{name}: число запросов зависит от объёма данных или размера страницы: {counts}\n"
+                    f"{largest.report()}",
+                )
+
+
+class FingerprintTests(TestCase):
+
+    def test_values_are_stripped(self):
+        self.assertEqual(
+            fingerprint('SELECT "t0"."id" FROM "core_post" WHERE "id" IN (%s, %s, %s) AND name = \'it\'\'s\' LIMIT 21'),
+            'SELECT "t0"."id" FROM "core_post" WHERE "id" IN (...) AND name = ? LIMIT ?',
+        )
+        self.assertEqual(fingerprint('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)'), 'INSERT INTO t (a, b) VALUES (...)')
+
+    def test_queries_are_grouped_by_fingerprint(self):
+        with capture_queries() as log:
+            for pk in range(3):
+                list(Post.objects.filter(pk=pk))
+        self.assertEqual(len(log), 3)
+        self.assertEqual(list(log.fingerprints().values()), [3])
+        self.assertIn('3 x', log.report())
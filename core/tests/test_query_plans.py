@@ -0,0 +1,122 @@
+# backend/core/tests/test_query_plans.py
+# Планы основных запросов списков API на заполненной базе:
+# - запрос каждого списка перехватывается при настоящем запросе к эндпоинту
+# - EXPLAIN (PostgreSQL, seq scan отключён) или EXPLAIN QUERY PLAN (SQLite) должен показывать
+#   ожидаемый индекс (Meta.indexes моделей), без полного прохода по таблице и без сортировки в памяти
+
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.cache import response_cache
+from core.models import Comment, Follow, Notification, Post, Repost, TimelineEntry
+
+USERS = 20
+POSTS_PER_USER = 15
+
+# (URL, таблица основного запроса, индекс, по которому он должен идти)
+ENDPOINTS = [
+    ('/api/posts/', 'core_post', 'core_post_recent'),
+    ('/api/users/{username}/posts/', 'core_post', 'core_post_author_recent'),
+    ('/api/users/{username}/comments/', 'core_comment', 'core_comment_user_recent'),
+    ('/api/users/{username}/reposts/', 'core_repost', 'core_repost_user_recent'),
+    ('/api/posts/reposts/', 'core_repost', 'core_repost_user_recent'),
+    ('/api/posts/{post_id}/comments/', 'core_comment', 'core_comment_post_created'),
+    ('/api/notifications/', 'core_notification', 'core_notification_activity'),
+    ('/api/timeline/', 'core_timelineentry', 'core_timeline_user_created'),
+    ('/api/tags/{tag}/posts/', 'core_posthashtag', 'core_posthashtag_recent'),
+    ('/api/posts/mentions/', 'core_postmention', 'core_postmention_recent'),
+]
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN ' + sql)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+def full_scan(plan, table):
+    return re.search(rf'Seq Scan on {table}\b|SCAN {table}\b(?! USING)', plan)
+
+
+def sorts_in_memory(plan):
+    return re.search(r'\bSort\b|TEMP B-TREE FOR ORDER BY', plan)
+
+
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(f'user{i}', password='x') for i in range(USERS)]
+        cls.user = users[0]
+        Post.objects.bulk_create([
+            Post(author=user, content=f'пост {n} пользователя {user.username}')
+            for user in users for n in range(POSTS_PER_USER)
+        ])
+        posts = list(Post.objects.order_by('id'))
+        cls.post = posts[0]
+        # Упоминания и хэштеги разбираются сигналами, поэтому эти посты создаются по одному
+        for user in users[1:]:
+            Post.objects.create(author=user, content=f'#индексы для @{cls.user.username}')
+
+        Comment.objects.bulk_create([
+            Comment(user=users[(post.pk + n) % USERS], post=post, content=f'комментарий {n}')
+            for post in posts for n in range(3)
+        ])
+        Repost.objects.bulk_create([
+            Repost(user=user, original_post=post)
+            for user in users for post in posts[user.pk % 7::7]
+        ])
+        Notification.objects.bulk_create([
+            Notification(recipient=post.author, sender=users[n], notification_type='comment', post=post)
+            for post in posts for n in range(2)
+        ])
+        Follow.objects.bulk_create([Follow(follower=cls.user, following=user) for user in users[1:]])
+        TimelineEntry.objects.bulk_create([
+            TimelineEntry(user=cls.user, post=post, author_id=post.author_id, created_at=post.created_at)
+            for post in posts
+        ])
+
+    def setUp(self):
+        response_cache().clear()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            if connection.vendor == 'postgresql':
+                # на тестовых объёмах PostgreSQL может предпочесть полный проход
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def main_query(self, url, table):
+        """Первый запрос списка к таблице table (с ORDER BY), выполненный при запросе url."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        pattern = re.compile(rf'\bFROM "?{table}"?(\s|$)')
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if sql.startswith('SELECT') and pattern.search(sql) and 'ORDER BY' in sql:
+                return sql
+        self.fail(f'{url}: нет запроса к {table}')
+
+    def test_list_endpoints_use_indexes(self):
+        params = {'username': self.user.username, 'post_id': self.post.pk, 'tag': 'индексы'}
+        for url, table, index in ENDPOINTS:
+            url = url.format(**params)
+            with self.subTest(url=url):
+                plan = explain(self.main_query(url, table))
+                self.assertIn(index, plan, f'{url}:\n{plan}')
+                self.assertIsNone(full_scan(plan, table), f'{url}:\n{plan}')
+                self.assertIsNone(sorts_in_memory(plan), f'{url}:\n{plan}')
+
+    def test_repost_pair_is_unique(self):
+        self.assertIn(self.client.post(f'/api/posts/{self.post.pk}/repost/').status_code, (200, 201))
+        self.assertEqual(self.client.post(f'/api/posts/{self.post.pk}/repost/').status_code, 200)
+        self.assertEqual(Repost.objects.filter(user=self.user, original_post=self.post).count(), 1)
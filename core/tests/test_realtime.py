@@ -0,0 +1,100 @@
+# backend/core/tests/test_realtime.py
+# Поток событий SSE (core/realtime.py) на уровне ASGI: отказ без токена или с неверным токеном,
+# доставка опубликованного события подписчику, пинги простаивающего соединения, закрытие потока
+# при переполнении очереди, отписка при отключении клиента.
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.realtime import hub, publish, sse_application
+
+
+class EventStream:
+    """
+    ASGI-клиент потока событий. Приложение запускается задачей в текущем контексте, чтобы
+    проверка токена через sync_to_async шла в потоке теста и видела данные его транзакции.
+    """
+
+    def __init__(self, query_string=b'', headers=()):
+        self.input = asyncio.Queue()
+        self.output = asyncio.Queue()
+        scope = {'type': 'http', 'path': '/api/events/', 'query_string': query_string, 'headers': list(headers)}
+        self.task = asyncio.ensure_future(sse_application(scope, self.input.get, self.output.put))
+
+    async def receive(self, timeout=1):
+        return await asyncio.wait_for(self.output.get(), timeout)
+
+    async def body(self):
+        message = await self.receive()
+        assert message['type'] == 'http.response.body', message
+        return message['body']
+
+    async def disconnect(self):
+        await self.input.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(self.task, 1)
+
+
+class EventStreamTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', password='pw')
+
+    async def connect(self):
+        stream = EventStream(f'token={AccessToken.for_user(self.user)}'.encode())
+        start = await stream.receive()
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream; charset=utf-8'), start['headers'])
+        self.assertEqual(await stream.body(), b': connected\n\n')
+        return stream
+
+    def publish(self, event, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            publish([self.user.pk], event, data)
+
+    async def test_rejects_missing_and_invalid_token(self):
+        for stream in (EventStream(), EventStream(b'token=garbage'),
+                       EventStream(headers=[(b'authorization', b'Bearer garbage')])):
+            start = await stream.receive()
+            self.assertEqual(start['status'], 401)
+            self.assertIn('detail', (await stream.receive())['body'].decode())
+            await asyncio.wait_for(stream.task, 1)
+        self.assertEqual(hub.connected(), 0)
+
+    async def test_published_event_is_delivered(self):
+        stream = await self.connect()
+        self.assertEqual(hub.connected(), 1)
+        await sync_to_async(self.publish)('notification', {'id': 7, 'type': 'like'})
+        self.assertEqual(await stream.body(), b'event: notification\ndata: {"id":7,"type":"like"}\n\n')
+        await stream.disconnect()
+
+    @override_settings(REALTIME_HEARTBEAT_SECONDS=0.05)
+    async def test_idle_stream_gets_heartbeats(self):
+        stream = await self.connect()
+        self.assertEqual(await stream.body(), b': ping\n\n')
+        self.assertEqual(await stream.body(), b': ping\n\n')
+        await stream.disconnect()
+
+    @override_settings(REALTIME_QUEUE_SIZE=1)
+    async def test_queue_overflow_closes_stream(self):
+        stream = await self.connect()
+        # события приходят быстрее, чем соединение их отправляет: второе уже не помещается в очередь
+        for number in range(3):
+            hub.dispatch([self.user.pk], {'event': 'post', 'data': {'id': number}})
+        final = await stream.receive()
+        self.assertEqual((final['body'], final['more_body']), (b'', False))
+        await asyncio.wait_for(stream.task, 1)
+        self.assertEqual(hub.connected(), 0)
+
+    async def test_disconnect_unsubscribes(self):
+        stream = await self.connect()
+        self.assertEqual(hub.connected(), 1)
+        await stream.disconnect()
+        self.assertEqual(hub.connected(), 0)
+        # событие после отключения никуда не доставляется и не ломает публикацию
+        hub.dispatch([self.user.pk], {'event': 'post', 'data': {}})
+        self.assertTrue(stream.output.empty())
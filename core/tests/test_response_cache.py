@@ -0,0 +1,99 @@
+# backend/core/tests/test_response_cache.py
+# Кэш ответов для анонимных GET (core/cache.py): записи помечены тегами пользователей и постов,
+# лайк, правка поста, комментарий и изменение профиля сбрасывают ровно те ответы, которых касаются;
+# популярные посты сбрасываются и при изменении карточки автора.
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.cache import invalidate_tags, response_cache, tag_versions
+from core.models import Comment, Post, Profile, Repost, TrendingPost
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=60)
+class ResponseCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', password='pw')
+        cls.bob = User.objects.create_user('bob', password='pw')
+        cls.post = Post.objects.create(author=cls.alice, content='пост')
+        cls.other = Post.objects.create(author=cls.bob, content='другой')
+        Repost.objects.create(user=cls.bob, original_post=cls.post)
+
+    def setUp(self):
+        response_cache().clear()
+
+    def get(self, url, cached):
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT' if cached else 'MISS', url)
+        return response.json()
+
+    def warm(self, *urls):
+        for url in urls:
+            self.get(url, cached=False)
+            self.get(url, cached=True)
+
+    def like_count(self, url):
+        return self.get(url, cached=False)['results'][0]['like_count']
+
+    def test_likes_from_both_sides_invalidate_post(self):
+        posts, reposts, comments = '/api/users/alice/posts/', '/api/users/bob/reposts/', '/api/users/bob/comments/'
+        self.warm(posts, reposts, comments)
+        self.post.likes.add(self.bob)
+        self.assertEqual(self.like_count(posts), 1)
+        self.assertEqual(self.get(reposts, cached=False)['results'][0]['original_post']['like_count'], 1)
+        self.get(comments, cached=True)
+
+        self.bob.liked_posts.remove(self.post)
+        self.assertEqual(self.like_count(posts), 0)
+        self.bob.liked_posts.remove(self.post)  # лайка уже нет — кэш не сбрасывается
+        self.get(posts, cached=True)
+        self.bob.liked_posts.add(self.post)
+        self.assertEqual(self.like_count(posts), 1)
+        self.bob.liked_posts.clear()
+        self.assertEqual(self.like_count(posts), 0)
+
+    def test_edit_comment_and_profile(self):
+        posts, profile = '/api/users/alice/posts/', '/api/users/alice/profile/'
+        self.warm(posts, profile, '/api/users/bob/posts/', '/api/users/bob/profile/')
+        self.post.content = 'исправлено'
+        self.post.save()
+        self.assertEqual(self.get(posts, cached=False)['results'][0]['content'], 'исправлено')
+        self.get('/api/users/bob/posts/', cached=True)
+        self.get('/api/users/bob/profile/', cached=True)
+
+        self.warm(profile)
+        Comment.objects.create(user=self.bob, post=self.post, content='комментарий')
+        self.get(posts, cached=False)
+        self.get(profile, cached=True)
+
+        Profile.objects.filter(user=self.alice).update(bio='о себе')
+        self.get(profile, cached=True)
+        Profile.objects.get(user=self.alice).save()
+        self.assertEqual(self.get(profile, cached=False)['bio'], 'о себе')
+
+    def test_popular_posts_follow_author_card(self):
+        quoting = Post.objects.create(author=self.bob, content='цитата', quoted_post=self.post)
+        TrendingPost.objects.create(post=quoting, score=1.0, refreshed_at=timezone.now())
+        stranger = User.objects.create_user('stranger', password='pw')
+        popular = '/api/posts/popular/'
+        self.warm(popular)
+        stranger.first_name = 'Незнакомец'
+        stranger.save()
+        self.get(popular, cached=True)
+
+        self.bob.first_name = 'Боб'
+        self.bob.save()
+        self.assertEqual(self.get(popular, cached=False)[0]['author']['display_name'], 'Боб')
+        # автор цитируемого поста тоже в ответе
+        self.get(popular, cached=True)
+        Profile.objects.get(user=self.alice).save()
+        self.get(popular, cached=False)
+
+    def test_tag_versions(self):
+        versions = tag_versions(['a', 'b'], create=True)
+        self.assertEqual(tag_versions(['a', 'b', 'c']), versions)
+        invalidate_tags('a')
+        self.assertEqual(tag_versions(['a', 'b']), {'b': versions['b']})
@@ -0,0 +1,83 @@
+# backend/core/tests/test_search.py
+# Поиск постов (core/search.py): индекс FTS5 следует за постами через триггеры, выдача упорядочена
+# по релевантности среди ограниченного числа новых совпадений, без индекса — поиск подстрок.
+
+from unittest import mock
+from urllib.parse import quote
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.models import Post
+from core.search import ensure_sqlite_triggers, search_post_hits
+
+
+class PostSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='pw')
+
+    def post(self, content):
+        return Post.objects.create(author=self.author, content=content)
+
+    def search(self, query, page_size=20):
+        ids, url = [], f'/api/posts/search/?q={quote(query)}&page_size={page_size}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids += [post['id'] for post in data['results']]
+            url = data['next']
+        return ids
+
+    def test_index_follows_posts(self):
+        post = self.post('кошка спит')
+        self.assertEqual(self.search('кошка'), [post.pk])
+        post.content = 'собака спит'
+        post.save()
+        self.assertEqual(self.search('кошка'), [])
+        self.assertEqual(self.search('собака'), [post.pk])
+        post.delete()
+        self.assertEqual(self.search('спит'), [])
+
+        # триггеры, потерянные при пересоздании таблицы, восстанавливаются вместе с индексом
+        self.assertFalse(ensure_sqlite_triggers())
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER core_post_fts_insert')
+        missed = self.post('кошка без триггера')
+        self.assertTrue(ensure_sqlite_triggers())
+        added = self.post('кошка с триггером')
+        self.assertEqual(self.search('кошка'), [added.pk, missed.pk])
+
+    def test_ranking_and_pages(self):
+        once = self.post('кошка и много других слов в этом длинном посте')
+        twice = self.post('кошка кошка')
+        others = [self.post(f'кошка номер {number}') for number in range(5)]
+        self.post('собака')
+        ids = self.search('кошка')
+        self.assertEqual(ids[0], twice.pk)
+        self.assertEqual(ids[-1], once.pk)
+        self.assertEqual(set(ids[1:-1]), {post.pk for post in others})
+        self.assertEqual(self.search('кошка', page_size=3), ids)
+        # ввод пользователя не разбирается как синтаксис FTS5
+        self.assertEqual(self.search('"кошка* ('), ids)
+        self.assertEqual(self.search('кошка OR NEAR('), [])
+        self.assertEqual(self.client.get('/api/posts/search/?q=').status_code, 400)
+        self.assertEqual(self.client.get(f'/api/posts/search/?q={quote("кошка")}&cursor=abc').status_code, 404)
+
+    @override_settings(SEARCH_MAX_CANDIDATES=3)
+    def test_only_newest_candidates_are_ranked(self):
+        posts = [self.post('кошка ' * (number + 1)) for number in range(5)]
+        self.assertEqual(sorted(self.search('кошка', page_size=2)), [post.pk for post in posts[2:]])
+
+    def test_fallback_without_full_text_index(self):
+        posts = [self.post('Cat sleeps'), self.post('cat eats'), self.post('dog sleeps'), self.post('CAT SLEEPS')]
+        with mock.patch('core.search.connection') as other_database:
+            other_database.vendor = 'mysql'
+            self.assertEqual(search_post_hits('cat  sleeps'), [(posts[3].pk, 0.0), (posts[0].pk, 0.0)])
+            self.assertEqual(search_post_hits('cat', (0.0, posts[1].pk), 5), [(posts[0].pk, 0.0)])
+            self.assertEqual(search_post_hits('cat', (1.0, 0), 5), [(posts[3].pk, 0.0), (posts[1].pk, 0.0), (posts[0].pk, 0.0)])
+            self.assertEqual(search_post_hits('cat', (-1.0, posts[3].pk), 5), [])
+            self.assertEqual(self.search('sleeps', page_size=1), [posts[3].pk, posts[2].pk, posts[0].pk])
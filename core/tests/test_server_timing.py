@@ -0,0 +1,74 @@
+# backend/core/tests/test_server_timing.py
+# Заголовок Server-Timing и строка журнала core.timing о каждом запросе, медленные — предупреждения (core/timing.py).
+
+import json
+import logging
+import re
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework import serializers
+
+from core.models import Post
+from core.timing import TimedSerializerMixin, current_timings
+
+
+def parse_server_timing(header):
+    """{фаза: (мс, описание)} из заголовка Server-Timing."""
+    phases = {}
+    for part in header.split(', '):
+        name, *params = part.split(';')
+        values = dict(param.split('=', 1) for param in params)
+        phases[name] = (float(values['dur']), values.get('desc', '').strip('"'))
+    return phases
+
+
+@override_settings(SERVER_TIMING_HEADER=True)
+class ServerTimingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', password='pw')
+        for number in range(3):
+            Post.objects.create(author=author, content=f'пост {number}')
+
+    def test_header_reports_phases(self):
+        response = self.client.get('/api/posts/')
+        self.assertEqual(response.status_code, 200)
+        phases = parse_server_timing(response['Server-Timing'])
+        self.assertEqual(list(phases), ['db', 'serialize', 'render', 'view', 'total'])
+        queries = int(re.match(r'(\d+) queries', phases['db'][1]).group(1))
+        self.assertGreater(queries, 0)
+        # список + 3 поста + вложенные сериализаторы
+        self.assertGreater(int(phases['serialize'][1].split()[0]), 3)
+        self.assertGreaterEqual(phases['total'][0], phases['view'][0])
+        self.assertGreaterEqual(phases['view'][0], phases['db'][0])
+        self.assertIsNone(current_timings())
+
+    def test_every_request_is_logged_and_slow_ones_are_warnings(self):
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            self.client.get('/api/posts/')
+        self.assertEqual([record.levelno for record in logs.records], [logging.INFO])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['route'], 'posts')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record, logs.records[0].timing)
+        self.assertGreater(record['db_queries'], 0)
+        with self.settings(SERVER_TIMING_SLOW_MS=0), self.assertLogs('core.timing', 'INFO') as logs:
+            self.client.get('/api/posts/')
+        self.assertEqual([record.levelno for record in logs.records], [logging.WARNING])
+
+    def test_header_defaults_to_debug(self):
+        with self.settings(DEBUG=False):
+            del settings.SERVER_TIMING_HEADER
+            self.assertNotIn('Server-Timing', self.client.get('/api/posts/'))
+        with self.settings(DEBUG=True):
+            del settings.SERVER_TIMING_HEADER
+            self.assertIn('Server-Timing', self.client.get('/api/posts/'))
+
+    def test_drf_serializers_are_not_patched(self):
+        # замеряются только сериализаторы проекта, базовые классы DRF остаются как есть
+        for cls in (serializers.Serializer, serializers.ListSerializer):
+            self.assertEqual(cls.to_representation.__module__, 'rest_framework.serializers')
+        self.assertFalse(issubclass(serializers.ModelSerializer, TimedSerializerMixin))
@@ -0,0 +1,108 @@
+# backend/core/tests/test_timeline.py
+# Домашняя лента (core/timeline.py): раскладка в фоне, подмешивание постов «популярных» авторов
+# при чтении, события о новом посте всем подписчикам, досыпка и очистка при подписке / отписке,
+# заполнение лент миграцией 0022.
+
+import importlib
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Follow, Post, TimelineEntry
+from core.timeline import flush_timelines
+
+backfill = importlib.import_module('core.migrations.0022_backfill_timelines')
+
+
+def auth_headers(user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+@override_settings(BACKGROUND_WORKERS_ASYNC=False, TIMELINE_FANOUT_FOLLOWER_LIMIT=3, TIMELINE_BACKFILL_SIZE=2)
+class HomeTimelineTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader, cls.author, cls.star, cls.stranger = [
+            User.objects.create_user(name, password='pw') for name in ('reader', 'author', 'star', 'stranger')
+        ]
+        Follow.objects.create(follower=cls.reader, following=cls.author)
+        Follow.objects.create(follower=cls.reader, following=cls.star)
+        # у star подписчиков не меньше порога — его посты подмешиваются при чтении
+        for number in range(3):
+            fan = User.objects.create_user(f'fan{number}', password='pw')
+            Follow.objects.create(follower=fan, following=cls.star)
+
+    def setUp(self):
+        # посты других тестов, оставшиеся в общей очереди раскладки
+        flush_timelines()
+
+    def publish(self, author, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(author=author, content=content)
+        return post
+
+    def timeline(self, user, page_size=3):
+        ids, url = [], f'/api/timeline/?page_size={page_size}'
+        while url:
+            data = self.client.get(url, **auth_headers(user)).json()
+            ids += [post['id'] for post in data['results']]
+            url = data['next']
+        return ids
+
+    def test_fan_out_runs_in_background(self):
+        post = self.publish(self.author, 'пост')
+        # в ленте автора пост сразу, в ленты подписчиков — после обработки очереди
+        self.assertEqual(list(TimelineEntry.objects.filter(post=post).values_list('user_id', flat=True)),
+                         [self.author.pk])
+        self.assertEqual(flush_timelines(), 1)
+        self.assertEqual(set(TimelineEntry.objects.filter(post=post).values_list('user_id', flat=True)),
+                         {self.author.pk, self.reader.pk})
+
+    def test_new_post_event_reaches_all_followers(self):
+        posts = [self.publish(self.author, 'пост'), self.publish(self.star, 'пост звезды')]
+        with mock.patch('core.timeline.publish') as publish, mock.patch('core.timeline.BATCH_SIZE', 2):
+            flush_timelines()
+        recipients = {post.pk: set() for post in posts}
+        for (user_ids, event, data), _ in publish.call_args_list:
+            self.assertEqual(event, 'post')
+            recipients[data['id']].update(user_ids)
+        self.assertEqual(recipients[posts[0].pk], {self.author.pk, self.reader.pk})
+        # посты «популярного» автора не раскладываются, но событие получают все его подписчики
+        self.assertFalse(TimelineEntry.objects.filter(post=posts[1]).exclude(user=self.star).exists())
+        self.assertEqual(recipients[posts[1].pk], set(Follow.objects.filter(following=self.star).values_list(
+            'follower_id', flat=True)) | {self.star.pk})
+
+    def test_large_authors_are_merged_at_read_time(self):
+        posts = []
+        for number in range(3):
+            posts += [self.publish(self.author, f'a{number}'), self.publish(self.star, f's{number}'),
+                      self.publish(self.reader, f'r{number}'), self.publish(self.stranger, f'x{number}')]
+        flush_timelines()
+        self.assertFalse(TimelineEntry.objects.filter(author=self.star).exclude(user=self.star).exists())
+        expected = [post.pk for post in reversed(posts) if post.author_id != self.stranger.pk]
+        self.assertEqual(self.timeline(self.reader), expected)
+        self.assertEqual(self.timeline(self.reader, page_size=100), expected)
+
+    def test_follow_backfills_and_unfollow_removes(self):
+        posts = [self.publish(self.stranger, f'x{number}') for number in range(3)]
+        flush_timelines()
+        follow = Follow.objects.create(follower=self.reader, following=self.stranger)
+        # досыпаются только последние TIMELINE_BACKFILL_SIZE постов
+        self.assertEqual(self.timeline(self.reader), [posts[2].pk, posts[1].pk])
+        follow.delete()
+        self.assertEqual(self.timeline(self.reader), [])
+
+    def test_migration_backfills_existing_follows(self):
+        posts = [self.publish(self.author, f'a{number}') for number in range(3)]
+        own = self.publish(self.reader, 'свой')
+        TimelineEntry.objects.all().delete()
+        backfill.backfill_timelines(apps, None)
+        self.assertEqual(self.timeline(self.reader), [own.pk, posts[2].pk, posts[1].pk])
+        # ленты, которые уже заполнены, миграция не трогает
+        TimelineEntry.objects.filter(user=self.reader, post=own).delete()
+        backfill.backfill_timelines(apps, None)
+        self.assertEqual(self.timeline(self.reader), [posts[2].pk, posts[1].pk])
@@ -0,0 +1,93 @@
+# backend/core/tests/test_trending.py
+# Трендовые посты (core/trending.py): шкала рейтинга, полный и инкрементальный пересчёт,
+# пересчёт в фоне после чтения posts/popular/, заполнение таблицы миграцией 0023.
+
+import importlib
+from datetime import timedelta
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.cache import response_cache
+from core.models import Post, TrendingPost
+from core.trending import refresh_trending, refresh_trending_scores, trending_refresher, trending_score
+
+seed = importlib.import_module('core.migrations.0023_post_activity_trending')
+
+
+def trending_ids():
+    return list(TrendingPost.objects.order_by('-score', '-post_id').values_list('post_id', flat=True))
+
+
+@override_settings(BACKGROUND_WORKERS_ASYNC=False, TRENDING_HALF_LIFE_HOURS=12, TRENDING_REFRESH_SECONDS=300)
+class TrendingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.readers = [User.objects.create_user(f'reader{number}', password='pw') for number in range(4)]
+        author = User.objects.create_user('author', password='pw')
+        cls.old, cls.fresh, cls.quiet = [
+            Post.objects.create(author=author, content=content) for content in ('старый', 'новый', 'тихий')
+        ]
+        Post.objects.filter(pk=cls.old.pk).update(created_at=timezone.now() - timedelta(hours=24))
+        cls.old.refresh_from_db()
+
+    def setUp(self):
+        response_cache().clear()
+        trending_refresher.flush()  # пересчёты, поставленные другими тестами
+
+    def test_score_keeps_order_of_decayed_engagement(self):
+        now = timezone.now()
+        posts = [(4, 0, 0, 24), (1, 0, 0, 0), (0, 1, 1, 12), (3, 0, 0, 1)]
+        decayed = sorted(posts, key=lambda p: (p[0] + 2 * p[1] + 3 * p[2]) * 0.5 ** (p[3] / 12))
+        scored = sorted(posts, key=lambda p: trending_score(*p[:3], now - timedelta(hours=p[3])))
+        self.assertEqual(scored, decayed)
+        self.assertIsNone(trending_score(0, 0, 0, now))
+
+    def test_full_and_incremental_refresh(self):
+        # у старого поста вдвое больше лайков, но за сутки (два периода полураспада) они потеряли три четверти веса
+        self.old.likes.add(*self.readers)
+        self.fresh.likes.add(self.readers[0], self.readers[1])
+        self.assertEqual(refresh_trending_scores(), 3)
+        self.assertEqual(trending_ids(), [self.fresh.pk, self.old.pk])
+
+        since = timezone.now()
+        Post.objects.update(activity_at=since - timedelta(hours=1))
+        self.assertEqual(refresh_trending_scores(since=since), 0)
+        self.fresh.likes.remove(self.readers[0], self.readers[1])
+        self.quiet.likes.add(self.readers[0])
+        # пересчитываются только посты, у которых менялись счётчики
+        self.assertEqual(refresh_trending_scores(since=since - timedelta(minutes=1)), 2)
+        self.assertEqual(trending_ids(), [self.old.pk, self.quiet.pk])
+
+    @override_settings(TRENDING_WINDOW_HOURS=12)
+    def test_posts_leave_the_window(self):
+        self.old.likes.add(self.readers[0])
+        TrendingPost.objects.create(post=self.old, score=1000.0, refreshed_at=timezone.now())
+        refresh_trending_scores(since=timezone.now())
+        self.assertEqual(trending_ids(), [])
+
+    def test_popular_read_schedules_refresh(self):
+        self.fresh.likes.add(self.readers[0])
+        self.assertEqual(self.client.get('/api/posts/popular/').json(), [])
+        self.assertEqual(trending_refresher.pending(), 1)
+        # следующий запрос в пределах TRENDING_REFRESH_SECONDS пересчёт не ставит
+        self.client.get('/api/posts/popular/?again=1')
+        self.assertEqual(trending_refresher.flush(), 1)
+        self.assertEqual([post['id'] for post in self.client.get('/api/posts/popular/').json()], [self.fresh.pk])
+
+        # инкрементальный пересчёт — от времени прошлого (с запасом REFRESH_OVERLAP)
+        Post.objects.update(activity_at=timezone.now() - timedelta(hours=1))
+        self.quiet.likes.add(self.readers[0], self.readers[1])
+        self.assertEqual(refresh_trending(), 1)
+        self.assertEqual(trending_ids(), [self.quiet.pk, self.fresh.pk])
+
+    def test_migration_seeds_table(self):
+        self.fresh.likes.add(self.readers[0])
+        seed.seed_trending(apps, None)
+        self.assertEqual(trending_ids(), [self.fresh.pk])
+        self.assertAlmostEqual(
+            TrendingPost.objects.get().score, trending_score(1, 0, 0, self.fresh.created_at), places=6,
+        )
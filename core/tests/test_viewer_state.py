@@ -0,0 +1,62 @@
+# backend/core/tests/test_viewer_state.py
+# liked_by_user / reposted_by_user (core.loaders.ViewerState): состояние текущего пользователя
+# загружается на страницу двумя запросами, а не запросом на каждый пост.
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.loaders import ViewerState
+from core.models import Post, Repost
+
+
+def auth_headers(user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+class ViewerStateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = User.objects.create_user('viewer', password='pw')
+        author = User.objects.create_user('author', password='pw')
+        cls.posts = Post.objects.bulk_create([Post(author=author, content=f'пост {n}') for n in range(30)])
+        cls.posts[0].likes.add(cls.viewer)
+        cls.posts[3].likes.add(cls.viewer)
+        Repost.objects.create(user=cls.viewer, original_post=cls.posts[5])
+
+    def test_prime_loads_page_with_two_queries(self):
+        state = ViewerState(self.viewer)
+        with self.assertNumQueries(2):
+            state.prime([post.pk for post in self.posts])
+        with self.assertNumQueries(0):
+            self.assertTrue(state.is_liked(self.posts[3].pk))
+            self.assertFalse(state.is_liked(self.posts[5].pk))
+            self.assertTrue(state.is_reposted(self.posts[5].pk))
+        # пост вне загруженной страницы догружается отдельно
+        extra = Post.objects.create(author=self.viewer, content='новый')
+        with self.assertNumQueries(2):
+            self.assertFalse(state.is_liked(extra.pk))
+
+    def test_anonymous_viewer_costs_nothing(self):
+        state = ViewerState(AnonymousUser())
+        with self.assertNumQueries(0):
+            state.prime([post.pk for post in self.posts])
+            self.assertFalse(state.is_liked(self.posts[0].pk))
+
+    def test_page_flags_and_query_count(self):
+        counts = {}
+        for page_size in (5, 30):
+            with CaptureQueriesContext(connection) as queries:
+                results = self.client.get(f'/api/posts/?page_size={page_size}', **auth_headers(self.viewer)).json()['results']
+            counts[page_size] = len(queries)
+        self.assertEqual(counts[5], counts[30])
+        self.assertEqual(
+            sorted(post['id'] for post in results if post['liked_by_user']),
+            sorted([self.posts[0].pk, self.posts[3].pk]),
+        )
+        self.assertEqual([post['id'] for post in results if post['reposted_by_user']], [self.posts[5].pk])
+        reposts = self.client.get('/api/posts/reposts/', **auth_headers(self.viewer)).json()['results']
+        self.assertTrue(reposts[0]['original_post']['reposted_by_user'])
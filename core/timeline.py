@@ -0,0 +1,178 @@
+# backend/core/timeline.py
+# Домашняя лента на подписках (fan-out on write):
+# - fan_out_post: раскладывает новый пост в материализованные ленты подписчиков автора и отправляет
+#   им событие о новом посте (всем подписчикам, в том числе «популярных» авторов); выполняется
+#   фоновой очередью (core.background.BackgroundWorker) после фиксации транзакции, поэтому создание
+#   поста не ждёт записи тысяч строк. В ленту самого автора пост попадает сразу (add_own_post)
+# - add_followed_posts / remove_followed_posts: досыпают и убирают посты при подписке и отписке
+# - read_home_timeline: читает страницу ленты; посты «популярных» авторов (подписчиков не меньше
+#   TIMELINE_FANOUT_FOLLOWER_LIMIT) не раскладываются при записи, а подмешиваются при чтении
+# - rebuild_timeline: полная пересборка ленты пользователя (команда rebuild_timelines)
+
+from django.conf import settings
+from django.db import transaction
+
+from .background import BackgroundWorker
+from .models import Follow, Post, Profile, TimelineEntry
+from .pagination import KeysetPagination, keyset_filter
+from .realtime import publish
+
+TIMELINE_ORDERING = ('-created_at', '-post_id')
+BATCH_SIZE = 1000
+
+
+def fanout_follower_limit():
+    return getattr(settings, 'TIMELINE_FANOUT_FOLLOWER_LIMIT', 10000)
+
+
+def backfill_size():
+    return getattr(settings, 'TIMELINE_BACKFILL_SIZE', 50)
+
+
+def is_fanout_author(user_id):
+    """Раскладывать ли посты автора при записи (True) или подмешивать при чтении (False)."""
+    followers = Profile.objects.filter(user_id=user_id).values_list('followers_count', flat=True).first()
+    return (followers or 0) < fanout_follower_limit()
+
+
+def _bulk_insert(entries):
+    TimelineEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def _entry(post, user_id):
+    return TimelineEntry(user_id=user_id, post_id=post.pk, author_id=post.author_id, created_at=post.created_at)
+
+
+def add_own_post(post):
+    """Добавляет пост в ленту автора (сразу, при создании поста)."""
+    _bulk_insert([_entry(post, post.author_id)])
+
+
+def follower_chunks(author_id):
+    """id подписчиков автора списками по BATCH_SIZE (читаются порциями, а не одним списком)."""
+    follower_ids = (
+        Follow.objects.filter(following_id=author_id)
+        .values_list('follower_id', flat=True)
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    chunk = []
+    for follower_id in follower_ids:
+        chunk.append(follower_id)
+        if len(chunk) >= BATCH_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def fan_out_post(post):
+    """
+    Раскладывает пост в ленты подписчиков автора, если автор не «популярный», и отправляет
+    автору и всем его подписчикам событие о новом посте (core/realtime.py). Подписчики
+    «популярных» авторов тоже получают событие: пост подмешивается в их ленту при чтении.
+    """
+    fan_out = is_fanout_author(post.author_id)
+    payload = {'id': post.pk, 'author_id': post.author_id}
+    publish([post.author_id], 'post', payload)
+    for chunk in follower_chunks(post.author_id):
+        if fan_out:
+            _bulk_insert([_entry(post, follower_id) for follower_id in chunk])
+        publish(chunk, 'post', payload)
+
+
+def write_fan_out(post_ids):
+    """Обработчик очереди: раскладывает посты post_ids (удалённые к этому времени пропускаются)."""
+    for post in Post.objects.filter(pk__in=post_ids).only('id', 'author_id', 'created_at').order_by('id'):
+        fan_out_post(post)
+
+
+timeline_writer = BackgroundWorker('timeline', write_fan_out, batch_size=100)
+
+
+def schedule_fan_out(post):
+    """Ставит пост в очередь раскладки после фиксации транзакции, в которой он создан."""
+    transaction.on_commit(lambda: timeline_writer.submit(post.pk))
+
+
+def flush_timelines():
+    """Синхронно раскладывает все посты из очереди; возвращает их число."""
+    return timeline_writer.flush()
+
+
+def add_followed_posts(follower_id, following_id):
+    """При подписке досыпает в ленту последние посты автора (только для не «популярных» авторов)."""
+    if not is_fanout_author(following_id):
+        return
+    posts = (
+        Post.objects.filter(author_id=following_id)
+        .order_by('-created_at', '-id')
+        .values_list('id', 'created_at')[:backfill_size()]
+    )
+    _bulk_insert([
+        TimelineEntry(user_id=follower_id, post_id=post_id, author_id=following_id, created_at=created_at)
+        for post_id, created_at in posts
+    ])
+
+
+def remove_followed_posts(follower_id, following_id):
+    """При отписке убирает посты автора из ленты подписчика."""
+    TimelineEntry.objects.filter(user_id=follower_id, author_id=following_id).delete()
+
+
+def rebuild_timeline(user_id):
+    """Пересобирает ленту пользователя: свои посты и последние посты авторов, раскладываемых при записи."""
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    author_ids = list(
+        Follow.objects.filter(
+            follower_id=user_id,
+            following__profile__followers_count__lt=fanout_follower_limit(),
+        ).values_list('following_id', flat=True)
+    )
+    for author_id in [user_id, *author_ids]:
+        posts = (
+            Post.objects.filter(author_id=author_id)
+            .order_by('-created_at', '-id')
+            .values_list('id', 'created_at')[:backfill_size()]
+        )
+        _bulk_insert([
+            TimelineEntry(user_id=user_id, post_id=post_id, author_id=author_id, created_at=created_at)
+            for post_id, created_at in posts
+        ])
+
+
+def read_home_timeline(user, queryset, position, limit):
+    """
+    Возвращает до limit постов домашней ленты, строго после позиции position = (created_at, id)
+    в порядке убывания. queryset — базовый запрос постов (с нужными select_related).
+
+    Материализованная часть читается диапазоном по индексу ленты, посты «популярных» авторов —
+    отдельным запросом по индексу постов автора; результаты сливаются в памяти.
+    """
+    entries = TimelineEntry.objects.filter(user=user)
+    if position is not None:
+        entries = entries.filter(keyset_filter(TIMELINE_ORDERING, position))
+    post_ids = list(entries.order_by(*TIMELINE_ORDERING).values_list('post_id', flat=True)[:limit])
+    posts = {post.pk: post for post in queryset.filter(pk__in=post_ids)} if post_ids else {}
+
+    pulled_authors = list(
+        Follow.objects.filter(
+            follower=user,
+            following__profile__followers_count__gte=fanout_follower_limit(),
+        ).values_list('following_id', flat=True)
+    )
+    if pulled_authors:
+        pulled = queryset.filter(author_id__in=pulled_authors)
+        if position is not None:
+            pulled = pulled.filter(keyset_filter(('-created_at', '-id'), position))
+        for post in pulled.order_by('-created_at', '-id')[:limit]:
+            posts.setdefault(post.pk, post)
+
+    merged = sorted(posts.values(), key=lambda post: (post.created_at, post.pk), reverse=True)
+    return merged[:limit]
+
+
+class TimelinePagination(KeysetPagination):
+    """Keyset-пагинация домашней ленты: страница собирается read_home_timeline, курсор — (created_at, id) поста."""
+
+    def fetch_page(self, queryset, position, limit):
+        return read_home_timeline(self.request.user, queryset, position, limit)
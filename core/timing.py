@@ -0,0 +1,218 @@
+# backend/core/timing.py
+# Разбивка времени запроса по фазам (SQL, сериализация, рендеринг, представление):
+# - ServerTimingMiddleware: на время запроса подключает учёт SQL-запросов (execute_wrapper) и
+#   кладёт RequestTimings в contextvar; в ответ добавляет заголовок Server-Timing (по умолчанию
+#   только при DEBUG), каждый запрос пишет в журнал core.timing строкой JSON с теми же цифрами:
+#   с уровнем INFO, медленные (не быстрее SERVER_TIMING_SLOW_MS) — с уровнем WARNING
+# - сериализация: сериализаторы проекта наследуют TimedSerializer / TimedModelSerializer /
+#   TimedListSerializer (core/serializers.py); классы DRF и сторонних приложений не изменяются
+# - рендеринг: TimedJSONRenderer (DEFAULT_RENDERER_CLASSES)
+# - вне запроса (команды, фоновые потоки) обёртки сводятся к одной проверке contextvar
+#
+# Фазы в Server-Timing: db, serialize, render, view (работа представления целиком, включая SQL
+# и сериализацию), total (весь путь через middleware).
+
+import contextvars
+import json
+import logging
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+def timing_enabled():
+    return getattr(settings, 'SERVER_TIMING_ENABLED', True)
+
+
+def timing_header_enabled():
+    # Заголовок раскрывает клиентам устройство запросов — по умолчанию только при отладке
+    return getattr(settings, 'SERVER_TIMING_HEADER', settings.DEBUG)
+
+
+def slow_request_ms():
+    return getattr(settings, 'SERVER_TIMING_SLOW_MS', 500)
+
+
+class RequestTimings:
+    """Накопленные за запрос времена (мс) и счётчики фаз."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_ms = 0.0
+        self.db_count = 0
+        self.serialize_ms = 0.0
+        self.serialize_count = 0
+        self.serialize_depth = 0
+        self.render_ms = 0.0
+        self.view_started = None
+        self.view_ms = None
+        self.total_ms = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обёртка connection.execute_wrapper
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.db_count += 1
+
+    def finish(self):
+        now = time.perf_counter()
+        self.total_ms = (now - self.started) * 1000
+        if self.view_ms is None and self.view_started is not None:
+            # Ответ без отложенного рендеринга: всё после process_view, кроме рендеринга
+            self.view_ms = (now - self.view_started) * 1000 - self.render_ms
+
+    def phases(self):
+        """[(имя, мс, описание или None)] для заголовка и журнала."""
+        return [
+            ('db', self.db_ms, f'{self.db_count} queries'),
+            ('serialize', self.serialize_ms, f'{self.serialize_count} objects'),
+            ('render', self.render_ms, None),
+            ('view', self.view_ms or 0.0, None),
+            ('total', self.total_ms or 0.0, None),
+        ]
+
+    def header(self):
+        parts = []
+        for name, duration, description in self.phases():
+            part = f'{name};dur={duration:.2f}'
+            if description:
+                part += f';desc="{description}"'
+            parts.append(part)
+        return ', '.join(parts)
+
+    def as_dict(self):
+        return {
+            'db_ms': round(self.db_ms, 2),
+            'db_queries': self.db_count,
+            'serialize_ms': round(self.serialize_ms, 2),
+            'serialize_objects': self.serialize_count,
+            'render_ms': round(self.render_ms, 2),
+            'view_ms': round(self.view_ms or 0.0, 2),
+            'total_ms': round(self.total_ms or 0.0, 2),
+        }
+
+
+def current_timings():
+    """RequestTimings текущего запроса или None."""
+    return _current.get()
+
+
+class TimedSerializerMixin:
+    """
+    Примесь базовых сериализаторов проекта: время to_representation попадает в фазу serialize
+    текущего запроса. Считается только внешний вызов, вложенные лишь увеличивают счётчик;
+    SQL внутри сериализации из её времени вычитается.
+    """
+
+    def to_representation(self, *args, **kwargs):
+        method = super().to_representation
+        timings = _current.get()
+        if timings is None:
+            return method(*args, **kwargs)
+        timings.serialize_count += 1
+        if timings.serialize_depth:
+            timings.serialize_depth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timings.serialize_depth -= 1
+        timings.serialize_depth = 1
+        db_before = timings.db_ms
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timings.serialize_depth = 0
+            elapsed = (time.perf_counter() - started) * 1000
+            timings.serialize_ms += elapsed - (timings.db_ms - db_before)
+
+
+class TimedSerializer(TimedSerializerMixin, serializers.Serializer):
+    pass
+
+
+class TimedModelSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    pass
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer, время которого попадает в фазу render текущего запроса."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            timings.render_ms += (time.perf_counter() - started) * 1000
+
+
+class ServerTimingMiddleware:
+    """
+    Замер фаз запроса. Ставится первым в MIDDLEWARE, чтобы total включал остальные middleware.
+    SERVER_TIMING_ENABLED = False — не замерять; SERVER_TIMING_HEADER — отдавать ли заголовок;
+    в журнал с уровнем WARNING пишутся только запросы не быстрее SERVER_TIMING_SLOW_MS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not timing_enabled():
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        timings.finish()
+        if timing_header_enabled():
+            response['Server-Timing'] = timings.header()
+        self.log(request, response, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Ответы DRF рендерятся после этого вызова: здесь представление уже отработало
+        timings = _current.get()
+        if timings is not None and timings.view_started is not None:
+            timings.view_ms = (time.perf_counter() - timings.view_started) * 1000
+        return response
+
+    def log(self, request, response, timings):
+        level = logging.WARNING if timings.total_ms >= slow_request_ms() else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            **timings.as_dict(),
+        }
+        logger.log(level, json.dumps(record, ensure_ascii=False), extra={'timing': record})
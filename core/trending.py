@@ -0,0 +1,141 @@
+# backend/core/trending.py
+# Трендовые посты:
+# - trending_score: взвешенная активность поста с экспоненциальным затуханием по возрасту, в логарифмической
+#   шкале относительно общей точки отсчёта: затухание одинаково для всех постов, поэтому порядок постов
+#   со временем не меняется, а рейтинг поста пересчитывается только при изменении его счётчиков
+# - refresh_trending_scores: пересчёт таблицы TrendingPost — полный (все посты окна TRENDING_WINDOW_HOURS)
+#   или инкрементальный (только посты, у которых activity_at позже прошлого пересчёта)
+# - refresh_trending: пересчёт от времени прошлого пересчёта (хранится в кэше), полный при его отсутствии;
+#   вызывается командой refresh_trending и фоновой очередью
+# - schedule_trending_refresh: чтение топа ставит пересчёт в фоновую очередь не чаще раза
+#   в TRENDING_REFRESH_SECONDS, поэтому таблица обновляется и без отдельного планировщика
+
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from .background import BackgroundWorker
+from .cache import TRENDING_TAG, invalidate_tags, response_cache
+from .models import Post, TrendingPost
+
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+REPOST_WEIGHT = 3.0
+BATCH_SIZE = 1000
+
+# Точка отсчёта шкалы рейтинга; после смены TRENDING_HALF_LIFE_HOURS нужен полный пересчёт (--full)
+SCORE_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+LAST_REFRESH_KEY = 'trending:refreshed-at'
+SCHEDULED_KEY = 'trending:scheduled'
+# Запас при инкрементальном пересчёте: activity_at ставится временем транзакции, которая может
+# зафиксироваться уже после начала прохода
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+
+def window_hours():
+    return getattr(settings, 'TRENDING_WINDOW_HOURS', 72)
+
+
+def half_life_hours():
+    return getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 12)
+
+
+def trending_size():
+    return getattr(settings, 'TRENDING_SIZE', 10)
+
+
+def refresh_interval():
+    return getattr(settings, 'TRENDING_REFRESH_SECONDS', 300)
+
+
+def trending_score(like_count, comment_count, repost_count, created_at):
+    """
+    log2 активности, которая уменьшается вдвое каждые TRENDING_HALF_LIFE_HOURS часов, плюс общее для всех
+    постов слагаемое: (created_at - SCORE_EPOCH) в периодах полураспада. None — активности нет.
+    """
+    engagement = LIKE_WEIGHT * like_count + COMMENT_WEIGHT * comment_count + REPOST_WEIGHT * repost_count
+    if engagement <= 0:
+        return None
+    return math.log2(engagement) + (created_at - SCORE_EPOCH).total_seconds() / 3600 / half_life_hours()
+
+
+def refresh_trending_scores(now=None, since=None):
+    """
+    Пересчитывает рейтинг постов, созданных за последние TRENDING_WINDOW_HOURS часов: всех или (since)
+    только тех, чьи счётчики менялись начиная с since. Читаются только денормализованные счётчики поста,
+    запись — пачками с upsert. Посты без активности и вышедшие из окна удаляются из таблицы.
+    Возвращает число пересчитанных постов.
+    """
+    now = now or timezone.now()
+    window_start = now - timedelta(hours=window_hours())
+    posts = Post.objects.filter(created_at__gte=window_start)
+    if since is not None:
+        posts = posts.filter(activity_at__gte=since)
+    posts = (
+        posts.values_list('id', 'created_at', 'like_count', 'comment_count', 'repost_count')
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+
+    refreshed = 0
+    batch = []
+    inactive = []
+    for post_id, created_at, likes, comments, reposts in posts:
+        refreshed += 1
+        score = trending_score(likes, comments, reposts, created_at)
+        if score is None:
+            inactive.append(post_id)
+            continue
+        batch.append(TrendingPost(post_id=post_id, score=score, refreshed_at=now))
+        if len(batch) >= BATCH_SIZE:
+            _upsert(batch)
+            batch = []
+    if batch:
+        _upsert(batch)
+
+    stale = TrendingPost.objects.filter(post__created_at__lt=window_start)
+    if since is None:
+        # полный проход: всё, что не обновлено сейчас, в таблице лишнее
+        stale = TrendingPost.objects.filter(refreshed_at__lt=now)
+    stale.delete()
+    TrendingPost.objects.filter(post_id__in=inactive).delete()
+    invalidate_tags(TRENDING_TAG)
+    return refreshed
+
+
+def _upsert(batch):
+    TrendingPost.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['post'],
+        update_fields=['score', 'refreshed_at'],
+    )
+
+
+def refresh_trending(full=False):
+    """
+    Инкрементальный пересчёт от времени прошлого пересчёта; полный — при full или если оно неизвестно
+    (первый запуск, очищенный кэш). Возвращает число пересчитанных постов.
+    """
+    cache = response_cache()
+    started = timezone.now()
+    since = None if full else cache.get(LAST_REFRESH_KEY)
+    refreshed = refresh_trending_scores(now=started, since=since and since - REFRESH_OVERLAP)
+    cache.set(LAST_REFRESH_KEY, started, None)
+    return refreshed
+
+
+def _refresh_batch(items):
+    refresh_trending()
+
+
+trending_refresher = BackgroundWorker('trending', _refresh_batch)
+
+
+def schedule_trending_refresh():
+    """Ставит пересчёт в фоновую очередь, если его не ставили последние TRENDING_REFRESH_SECONDS секунд."""
+    interval = refresh_interval()
+    if interval > 0 and response_cache().add(SCHEDULED_KEY, True, interval):
+        trending_refresher.submit(None)
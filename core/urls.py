@@ -4,11 +4,12 @@ from django.urls import path
 from .views import (
     RegisterAPIView, ProfileDetailAPIView, PostListCreateAPIView,
     PostCommentListCreateAPIView, PostRepostAPIView,
-    PostLikeAPIView, PopularPostsAPIView, UserPostsAPIView, UserRepostsAPIView,
+    PostLikeAPIView, HomeTimelineAPIView, PopularPostsAPIView, PostSearchAPIView, UserPostsAPIView,
+    HashtagPostsAPIView, MentionedPostsAPIView, UserRepostsAPIView,
     UserCommentsAPIView, ChangePasswordAPIView, CurrentUserAPIView,
     SendPasswordResetEmailAPIView, ResetPasswordAPIView,
     LikedPostsAPIView, UserRepostsListAPIView,
-    PublicProfileView, NotificationListAPIView,
+    PublicProfileView, NotificationListAPIView, NotificationUnreadCountAPIView, NotificationMarkReadAPIView,
     PasswordCheckAPIView  # Новый класс для проверки сложности пароля
 )
 
@@ -22,9 +23,19 @@ urlpatterns = [
     path('posts/<int:pk>/repost/', PostRepostAPIView.as_view(), name='post-repost'),
     path('posts/<int:pk>/like/', PostLikeAPIView.as_view(), name='post-like'),
 
+    # Домашняя лента по подпискам
+    path('timeline/', HomeTimelineAPIView.as_view(), name='home-timeline'),
+
     # Популярные посты
     path('posts/popular/', PopularPostsAPIView.as_view(), name='popular-posts'),
 
+    # Полнотекстовый поиск постов
+    path('posts/search/', PostSearchAPIView.as_view(), name='post-search'),
+
+    # Посты с хэштегом и посты, где упомянут текущий пользователь
+    path('tags/<str:name>/posts/', HashtagPostsAPIView.as_view(), name='hashtag-posts'),
+    path('posts/mentions/', MentionedPostsAPIView.as_view(), name='mentioned-posts'),
+
     # Лайкнутые и репостнутые посты текущего пользователя
     path('posts/liked/', LikedPostsAPIView.as_view(), name='liked-posts'),
     path('posts/reposts/', UserRepostsListAPIView.as_view(), name='user-reposts-list'),
@@ -50,6 +61,8 @@ urlpatterns = [
 
     # Оставшиеся маршруты уведомлений
     path('notifications/', NotificationListAPIView.as_view(), name='notifications'),
+    path('notifications/unread-count/', NotificationUnreadCountAPIView.as_view(), name='notifications-unread-count'),
+    path('notifications/mark-read/', NotificationMarkReadAPIView.as_view(), name='notifications-mark-read'),
 ]
 # updated 2025-07-12 22:40:59
 
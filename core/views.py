@@ -19,17 +19,58 @@
 from rest_framework import generics, permissions, status, mixins
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Count
+from rest_framework.utils.urls import replace_query_param
+from django.db.models import Count, Max, Q
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
-from .models import Profile, Post, Repost, Comment, Notification
+from .models import Profile, Post, Repost, Comment, Notification, Hashtag, PostHashtag, PostMention
 from .serializers import PublicProfileSerializer, FullProfileSerializer
+from .cache import CachedResponseMixin, TRENDING_TAG, post_tag, tag_versions, user_tag
+from .conditional import ConditionalGetMixin, make_etag
+from .entities import EntityPagination, normalize_tag
+from .likes import add_like, remove_like
+from .comment_tree import CommentTree, load_post_comments, max_depth_default, replies_page_size
+from .notifications import mark_notifications_read
+from .search import SearchPagination, normalize_query
+from .timeline import TimelinePagination
+from .trending import schedule_trending_refresh, trending_size
 from .serializers import (
     ProfileSerializer, ProfileUpdateSerializer, PostSerializer,
-    CommentSerializer, RepostSerializer, UserSerializer, RegisterSerializer,
+    CommentSerializer, CommentTreeSerializer, RepostSerializer, UserSerializer, RegisterSerializer,
     SendPasswordResetEmailSerializer, ResetPasswordSerializer, NotificationSerializer
 )
 
+def username_tag(username):
+    """Тег кэша пользователя по username (id ищется по уникальному индексу)."""
+    user_id = User.objects.filter(username=username).values_list('id', flat=True).first()
+    return user_tag(user_id) if user_id else None
+
+
+def post_tags(posts):
+    """
+    Теги кэша для постов ответа, постов, которые они цитируют, и их авторов: карточка автора
+    (имя, аватар) входит в ответ и меняется вместе с тегом пользователя.
+    Цитируемые посты должны быть загружены select_related('quoted_post').
+    """
+    tags = []
+    for post in posts:
+        tags += [post_tag(post.pk), user_tag(post.author_id)]
+        if post.quoted_post_id:
+            tags += [post_tag(post.quoted_post_id), user_tag(post.quoted_post.author_id)]
+    return tags
+
+
+# Поля страницы постов, изменение которых меняет ответ (автор — через версию тега кэша)
+POST_ETAG_FIELDS = ('id', 'author_id', 'updated_at', 'like_count', 'comment_count', 'repost_count', 'quoted_post_id')
+
+
+def post_page_etag(view, request):
+    """ETag страницы постов: id, время изменения и счётчики постов страницы плюс версии их авторов."""
+    rows = view.paginator.peek_page(view.filter_queryset(view.get_queryset()), request, view, POST_ETAG_FIELDS)
+    authors = tag_versions({user_tag(row[1]) for row in rows}, create=True)
+    return make_etag(request.get_host(), request.get_full_path(), request.user.pk, rows, sorted(authors.items()))
+
+
 class RegisterAPIView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = [permissions.AllowAny]
@@ -72,14 +113,24 @@ class ProfileDetailAPIView(mixins.UpdateModelMixin, generics.GenericAPIView):
         return self.update(request, *args, **kwargs)
 
 
-class PublicProfileView(generics.RetrieveAPIView):
+class PublicProfileView(ConditionalGetMixin, CachedResponseMixin, generics.RetrieveAPIView):
     queryset = Profile.objects.select_related('user')
     serializer_class = PublicProfileSerializer
     lookup_field = 'user__username'
 
     def get_object(self):
         username = self.kwargs.get('username')
-        return get_object_or_404(Profile, user__username=username)
+        return get_object_or_404(self.queryset, user__username=username)
+
+    def get_cache_tags(self, objects):
+        return [username_tag(self.kwargs.get('username'))]
+
+    def get_etag(self, request):
+        # Версия тега пользователя меняется при каждом сохранении User и Profile
+        tag = username_tag(self.kwargs.get('username'))
+        if tag is None:
+            return None
+        return make_etag(request.get_host(), request.get_full_path(), tag_versions([tag], create=True))
 
 
 class PrivateProfileView(generics.RetrieveAPIView):
@@ -90,16 +141,15 @@ class PrivateProfileView(generics.RetrieveAPIView):
         return self.request.user.profile
 
 
-class PostListCreateAPIView(generics.ListCreateAPIView):
+class PostListCreateAPIView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        return Post.objects.annotate(
-            like_count=Count('likes'),
-            comment_count=Count('comments'),
-            repost_count=Count('reposts')
-        ).order_by('-created_at')
+        return Post.objects.select_related('author__profile', 'quoted_post__author').order_by('-created_at')
+
+    def get_etag(self, request):
+        return post_page_etag(self, request)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -111,13 +161,42 @@ class PostListCreateAPIView(generics.ListCreateAPIView):
 
 
 class PostCommentListCreateAPIView(generics.ListCreateAPIView):
+    """
+    GET — дерево комментариев поста, собранное в памяти из одного запроса.
+    Параметры: parent — id комментария, ветку которого нужно продолжить; cursor — курсор
+    из replies_next / next; depth — максимальная глубина (не больше COMMENT_TREE_MAX_DEPTH).
+    """
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = None  # страницы ответов формирует CommentTree
 
     def get_queryset(self):
         post_id = self.kwargs['pk']
         return Comment.objects.filter(post_id=post_id, parent=None).order_by('created_at')
 
+    def get_tree_depth(self):
+        try:
+            depth = int(self.request.query_params.get('depth', max_depth_default()))
+        except ValueError:
+            depth = max_depth_default()
+        return max(1, min(depth, max_depth_default()))
+
+    def list(self, request, *args, **kwargs):
+        post = get_object_or_404(Post.objects.only('id'), id=self.kwargs['pk'])
+        try:
+            parent_id = int(request.query_params['parent'])
+        except (KeyError, ValueError):
+            parent_id = None
+
+        tree = CommentTree(load_post_comments(post.id), self.get_tree_depth(), replies_page_size())
+        comments, next_cursor = tree.page(parent_id, request.query_params.get('cursor'))
+
+        next_link = None
+        if next_cursor:
+            next_link = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+        serializer = CommentTreeSerializer(comments, many=True, context={'request': request, 'view': self})
+        return Response({'next': next_link, 'results': serializer.data})
+
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx['post'] = get_object_or_404(Post, id=self.kwargs['pk'])
@@ -154,30 +233,65 @@ class PostRepostAPIView(APIView):
 
 
 class PostLikeAPIView(APIView):
+    """
+    Лайки поста:
+    - PUT — поставить лайк (идемпотентно), DELETE — снять лайк (идемпотентно)
+    - POST — переключить лайк (для совместимости со старыми клиентами)
+    Связь вставляется / удаляется по уникальному индексу (post, user) (core/likes.py): счётчик
+    меняется, только если строка действительно изменилась; like_count берётся из счётчика поста.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_post(self, pk):
+        return get_object_or_404(Post.objects.only('id', 'author_id'), id=pk)
+
+    def like_response(self, post, liked):
+        like_count = Post.objects.filter(pk=post.pk).values_list('like_count', flat=True).first()
+        return Response({"liked": liked, "like_count": like_count or 0})
+
+    def put(self, request, pk):
+        post = self.get_post(pk)
+        add_like(post, request.user)
+        return self.like_response(post, True)
+
+    def delete(self, request, pk):
+        post = self.get_post(pk)
+        remove_like(post, request.user)
+        return self.like_response(post, False)
+
     def post(self, request, pk):
-        post = get_object_or_404(Post, id=pk)
-        user = request.user
-        if user in post.likes.all():
-            post.likes.remove(user)
-            liked = False
-        else:
-            post.likes.add(user)
-            liked = True
-        return Response({"liked": liked, "like_count": post.likes.count()})
+        post = self.get_post(pk)
+        liked = not remove_like(post, request.user)
+        if liked:
+            add_like(post, request.user)
+        return self.like_response(post, liked)
+
+
+class HomeTimelineAPIView(generics.ListAPIView):
+    """Домашняя лента: свои посты и посты авторов, на которых подписан пользователь."""
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimelinePagination
 
+    def get_queryset(self):
+        return Post.objects.select_related('author__profile', 'quoted_post__author')
 
-class PopularPostsAPIView(generics.ListAPIView):
+
+class PopularPostsAPIView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = None  # фиксированный топ-N из таблицы трендов
 
     def get_queryset(self):
-        return Post.objects.annotate(
-            like_count=Count("likes"),
-            comment_count=Count("comments"),
-            repost_count=Count("reposts")
-        ).order_by("-like_count", "-comment_count", "-repost_count")[:10]
+        # Рейтинг предрасчитан (core/trending.py), здесь только чтение топа по индексу;
+        # пересчёт изменившихся постов идёт в фоне не чаще раза в TRENDING_REFRESH_SECONDS
+        schedule_trending_refresh()
+        return Post.objects.filter(trending__isnull=False).select_related(
+            'author__profile', 'quoted_post__author'
+        ).order_by('-trending__score', '-id')[:trending_size()]
+
+    def get_cache_tags(self, objects):
+        return [TRENDING_TAG, *post_tags(objects)]
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
@@ -185,17 +299,69 @@ class PopularPostsAPIView(generics.ListAPIView):
         return ctx
 
 
-class UserPostsAPIView(generics.ListAPIView):
+class PostSearchAPIView(generics.ListAPIView):
+    """
+    Полнотекстовый поиск постов: posts/search/?q=...
+    Выдача упорядочена по релевантности, страницы — keyset по (релевантность, id).
+    """
+    serializer_class = PostSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        return Post.objects.select_related('author__profile', 'quoted_post__author')
+
+    def list(self, request, *args, **kwargs):
+        if not normalize_query(request.query_params.get('q')):
+            return Response({'error': 'Пустой поисковый запрос.'}, status=400)
+        return super().list(request, *args, **kwargs)
+
+
+class HashtagPostsAPIView(generics.ListAPIView):
+    """Посты с хэштегом: tags/<name>/posts/, новые сверху — диапазон по индексу PostHashtag."""
+    serializer_class = PostSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = EntityPagination
+
+    def get_queryset(self):
+        return Post.objects.select_related('author__profile', 'quoted_post__author')
+
+    def get_entity_links(self):
+        name = normalize_tag(self.kwargs['name'])
+        hashtag_id = Hashtag.objects.filter(name=name).values_list('id', flat=True).first()
+        if hashtag_id is None:
+            return PostHashtag.objects.none()
+        return PostHashtag.objects.filter(hashtag_id=hashtag_id)
+
+
+class MentionedPostsAPIView(generics.ListAPIView):
+    """Посты, в которых упомянут текущий пользователь, новые сверху — диапазон по индексу PostMention."""
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = EntityPagination
+
+    def get_queryset(self):
+        return Post.objects.select_related('author__profile', 'quoted_post__author')
+
+    def get_entity_links(self):
+        return PostMention.objects.filter(user=self.request.user)
+
+
+class UserPostsAPIView(ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
         uname = self.kwargs.get("username")
-        return Post.objects.annotate(
-            like_count=Count('likes'),
-            comment_count=Count('comments'),
-            repost_count=Count('reposts')
-        ).filter(author__username=uname).order_by("-created_at")
+        return Post.objects.select_related('author__profile', 'quoted_post__author').filter(
+            author__username=uname
+        ).order_by("-created_at")
+
+    def get_cache_tags(self, objects):
+        return [username_tag(self.kwargs.get("username")), *post_tags(objects)]
+
+    def get_etag(self, request):
+        return post_page_etag(self, request)
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
@@ -203,13 +369,18 @@ class UserPostsAPIView(generics.ListAPIView):
         return ctx
 
 
-class UserRepostsAPIView(generics.ListAPIView):
+class UserRepostsAPIView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = RepostSerializer
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
         uname = self.kwargs.get("username")
-        return Repost.objects.filter(user__username=uname).order_by("-created_at")
+        return Repost.objects.filter(user__username=uname).select_related(
+            'user__profile', 'original_post__author__profile', 'original_post__quoted_post__author'
+        ).order_by("-created_at")
+
+    def get_cache_tags(self, objects):
+        return [username_tag(self.kwargs.get("username")), *post_tags(r.original_post for r in objects)]
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
@@ -217,7 +388,7 @@ class UserRepostsAPIView(generics.ListAPIView):
         return ctx
 
 
-class UserCommentsAPIView(generics.ListAPIView):
+class UserCommentsAPIView(CachedResponseMixin, generics.ListAPIView):
     serializer_class = CommentSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -225,6 +396,9 @@ class UserCommentsAPIView(generics.ListAPIView):
         uname = self.kwargs.get("username")
         return Comment.objects.filter(user__username=uname).order_by("-created_at")
 
+    def get_cache_tags(self, objects):
+        return [username_tag(self.kwargs.get("username")), *(post_tag(c.post_id) for c in objects)]
+
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx['request'] = self.request
@@ -280,36 +454,85 @@ class ResetPasswordAPIView(generics.GenericAPIView):
         return Response({"detail": "Пароль успешно изменён"}, status=status.HTTP_200_OK)
 
 
-class LikedPostsAPIView(APIView):
+class LikedPostsAPIView(generics.ListAPIView):
+    serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
-        user = request.user
-        qs = Post.objects.filter(likes=user).order_by('-created_at').annotate(
-            like_count=Count('likes'),
-            comment_count=Count('comments'),
-            repost_count=Count('reposts')
-        )
-        serializer = PostSerializer(qs, many=True, context={'request': request})
-        return Response(serializer.data)
+    def get_queryset(self):
+        return Post.objects.filter(likes=self.request.user).select_related(
+            'author__profile', 'quoted_post__author'
+        ).order_by('-created_at')
 
 
-class UserRepostsListAPIView(APIView):
+class UserRepostsListAPIView(generics.ListAPIView):
+    serializer_class = RepostSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
-        user = request.user
-        qs = Repost.objects.filter(user=user).order_by('-created_at')
-        serializer = RepostSerializer(qs, many=True, context={'request': request})
-        return Response(serializer.data)
+    def get_queryset(self):
+        return Repost.objects.filter(user=self.request.user).select_related(
+            'user__profile', 'original_post__author__profile', 'original_post__quoted_post__author'
+        ).order_by('-created_at')
 
 
-class NotificationListAPIView(generics.ListAPIView):
+class NotificationListAPIView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Сгруппированное уведомление поднимается наверх при каждом новом событии
+    keyset_ordering = ('-last_activity_at', '-id')
+
+    def get_notification_stats(self, request):
+        if not hasattr(self, '_notification_stats'):
+            self._notification_stats = Notification.objects.filter(recipient=request.user).aggregate(
+                last=Max('last_activity_at'),
+                total=Count('id'),
+                unread=Count('id', filter=Q(is_read=False)),
+            )
+        return self._notification_stats
+
+    # Только ETag: отметка прочитанными не меняет last_activity_at, и по If-Modified-Since
+    # клиент получил бы 304 со старыми is_read; число непрочитанных входит в ETag
+    def get_etag(self, request):
+        stats = self.get_notification_stats(request)
+        return make_etag(request.get_host(), request.get_full_path(), request.user.pk, sorted(stats.items()))
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user).order_by('-created_at')
+        return Notification.objects.filter(recipient=self.request.user).select_related(
+            'post__author', 'comment', 'repost__original_post__author__profile',
+            'repost__original_post__quoted_post__author',
+        ).order_by(*self.keyset_ordering)
+
+
+class NotificationUnreadCountAPIView(APIView):
+    """Число непрочитанных уведомлений для бейджа — из счётчика профиля, без COUNT по таблице."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        unread = Profile.objects.filter(user=request.user).values_list('unread_notifications_count', flat=True).first()
+        return Response({'unread_count': unread or 0})
+
+
+class NotificationMarkReadAPIView(APIView):
+    """
+    Отметка уведомлений прочитанными одним UPDATE:
+    - без параметров — все уведомления
+    - up_to_id — уведомление, до которого (включительно) пользователь просмотрел список
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        up_to = None
+        up_to_id = request.data.get('up_to_id')
+        if up_to_id is not None:
+            try:
+                up_to_id = int(up_to_id)
+            except (TypeError, ValueError):
+                return Response({'error': 'up_to_id должен быть целым числом.'}, status=400)
+            up_to = get_object_or_404(
+                Notification.objects.only('id', 'last_activity_at'), pk=up_to_id, recipient=request.user
+            )
+        marked = mark_notifications_read(request.user, up_to)
+        unread = Profile.objects.filter(user=request.user).values_list('unread_notifications_count', flat=True).first()
+        return Response({'marked': marked, 'unread_count': unread or 0})
 
 
 def check_password_complexity(password):
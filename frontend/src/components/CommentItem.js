@@ -1,13 +1,26 @@
 // CommentItem.js
 // Компонент для отображения одного комментария и его вложенных ответов.
 // Использует рекурсию для построения дерева.
+// Если ветка обрезана сервером, replies_next — ссылка на следующие ответы ({ next, results }).
 
 import React, { useState } from 'react';
+import axios from 'axios';
 import CommentForm from './CommentForm';
 
 export default function CommentItem({ comment, postId, onReplyAdded }) {
   const [showReplyForm, setShowReplyForm] = useState(false);
   const [replies, setReplies] = useState(comment.replies || []);
+  const [repliesNext, setRepliesNext] = useState(comment.replies_next || null);
+
+  const loadMoreReplies = async () => {
+    try {
+      const res = await axios.get(repliesNext);
+      setReplies((prev) => [...prev, ...res.data.results]);
+      setRepliesNext(res.data.next);
+    } catch (error) {
+      console.error('Ошибка загрузки ответов:', error);
+    }
+  };
 
   const handleReplyCreated = (newComment) => {
     setShowReplyForm(false);
@@ -65,6 +78,24 @@ export default function CommentItem({ comment, postId, onReplyAdded }) {
           ))}
         </div>
       )}
+
+      {repliesNext && (
+        <button
+          style={{
+            marginTop: 4,
+            marginLeft: 20,
+            fontSize: 12,
+            cursor: 'pointer',
+            color: 'blue',
+            background: 'none',
+            border: 'none',
+            padding: 0,
+          }}
+          onClick={loadMoreReplies}
+        >
+          Показать ещё ответы
+        </button>
+      )}
     </div>
   );
 }
@@ -1,21 +1,25 @@
 // frontend/src/components/CommentsList.js
 // Компонент для отображения списка комментариев в виде дерева.
 // Преобразует массив в дерево и отрисовывает его через CommentItem.
+// API отдаёт корневые комментарии уже с ответами (replies); комментарии, добавленные на странице,
+// приходят без них и раскладываются по родителям. next — ссылка на следующую страницу корневых
+// комментариев, по кнопке вызывается onLoadMore.
 
 import React from 'react';
 import CommentItem from './CommentItem';
 
-export default function CommentsList({ comments, postId, onReplyAdded }) {
+export default function CommentsList({ comments, postId, onReplyAdded, next = null, onLoadMore }) {
   const buildTree = (comments) => {
     const map = {};
     const roots = [];
 
-    comments.forEach(comment => {
-      comment.replies = [];
+    const nodes = comments.map(comment => ({ ...comment, replies: [...(comment.replies || [])] }));
+
+    nodes.forEach(comment => {
       map[comment.id] = comment;
     });
 
-    comments.forEach(comment => {
+    nodes.forEach(comment => {
       if (comment.parent) {
         if (map[comment.parent]) {
           map[comment.parent].replies.push(comment);
@@ -40,6 +44,11 @@ export default function CommentsList({ comments, postId, onReplyAdded }) {
           onReplyAdded={onReplyAdded}
         />
       ))}
+      {next && onLoadMore && (
+        <button style={{ marginTop: 8, cursor: 'pointer' }} onClick={onLoadMore}>
+          Показать ещё комментарии
+        </button>
+      )}
     </div>
   );
 }
@@ -31,8 +31,10 @@ export default function PostCard({
   console.log(post);
 
   // Безопасная обработка данных для аватара и имени пользователя
-  const avatarUrl = post?.author?.profile?.avatar
-    ? `http://localhost:8000${post.author.profile.avatar}`
+  // API отдаёт абсолютный URL аватара в карточке автора (post.author.avatar)
+  const avatar = post?.author?.avatar;
+  const avatarUrl = avatar
+    ? (avatar.startsWith('http') ? avatar : `http://localhost:8000${avatar}`)
     : '/default-avatar.png'; // Заглушка, если аватар отсутствует
   const username = post?.author?.username || 'Неизвестный пользователь'; // Защита от отсутствия имени
 
@@ -17,7 +17,7 @@ export default function PostList() {
   const fetchPosts = async () => {
     try {
       const res = await axiosInstance.get('/posts/');
-      setPosts(res.data);
+      setPosts(res.data.results);
     } catch (error) {
       console.error('Ошибка загрузки постов:', error);
     }
@@ -90,7 +90,7 @@ export default function PostList() {
             style={{ display: 'flex', alignItems: 'center', textDecoration: 'none', color: 'inherit', cursor: 'pointer' }}
           >
             <img
-              src={getAvatarUrl(post.author?.profile?.avatar)}
+              src={getAvatarUrl(post.author?.avatar)}
               alt="avatar"
               style={{
                 width: 40,
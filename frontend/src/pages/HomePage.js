@@ -75,6 +75,7 @@ const HomePage = () => {
   const [loading, setLoading] = useState(true);
   const [newPostText, setNewPostText] = useState('');
   const [commentsByPostId, setCommentsByPostId] = useState({});
+  const [commentsNextByPostId, setCommentsNextByPostId] = useState({});
   const [showCommentsFor, setShowCommentsFor] = useState({});
   const [loadingComments, setLoadingComments] = useState({});
   const [showCommentInputFor, setShowCommentInputFor] = useState({});
@@ -83,7 +84,7 @@ const HomePage = () => {
     const fetchPosts = async () => {
       try {
         const response = await api.get('/posts/');
-        setPosts(response.data);
+        setPosts(response.data.results);
       } catch (error) {
         console.error('Ошибка загрузки постов:', error);
       }
@@ -116,7 +117,7 @@ const HomePage = () => {
       setNewPostText('');
       // Обновляем список постов после добавления
       const response = await api.get('/posts/');
-      setPosts(response.data);
+      setPosts(response.data.results);
     } catch (error) {
       console.error('Ошибка при добавлении поста:', error);
     }
@@ -164,11 +165,20 @@ const HomePage = () => {
     }
   };
 
-  const fetchComments = async (postId) => {
-    setLoadingComments((prev) => ({ ...prev, [postId]: true }));
+  // Комментарии приходят страницами { next, results }; next — ссылка на следующую страницу.
+  // С nextUrl страница добавляется к уже загруженным, без него список загружается заново.
+  const fetchComments = async (postId, nextUrl = null) => {
+    if (!nextUrl) {
+      setLoadingComments((prev) => ({ ...prev, [postId]: true }));
+    }
     try {
-      const response = await api.get(`/posts/${postId}/comments/`);
-      setCommentsByPostId((prev) => ({ ...prev, [postId]: response.data }));
+      const response = await api.get(nextUrl || `/posts/${postId}/comments/`);
+      const { results, next } = response.data;
+      setCommentsByPostId((prev) => ({
+        ...prev,
+        [postId]: nextUrl ? [...(prev[postId] || []), ...results] : results,
+      }));
+      setCommentsNextByPostId((prev) => ({ ...prev, [postId]: next }));
       setShowCommentsFor((prev) => ({ ...prev, [postId]: true }));
     } catch (error) {
       console.error('Ошибка загрузки комментариев:', error);
@@ -243,7 +253,7 @@ const HomePage = () => {
           <PostPaper key={post.id} elevation={3}>
             <AuthorInfo>
               <Avatar
-                src={post.author?.profile?.avatar || ''}
+                src={post.author?.avatar || ''}
                 alt={post.author_username}
                 sx={{ width: 36, height: 36, cursor: 'pointer' }}
                 onClick={() => goToUserPage(post.author_username)}
@@ -325,6 +335,8 @@ const HomePage = () => {
                   <CommentsList
                     comments={commentsByPostId[post.id] || []}
                     postId={post.id}
+                    next={commentsNextByPostId[post.id]}
+                    onLoadMore={() => fetchComments(post.id, commentsNextByPostId[post.id])}
                     onReplyAdded={() => fetchComments(post.id)}
                   />
                 )}
@@ -424,6 +436,8 @@ const HomePage = () => {
                   <CommentsList
                     comments={commentsByPostId[post.id] || []}
                     postId={post.id}
+                    next={commentsNextByPostId[post.id]}
+                    onLoadMore={() => fetchComments(post.id, commentsNextByPostId[post.id])}
                     onReplyAdded={() => fetchComments(post.id)}
                   />
                 </CommentsSection>
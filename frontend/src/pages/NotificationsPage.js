@@ -10,7 +10,14 @@ export default function NotificationsPage() {
 
   useEffect(() => {
     axiosInstance.get('/notifications/')
-      .then(res => setNotifications(res.data))
+      .then(res => {
+        const results = res.data.results;
+        setNotifications(results);
+        // Показанное считается прочитанным: всё до самого свежего уведомления включительно
+        if (results.length > 0) {
+          return axiosInstance.post('/notifications/mark-read/', { up_to_id: results[0].id });
+        }
+      })
       .catch(err => console.error(err));
   }, [axiosInstance]);
 
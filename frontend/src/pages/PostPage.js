@@ -11,17 +11,30 @@ const PostPage = () => {
   const { id } = useParams();
   const [post, setPost] = useState(null);
   const [comments, setComments] = useState([]);
+  const [commentsNext, setCommentsNext] = useState(null); // ссылка на следующую страницу комментариев
 
   useEffect(() => {
     axios.get(`/api/posts/${id}/`) // Получение данных поста по id
       .then(res => setPost(res.data))
       .catch(err => console.error(err));
 
-    axios.get(`/api/posts/${id}/comments/`) // Получение комментариев поста
-      .then(res => setComments(res.data))
+    axios.get(`/api/posts/${id}/comments/`) // Первая страница комментариев поста: { next, results }
+      .then(res => {
+        setComments(res.data.results);
+        setCommentsNext(res.data.next);
+      })
       .catch(err => console.error(err));
   }, [id]);
 
+  const loadMoreComments = () => {
+    axios.get(commentsNext)
+      .then(res => {
+        setComments(prev => [...prev, ...res.data.results]);
+        setCommentsNext(res.data.next);
+      })
+      .catch(err => console.error(err));
+  };
+
   const handleNewComment = newComment => {
     setComments(prev => [newComment, ...prev]);
   };
@@ -34,7 +47,7 @@ const PostPage = () => {
 
       <h3 style={{ marginTop: 30 }}>Комментарии</h3>
       <CommentForm postId={post.id} onAdd={handleNewComment} />
-      <CommentsList comments={comments} />
+      <CommentsList comments={comments} next={commentsNext} onLoadMore={loadMoreComments} />
     </div>
   );
 };
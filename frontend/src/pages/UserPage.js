@@ -55,22 +55,22 @@ const UserPage = () => {
   const [tabIndex, setTabIndex] = useState(0);
 
   const [posts, setPosts] = useState([]);
-  const [postsPage, setPostsPage] = useState(1);
+  const [postsNext, setPostsNext] = useState(null); // ссылка на следующую страницу (курсор)
   const [postsLoading, setPostsLoading] = useState(false);
   const [postsHasMore, setPostsHasMore] = useState(true);
 
   const [reposts, setReposts] = useState([]);
-  const [repostsPage, setRepostsPage] = useState(1);
+  const [repostsNext, setRepostsNext] = useState(null); // ссылка на следующую страницу (курсор)
   const [repostsLoading, setRepostsLoading] = useState(false);
   const [repostsHasMore, setRepostsHasMore] = useState(true);
 
   const [likedPosts, setLikedPosts] = useState([]);
-  const [likedPage, setLikedPage] = useState(1);
+  const [likedNext, setLikedNext] = useState(null); // ссылка на следующую страницу (курсор)
   const [likedLoading, setLikedLoading] = useState(false);
   const [likedHasMore, setLikedHasMore] = useState(true);
 
   const [comments, setComments] = useState([]);
-  const [commentsPage, setCommentsPage] = useState(1);
+  const [commentsNext, setCommentsNext] = useState(null); // ссылка на следующую страницу (курсор)
   const [commentsLoading, setCommentsLoading] = useState(false);
   const [commentsHasMore, setCommentsHasMore] = useState(true);
 
@@ -133,13 +133,17 @@ const UserPage = () => {
     }
   };
 
-  const fetchPostsPage = async (type, page) => {
-    let url = '';
-    if (type === 'posts') url = `/api/users/${username}/posts/?page=${page}&page_size=${PAGE_SIZE}`;
-    else if (type === 'reposts') url = `/api/users/${username}/reposts/?page=${page}&page_size=${PAGE_SIZE}`;
-    else if (type === 'liked') url = `/api/users/${username}/liked-posts/?page=${page}&page_size=${PAGE_SIZE}`;
-    else if (type === 'comments') url = `/api/users/${username}/comments/?page=${page}&page_size=${PAGE_SIZE}`;
-    else return;
+  // Списки постраничные по курсору: без nextUrl загружается первая страница,
+  // иначе — страница по ссылке next из предыдущего ответа (null — страниц больше нет)
+  const fetchPostsPage = async (type, nextUrl = null) => {
+    let url = nextUrl;
+    if (!url) {
+      if (type === 'posts') url = `/api/users/${username}/posts/?page_size=${PAGE_SIZE}`;
+      else if (type === 'reposts') url = `/api/users/${username}/reposts/?page_size=${PAGE_SIZE}`;
+      else if (type === 'liked') url = `/api/users/${username}/liked-posts/?page_size=${PAGE_SIZE}`;
+      else if (type === 'comments') url = `/api/users/${username}/comments/?page_size=${PAGE_SIZE}`;
+      else return;
+    }
 
     try {
       if (type === 'posts') setPostsLoading(true);
@@ -154,21 +158,21 @@ const UserPage = () => {
       const data = res.data.results || res.data;
 
       if (type === 'posts') {
-        setPosts(page === 1 ? data : [...posts, ...data]);
+        setPosts(!nextUrl ? data : [...posts, ...data]);
         setPostsHasMore(res.data.next !== null);
-        setPostsPage(page);
+        setPostsNext(res.data.next);
       } else if (type === 'reposts') {
-        setReposts(page === 1 ? data : [...reposts, ...data]);
+        setReposts(!nextUrl ? data : [...reposts, ...data]);
         setRepostsHasMore(res.data.next !== null);
-        setRepostsPage(page);
+        setRepostsNext(res.data.next);
       } else if (type === 'liked') {
-        setLikedPosts(page === 1 ? data : [...likedPosts, ...data]);
+        setLikedPosts(!nextUrl ? data : [...likedPosts, ...data]);
         setLikedHasMore(res.data.next !== null);
-        setLikedPage(page);
+        setLikedNext(res.data.next);
       } else if (type === 'comments') {
-        setComments(page === 1 ? data : [...comments, ...data]);
+        setComments(!nextUrl ? data : [...comments, ...data]);
         setCommentsHasMore(res.data.next !== null);
-        setCommentsPage(page);
+        setCommentsNext(res.data.next);
       }
     } catch (err) {
       console.error(`Ошибка загрузки ${type}:`, err);
@@ -183,10 +187,10 @@ const UserPage = () => {
 
   useEffect(() => {
     if (!profile) return;
-    if (tabIndex === 0 && posts.length === 0) fetchPostsPage('posts', 1);
-    else if (tabIndex === 1 && reposts.length === 0) fetchPostsPage('reposts', 1);
-    else if (tabIndex === 2 && likedPosts.length === 0) fetchPostsPage('liked', 1);
-    else if (tabIndex === 3 && comments.length === 0) fetchPostsPage('comments', 1);
+    if (tabIndex === 0 && posts.length === 0) fetchPostsPage('posts');
+    else if (tabIndex === 1 && reposts.length === 0) fetchPostsPage('reposts');
+    else if (tabIndex === 2 && likedPosts.length === 0) fetchPostsPage('liked');
+    else if (tabIndex === 3 && comments.length === 0) fetchPostsPage('comments');
   }, [tabIndex, profile]);
 
   useEffect(() => {
@@ -195,10 +199,10 @@ const UserPage = () => {
     setReposts([]);
     setLikedPosts([]);
     setComments([]);
-    setPostsPage(1);
-    setRepostsPage(1);
-    setLikedPage(1);
-    setCommentsPage(1);
+    setPostsNext(null);
+    setRepostsNext(null);
+    setLikedNext(null);
+    setCommentsNext(null);
     setPostsHasMore(true);
     setRepostsHasMore(true);
     setLikedHasMore(true);
@@ -210,7 +214,7 @@ const UserPage = () => {
     try {
       if (liked) await axios.delete(`/api/posts/${postId}/like/`, { headers: { Authorization: `Bearer ${token}` } });
       else await axios.post(`/api/posts/${postId}/like/`, {}, { headers: { Authorization: `Bearer ${token}` } });
-      fetchPostsPage(tabIndex === 0 ? 'posts' : tabIndex === 1 ? 'reposts' : tabIndex === 2 ? 'liked' : 'comments', 1);
+      fetchPostsPage(tabIndex === 0 ? 'posts' : tabIndex === 1 ? 'reposts' : tabIndex === 2 ? 'liked' : 'comments');
     } catch (err) {
       console.error('Ошибка лайка:', err);
       showError('Ошибка при постановке лайка');
@@ -222,7 +226,7 @@ const UserPage = () => {
     try {
       if (reposted) await axios.delete(`/api/posts/${postId}/repost/`, { headers: { Authorization: `Bearer ${token}` } });
       else await axios.post(`/api/posts/${postId}/repost/`, {}, { headers: { Authorization: `Bearer ${token}` } });
-      fetchPostsPage(tabIndex === 0 ? 'posts' : tabIndex === 1 ? 'reposts' : tabIndex === 2 ? 'liked' : 'comments', 1);
+      fetchPostsPage(tabIndex === 0 ? 'posts' : tabIndex === 1 ? 'reposts' : tabIndex === 2 ? 'liked' : 'comments');
     } catch (err) {
       console.error('Ошибка репоста:', err);
       showError('Ошибка при репосте');
@@ -269,10 +273,10 @@ const UserPage = () => {
   };
 
   const loadMore = () => {
-    if (tabIndex === 0 && postsHasMore && !postsLoading) fetchPostsPage('posts', postsPage + 1);
-    else if (tabIndex === 1 && repostsHasMore && !repostsLoading) fetchPostsPage('reposts', repostsPage + 1);
-    else if (tabIndex === 2 && likedHasMore && !likedLoading) fetchPostsPage('liked', likedPage + 1);
-    else if (tabIndex === 3 && commentsHasMore && !commentsLoading) fetchPostsPage('comments', commentsPage + 1);
+    if (tabIndex === 0 && postsHasMore && !postsLoading) fetchPostsPage('posts', postsNext);
+    else if (tabIndex === 1 && repostsHasMore && !repostsLoading) fetchPostsPage('reposts', repostsNext);
+    else if (tabIndex === 2 && likedHasMore && !likedLoading) fetchPostsPage('liked', likedNext);
+    else if (tabIndex === 3 && commentsHasMore && !commentsLoading) fetchPostsPage('comments', commentsNext);
   };
 
   const UserListDialog = ({ open, onClose, users, title }) => (